@@ -0,0 +1,249 @@
+# attributions.py (Integrated-gradients feature attributions for every AI candidate, precomputed for the app)
+import os
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from catalog_store import FEATURE_COLUMNS, TARGET_COLUMN, CANDIDATE_FILE, CONFIDENCE_THRESHOLD, dataset_version
+import telemetry
+
+ATTRIBUTION_FILE = 'ai_candidate_attributions.parquet'
+METADATA_KEY = b'exosight.attributions'
+ATTRIBUTION_COLUMNS = [f'attr_{c}' for c in FEATURE_COLUMNS]
+FEATURE_LABELS = {'koi_period': 'Orbital period', 'koi_prad': 'Planet radius', 'koi_teq': 'Equilibrium temp',
+                  'koi_duration': 'Transit duration', 'koi_impact': 'Impact parameter', 'koi_insol': 'Insolation'}
+IG_STEPS = 512            # midpoint-rule steps along the straight path from the baseline
+BATCH_POINTS = 1 << 17     # path points (rows x steps) per forward/backward pass
+ROWS_PER_TASK = 512        # candidates per process-pool task
+
+# Each worker process receives the model (NumpyMLP or StackedMLP) once, through its initializer.
+_worker_model = None
+
+# Derivative of each hidden activation, written in terms of its output a.
+_DERIVATIVES = {
+    'relu': lambda a: (a > 0).astype(a.dtype),
+    'tanh': lambda a: 1.0 - a * a,
+    'logistic': lambda a: a * (1.0 - a),
+    'identity': lambda a: np.ones_like(a),
+}
+
+
+# --- 1. Gradients Through the NumPy Forward Pass ---
+def _stacked_layers(model):
+    """
+    (coefs, intercepts, calibration) with a leading member axis: a StackedMLP as is, a
+    NumpyMLP as a one-member stack with no calibration.
+    """
+    if hasattr(model, 'n_members'):
+        return model.coefs, model.intercepts, model.calibration
+    if model.out_activation != 'logistic':
+        raise ValueError(f"attributions need a binary (logistic) output layer, not '{model.out_activation}'")
+    return ([np.asarray(W)[None] for W in model.coefs], [np.asarray(b)[None] for b in model.intercepts], None)
+
+
+def input_gradients(model, X):
+    """
+    (P(CANDIDATE), dP/dx) for raw feature rows, from one forward pass that keeps each
+    hidden layer's output and one backward pass through the same weights. For an
+    ensemble P is the calibrated member mean, so the gradient is the calibration slope
+    times the mean of the members' gradients. The scaler is folded into the first
+    layer, so the gradient is already per raw unit of each feature.
+    """
+    from mlp_numpy import _ACTIVATIONS, _sigmoid
+    from ensemble import apply_calibration, calibration_slope
+    coefs, intercepts, calibration = _stacked_layers(model)
+    a = np.atleast_2d(np.asarray(X, dtype=np.float64))
+    hidden = _ACTIVATIONS[model.activation]
+    derivative = _DERIVATIVES[model.activation]
+    outputs = []
+    for W, b in zip(coefs[:-1], intercepts[:-1]):
+        a = hidden(np.matmul(a, W) + b[:, None, :])                         # (members, rows, units)
+        outputs.append(a)
+    members = _sigmoid((np.matmul(a, coefs[-1]) + intercepts[-1][:, None, :])[:, :, 0])
+    grad = np.broadcast_to(coefs[-1][:, None, :, 0], a.shape)
+    for W, a in zip(reversed(coefs[:-1]), reversed(outputs)):
+        grad = np.matmul(grad * derivative(a), np.swapaxes(W, 1, 2))
+    mean = members.mean(axis=0)
+    grad = (grad * (members * (1.0 - members))[:, :, None]).mean(axis=0)
+    return apply_calibration(mean, calibration), grad * calibration_slope(mean, calibration)[:, None]
+
+
+def integrated_gradients(model, X, baseline, steps=IG_STEPS, batch_points=BATCH_POINTS):
+    """
+    Per-feature contributions (x - x0) * mean_k dP/dx(x0 + alpha_k (x - x0)) for each row.
+    They add up to P(x) - P(x0) up to the quadrature error, which `completeness_error` reports.
+    Rows are processed in blocks so that members x rows x steps path points stay under `batch_points`.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    baseline = np.asarray(baseline, dtype=np.float64)
+    alphas = (np.arange(steps) + 0.5) / steps
+    attributions = np.empty_like(X)
+    block = max(1, batch_points // (steps * getattr(model, 'n_members', 1)))
+    for start in range(0, len(X), block):
+        delta = X[start:start + block] - baseline
+        path = baseline + alphas[None, :, None] * delta[:, None, :]           # (rows, steps, features)
+        _, grad = input_gradients(model, path.reshape(-1, X.shape[1]))
+        attributions[start:start + block] = delta * grad.reshape(path.shape).mean(axis=1)
+    return attributions
+
+
+def completeness_error(model, X, baseline, attributions):
+    """max |sum of attributions - (P(x) - P(baseline))| over the rows."""
+    gap = model.predict_proba(X)[:, 1] - model.predict_proba(baseline)[0, 1]
+    return float(np.abs(attributions.sum(axis=1) - gap).max()) if len(X) else 0.0
+
+
+# --- 2. Batched Across a Process Pool ---
+def _init_worker(model):
+    global _worker_model
+    _worker_model = model
+
+
+def _attribute_in_worker(X, baseline, steps):
+    return integrated_gradients(_worker_model, X, baseline, steps)
+
+
+def attribute(model, X, baseline, steps=IG_STEPS, workers=None, rows_per_task=ROWS_PER_TASK):
+    """integrated_gradients over `X`, split into tasks across `workers` processes (1 = in process)."""
+    X = np.asarray(X, dtype=np.float64)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(X) <= rows_per_task:
+        return integrated_gradients(model, X, baseline, steps)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model,)) as pool:
+        futures = [pool.submit(_attribute_in_worker, X[start:start + rows_per_task], baseline, steps)
+                   for start in range(0, len(X), rows_per_task)]
+        return np.concatenate([future.result() for future in futures])
+
+
+# --- 3. Candidates, Baseline and the Stored Table ---
+def load_candidates(path=CANDIDATE_FILE):
+    """
+    The rows to explain. Older candidate files carry only kepid; then the same selection
+    (archive FALSE POSITIVEs at or above the threshold) is taken from the confidence store,
+    which has the KOI/TOI names the app looks attributions up by.
+    """
+    import pandas as pd
+    candidates = pd.read_csv(path)
+    if 'kepoi_name' not in candidates.columns:
+        from confidence_store import ensure_store
+        store = pd.read_parquet(ensure_store())
+        candidates = store[(store[TARGET_COLUMN] == 'FALSE POSITIVE') & (store['confidence'] >= CONFIDENCE_THRESHOLD)]
+    return candidates.dropna(subset=FEATURE_COLUMNS).reset_index(drop=True)
+
+
+def reference_point(model):
+    """
+    The integrated-gradients baseline: the training mean the model's scaler was fit on, an
+    "average object", when the registry stored it; otherwise the mean of the cleaned catalogs.
+    """
+    from model_registry import REGISTRY_DIR
+    version = model.manifest.get('version', 'legacy')
+    path = os.path.join(REGISTRY_DIR, version, 'scaler_mean.npy')
+    if os.path.exists(path):
+        return np.load(path).astype(np.float64)
+    from mission_catalogs import load_unified
+    from feature_pipeline import clean
+    return clean(load_unified())[FEATURE_COLUMNS].mean().to_numpy(np.float64)
+
+
+def build_attributions(candidates_path=CANDIDATE_FILE, path=ATTRIBUTION_FILE, model=None, steps=IG_STEPS, workers=None):
+    """
+    Attribute every candidate with the current registry model, the one that scored their
+    confidence, and write one row per candidate (ids, model probability, attr_<feature>
+    columns) to Parquet, atomically. The baseline, model
+    version and completeness error go into the file's metadata. Returns that metadata.
+    """
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    from model_registry import load_current
+    model = model or load_current()
+    candidates = load_candidates(candidates_path)
+    X = candidates[FEATURE_COLUMNS].to_numpy(np.float64)
+    baseline = reference_point(model)
+    with telemetry.span('attributions.integrated_gradients'):
+        attributions = attribute(model, X, baseline, steps, workers)
+
+    ids = [c for c in ('mission', 'kepid', 'kepoi_name', 'confidence') if c in candidates.columns]
+    table = candidates[ids].astype({'mission': str} if 'mission' in ids else {})
+    table['model_probability'] = model.predict_proba(X)[:, 1]
+    table = pd.concat([table, pd.DataFrame(attributions, columns=ATTRIBUTION_COLUMNS)], axis=1)
+    metadata = {'model_version': model.manifest.get('version', 'legacy'), 'steps': steps,
+                'baseline': dict(zip(FEATURE_COLUMNS, baseline.tolist())),
+                'baseline_probability': float(model.predict_proba(baseline)[0, 1]),
+                'completeness_error': completeness_error(model, X, baseline, attributions),
+                'candidates_version': dataset_version(candidates_path)}
+    arrow = pa.Table.from_pandas(table, preserve_index=False)
+    arrow = arrow.replace_schema_metadata({**(arrow.schema.metadata or {}), METADATA_KEY: json.dumps(metadata)})
+    tmp = f'{path}.{os.getpid()}.tmp'
+    pq.write_table(arrow, tmp)
+    os.replace(tmp, path)
+    return dict(metadata, rows=len(table))
+
+
+class AttributionTable:
+    """The stored attributions indexed by KOI/TOI name, plus the metadata they were computed with."""
+
+    def __init__(self, df, metadata):
+        self.df = df.set_index('kepoi_name', drop=False) if 'kepoi_name' in df.columns else df
+        self.metadata = metadata
+
+    def __contains__(self, kepoi_name):
+        return kepoi_name in self.df.index
+
+    def row(self, kepoi_name):
+        return self.df.loc[kepoi_name]
+
+    @classmethod
+    def load(cls, path=ATTRIBUTION_FILE):
+        import pyarrow.parquet as pq
+        arrow = pq.read_table(path)
+        return cls(arrow.to_pandas(), json.loads(arrow.schema.metadata[METADATA_KEY]))
+
+
+def open_attributions(path=ATTRIBUTION_FILE):
+    """The stored table, or None until `python attributions.py` (or create_model.py) has written it."""
+    return AttributionTable.load(path) if os.path.exists(path) else None
+
+
+# --- 4. Rendering ---
+@telemetry.traced('figure.attribution.build')
+def attribution_figure(table, kepoi_name):
+    """Horizontal bars: how far each feature moves P(CANDIDATE) from the average object's score."""
+    import plotly.graph_objects as go
+    row = table.row(kepoi_name)
+    baseline = table.metadata['baseline']
+    values = row[ATTRIBUTION_COLUMNS].to_numpy(np.float64)
+    order = np.argsort(np.abs(values))
+    labels = [FEATURE_LABELS.get(FEATURE_COLUMNS[i], FEATURE_COLUMNS[i]) for i in order]
+    hover = [f"{FEATURE_COLUMNS[i]}: average {baseline[FEATURE_COLUMNS[i]]:.4g}" for i in order]
+    fig = go.Figure(go.Bar(
+        x=values[order], y=labels, orientation='h', customdata=hover,
+        marker_color=np.where(values[order] >= 0, '#3fb950', '#f85149'),
+        hovertemplate="%{customdata}<br>%{x:+.3f}<extra></extra>",
+    ))
+    fig.update_layout(title=f"Why {kepoi_name} scores {row['model_probability']:.2f} "
+                            f"(average object {table.metadata['baseline_probability']:.2f})",
+                      xaxis_title="Contribution to P(CANDIDATE)", template="plotly_dark", height=300,
+                      margin=dict(l=10, r=10, t=40, b=10))
+    return fig
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute integrated-gradients attributions for the AI candidates.")
+    parser.add_argument('--candidates', default=CANDIDATE_FILE)
+    parser.add_argument('--output', default=ATTRIBUTION_FILE)
+    parser.add_argument('--steps', type=int, default=IG_STEPS)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args(argv)
+    import time
+    start = time.perf_counter()
+    info = build_attributions(args.candidates, args.output, steps=args.steps, workers=args.workers)
+    print(f"Attributed {info['rows']} candidates with model {info['model_version']} in "
+          f"{time.perf_counter() - start:.2f} s -> {args.output}")
+    print(f"Baseline P(CANDIDATE) {info['baseline_probability']:.3f}; "
+          f"max |sum(attr) - (P(x) - P(baseline))| = {info['completeness_error']:.2e}")
+
+
+if __name__ == "__main__":
+    main()
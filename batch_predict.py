@@ -0,0 +1,139 @@
+# batch_predict.py (Score whole catalogs with the registry model, chunk by chunk)
+import os
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from catalog_store import FEATURE_COLUMNS, count_header_rows
+
+DEFAULT_CHUNK_ROWS = 100_000
+
+# Each worker process loads the model once and keeps it here.
+_worker_model = None
+
+
+# --- 1. Scoring ---
+def load_model(version=None):
+    """A registry version (the active one, or the legacy weights file, by default)."""
+    from model_registry import load_current, load_version
+    return load_current() if version in (None, 'legacy') else load_version(version)
+
+
+def score_features(X, model):
+    """Confidence of class 1 (CANDIDATE) for a 2-D raw feature array; rows with NaNs get NaN."""
+    X = np.asarray(X, dtype=np.float64)
+    confidence = np.full(len(X), np.nan)
+    valid = ~np.isnan(X).any(axis=1)
+    if valid.any():
+        confidence[valid] = model.predict_proba(X[valid])[:, 1]
+    return confidence
+
+
+def _init_worker(version):
+    global _worker_model
+    _worker_model = load_model(version)
+
+
+def _score_in_worker(X):
+    return score_features(X, _worker_model)
+
+
+# --- 2. Chunked Input and Output ---
+def iter_chunks(path, chunk_rows=DEFAULT_CHUNK_ROWS):
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, skiprows=count_header_rows(path), chunksize=chunk_rows, low_memory=False)
+
+
+def empty_chunk(path):
+    """The input's columns with no rows, for writing a header when there is nothing to score."""
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        return pq.read_schema(path).empty_table().to_pandas()
+    return pd.read_csv(path, skiprows=count_header_rows(path), nrows=0)
+
+
+class ChunkWriter:
+    """Appends scored chunks to a CSV or Parquet file without holding earlier chunks."""
+
+    def __init__(self, path):
+        self.path = path
+        self.parquet_writer = None
+        self.started = False
+        self.rows = 0
+
+    def write(self, chunk):
+        if self.path.endswith('.parquet'):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            if self.parquet_writer is None:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                self.parquet_writer = pq.ParquetWriter(self.path, table.schema)
+            else:
+                # CSV chunks can infer different dtypes (e.g. int vs float with NaNs); pin to the first.
+                table = pa.Table.from_pandas(chunk, schema=self.parquet_writer.schema, preserve_index=False)
+            self.parquet_writer.write_table(table)
+        else:
+            chunk.to_csv(self.path, mode='a' if self.started else 'w', header=not self.started, index=False)
+        self.started = True
+        self.rows += len(chunk)
+
+    def close(self):
+        if self.parquet_writer is not None:
+            self.parquet_writer.close()
+
+
+# --- 3. Public Entry Point ---
+def score_file(input_path, output_path, chunk_rows=DEFAULT_CHUNK_ROWS, workers=None, version=None):
+    """
+    Stream `input_path` through a registry model (the active version by default, pinned
+    here so every worker scores with the same one) and write it back out with a
+    'confidence' column. At most 2 * workers chunks are in memory at any time.
+    Returns the number of rows written; an input without rows still gets a header-only output.
+    """
+    workers = workers or os.cpu_count() or 1
+    version = load_model(version).manifest['version']
+    writer = ChunkWriter(output_path)
+    pending = deque()
+
+    def flush_oldest():
+        chunk, future = pending.popleft()
+        chunk['confidence'] = future.result()
+        writer.write(chunk)
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(version,)) as pool:
+            for chunk in iter_chunks(input_path, chunk_rows):
+                X = chunk[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+                pending.append((chunk, pool.submit(_score_in_worker, X)))
+                if len(pending) >= 2 * workers:
+                    flush_oldest()
+            while pending:
+                flush_oldest()
+        if not writer.started:
+            writer.write(empty_chunk(input_path).assign(confidence=np.float64('nan')))
+    finally:
+        writer.close()
+    return writer.rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a CSV or Parquet catalog with the ExoSight model.")
+    parser.add_argument('input', help="CSV (NASA archive format is fine) or .parquet file")
+    parser.add_argument('output', help="Destination .csv or .parquet file")
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument('--workers', type=int, default=None, help="Process pool size (default: all cores)")
+    parser.add_argument('--model-version', default=None, help="Registry version (default: the active one)")
+    args = parser.parse_args(argv)
+
+    rows = score_file(args.input, args.output, args.chunk_rows, args.workers, args.model_version)
+    print(f"Scored {rows} rows -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
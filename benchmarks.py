@@ -0,0 +1,325 @@
+# benchmarks.py (Timing suite for the load, train, score and render hot paths, with JSON history)
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import subprocess
+from datetime import datetime, timezone
+import numpy as np
+from catalog_store import KEPLER_FILE, TARGET_COLUMN, FEATURE_COLUMNS, STAR_COLUMNS, count_header_rows
+
+BENCH_DIR = '.bench_data'
+HISTORY_FILE = 'benchmark_history.jsonl'
+LEGACY_SKIP_ROWS = 53            # the hard-coded offset app.py still uses
+SCORE_ROWS = (1, 1_000, 100_000, 1_000_000)
+CATALOG_SCALES = (1, 10)         # synthetic catalogs at this many times the real KOI table
+MIN_TIME = 0.5                   # keep repeating a benchmark until this much time is spent...
+MAX_REPEATS = 25                 # ...or it has run this often
+REGRESSION_RATIO = 1.25          # median slower than the previous run by this factor is flagged
+
+
+# --- 1. Synthetic Inputs (scaled up from the real catalog) ---
+def synthetic_catalog(scale, source=KEPLER_FILE, seed=0):
+    """
+    Write the KOI table `scale` times over, with the archive's '#' header kept so every
+    loader parses it like the real file. Each replica gets fresh kepids and KOI names
+    and its features jittered by a few percent, so caching and dedup can't shortcut it.
+    """
+    target = os.path.join(BENCH_DIR, f'kepler_x{scale}.csv')
+    if scale == 1:
+        return source
+    if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(source):
+        return target
+
+    import pandas as pd
+    n_header = count_header_rows(source)
+    with open(source, 'r', encoding='utf-8') as f:
+        header = ''.join(next(f) for _ in range(n_header))
+    base = pd.read_csv(source, skiprows=n_header, low_memory=False)
+
+    rng = np.random.default_rng(seed)
+    replicas = []
+    for k in range(scale):
+        part = base.copy()
+        part['kepid'] = part['kepid'] + k * 100_000_000
+        part['kepoi_name'] = part['kepoi_name'].astype(str) + f'.r{k}'
+        part[FEATURE_COLUMNS] = part[FEATURE_COLUMNS] * rng.lognormal(0.0, 0.05, (len(part), len(FEATURE_COLUMNS)))
+        replicas.append(part)
+
+    os.makedirs(BENCH_DIR, exist_ok=True)
+    tmp = f'{target}.{os.getpid()}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(header)
+        pd.concat(replicas, ignore_index=True).to_csv(f, index=False)
+    os.replace(tmp, target)
+    return target
+
+
+class Inputs:
+    """Fixtures shared by the benchmarks, built on first use and outside any timed region."""
+
+    def __init__(self):
+        self._memo = {}
+
+    def _get(self, key, build):
+        if key not in self._memo:
+            self._memo[key] = build()
+        return self._memo[key]
+
+    def catalog_file(self, scale):
+        return self._get(('file', scale), lambda: synthetic_catalog(scale))
+
+    def catalog(self, scale):
+        from catalog_store import read_catalog_csv
+        return self._get(('catalog', scale), lambda: read_catalog_csv(self.catalog_file(scale), low_memory=False))
+
+    def training_set(self):
+        def build():
+            from sklearn.preprocessing import StandardScaler
+            from feature_pipeline import clean
+            df = clean(self.catalog(1))
+            return StandardScaler().fit_transform(df[FEATURE_COLUMNS]), df['y'].to_numpy()
+        return self._get('training_set', build)
+
+    def models(self):
+        def build():
+            import joblib
+            from mlp_numpy import NumpyMLP
+            return joblib.load('mlp_exoplanet_model.pkl'), joblib.load('scaler_object.pkl'), NumpyMLP.load()
+        return self._get('models', build)
+
+    def feature_rows(self, n_rows):
+        def build():
+            _, scaler, _ = self.models()
+            rng = np.random.default_rng(n_rows)
+            return scaler.mean_ + rng.standard_normal((n_rows, len(FEATURE_COLUMNS))) * scaler.scale_
+        return self._get(('rows', n_rows), build)
+
+    def scored(self, scale):
+        def build():
+            from feature_pipeline import clean
+            df = clean(self.catalog(scale))
+            df['confidence'] = np.random.default_rng(scale).random(len(df))
+            return df
+        return self._get(('scored', scale), build)
+
+    def stars(self, scale):
+        def build():
+            return self.catalog(scale)[STAR_COLUMNS].drop_duplicates(subset=['kepid']).dropna(subset=['koi_srad'])
+        return self._get(('stars', scale), build)
+
+
+# --- 2. The Benchmarks ---
+# Each entry takes (inputs, param) and returns the zero-argument callable to time,
+# so fixture setup never counts towards the measurement.
+BENCHMARKS = {}
+
+
+def benchmark(name, params=(None,), warmup=True):
+    def register(setup):
+        BENCHMARKS[name] = (setup, params, warmup)
+        return setup
+    return register
+
+
+@benchmark('load.csv_skiprows53', params=CATALOG_SCALES)
+def bench_load_skiprows(inputs, scale):
+    import pandas as pd
+    path = inputs.catalog_file(scale)
+    return lambda: pd.read_csv(path, skiprows=LEGACY_SKIP_ROWS, low_memory=False)
+
+
+@benchmark('load.parquet_cache_columns', params=CATALOG_SCALES)
+def bench_load_cached(inputs, scale):
+    from catalog_store import build_cache, load_catalog
+    path = inputs.catalog_file(scale)
+    build_cache(path)
+    columns = ['kepid', 'kepoi_name', TARGET_COLUMN] + FEATURE_COLUMNS
+    return lambda: load_catalog(path, columns=columns)
+
+
+@benchmark('clean.vectorised', params=CATALOG_SCALES)
+def bench_clean(inputs, scale):
+    from feature_pipeline import clean
+    df = inputs.catalog(scale)
+    return lambda: clean(df)
+
+
+@benchmark('clean.legacy_apply', params=CATALOG_SCALES)
+def bench_clean_legacy(inputs, scale):
+    # The row-wise label encoding create_model.py used before feature_pipeline.clean.
+    df = inputs.catalog(scale)
+
+    def run():
+        out = df.dropna(subset=FEATURE_COLUMNS).copy()
+        out['y'] = out[TARGET_COLUMN].apply(lambda x: 1 if x == 'CANDIDATE' else 0)
+        return out
+    return run
+
+
+@benchmark('train.mlp_fit', params=('legacy', 'fast'), warmup=False)  # seconds per fit; no warm-up run
+def bench_fit(inputs, profile):
+    from training import train_model
+    X, y = inputs.training_set()
+    return lambda: train_model(X, y, profile)
+
+
+@benchmark('score.sklearn_predict_proba', params=SCORE_ROWS)
+def bench_score_sklearn(inputs, n_rows):
+    mlp, scaler, _ = inputs.models()
+    X = inputs.feature_rows(n_rows)
+    return lambda: mlp.predict_proba(scaler.transform(X))
+
+
+@benchmark('score.numpy_predict_proba', params=SCORE_ROWS)
+def bench_score_numpy(inputs, n_rows):
+    _, _, engine = inputs.models()
+    X = inputs.feature_rows(n_rows)
+    return lambda: engine.predict_proba(X)
+
+
+@benchmark('candidates.filter_sort', params=CATALOG_SCALES)
+def bench_candidates(inputs, scale):
+    from catalog_store import CONFIDENCE_THRESHOLD
+    df = inputs.scored(scale)
+    return lambda: df[(df[TARGET_COLUMN] == 'FALSE POSITIVE') & (df['confidence'] >= CONFIDENCE_THRESHOLD)] \
+        .sort_values(by='confidence', ascending=False)
+
+
+@benchmark('candidates.store_threshold', params=CATALOG_SCALES)
+def bench_store(inputs, scale):
+    from confidence_store import ConfidenceStore
+    scored = inputs.scored(scale).assign(mission='Kepler')  # raw KOI table, so one mission
+    store = ConfidenceStore(scored.sort_values('confidence', ascending=False, ignore_index=True))
+    partitions = store.select(dispositions=['FALSE POSITIVE'])
+    return lambda: store.rows(0.8, partitions, limit=1000)
+
+
+@benchmark('render.galaxy_lod_build', params=CATALOG_SCALES)
+def bench_lod(inputs, scale):
+    from galaxy_lod import build_lod
+    stars = inputs.stars(scale)
+    return lambda: build_lod(stars)
+
+
+@benchmark('render.galaxy_figure', params=CATALOG_SCALES)
+def bench_galaxy(inputs, scale):
+    from galaxy_lod import build_lod, galaxy_figure
+    lod = build_lod(inputs.stars(scale))
+    return lambda: galaxy_figure(lod, None).to_json()
+
+
+@benchmark('render.system_figure')
+def bench_system(inputs, _):
+    from galaxy_lod import system_figure
+    planets = inputs.scored(1)
+    busiest = planets['kepid'].value_counts().index[0]
+    system = planets[planets['kepid'] == busiest]
+    return lambda: system_figure(1.0, system, busiest).to_json()
+
+
+# --- 3. Timing ---
+def time_callable(fn, min_time=MIN_TIME, max_repeats=MAX_REPEATS, warmup=True):
+    """An untimed warm-up call, then repeat until `min_time` has elapsed. Seconds per call."""
+    if warmup:
+        fn()
+    samples = []
+    while len(samples) < max_repeats and (not samples or sum(samples) < min_time):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    samples = np.asarray(samples)
+    return {'median': float(np.median(samples)), 'min': float(samples.min()),
+            'max': float(samples.max()), 'repeats': int(len(samples))}
+
+
+def case_name(name, param):
+    return name if param is None else f'{name}[{param}]'
+
+
+def run_suite(pattern=None, quick=False, min_time=MIN_TIME):
+    inputs, results = Inputs(), {}
+    for name, (setup, params, warmup) in BENCHMARKS.items():
+        for param in params:
+            if quick and param in (1_000_000, 10):
+                continue
+            case = case_name(name, param)
+            if pattern and pattern not in case:
+                continue
+            result = time_callable(setup(inputs, param), min_time=min_time, warmup=warmup)
+            results[case] = result
+            print(f"  {case:45s} {result['median'] * 1000:10.2f} ms  (min {result['min'] * 1000:.2f}, n={result['repeats']})")
+    return results
+
+
+# --- 4. History and Regression Report ---
+def _git(*args):
+    try:
+        return subprocess.run(['git', *args], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def record(results, path=HISTORY_FILE):
+    entry = {
+        'commit': _git('rev-parse', '--short', 'HEAD'),
+        'dirty': bool(_git('status', '--porcelain', '--untracked-files=no')),
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'results': results,
+    }
+    with open(path, 'a') as f:
+        f.write(json.dumps(entry) + '\n')
+    return entry
+
+
+def load_history(path=HISTORY_FILE):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def compare(previous, current, ratio=REGRESSION_RATIO):
+    """Print each case's median against the previous run; return the cases that regressed."""
+    regressions = []
+    print(f"\nCompared with {previous['commit']}{' (dirty)' if previous.get('dirty') else ''} at {previous['timestamp']}:")
+    for case, result in current['results'].items():
+        before = previous['results'].get(case)
+        if before is None:
+            continue
+        change = result['median'] / max(before['median'], 1e-12)
+        flag = 'SLOWER' if change > ratio else ('faster' if change < 1 / ratio else '')
+        if flag == 'SLOWER':
+            regressions.append(case)
+        print(f"  {case:45s} {change:6.2f}x  {flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time ExoSight's hot paths and keep a JSON history across commits.")
+    parser.add_argument('-k', '--filter', help="Only run cases whose name contains this")
+    parser.add_argument('--quick', action='store_true', help="Skip the 1M-row and 10x-catalog cases")
+    parser.add_argument('--min-time', type=float, default=MIN_TIME)
+    parser.add_argument('--history', default=HISTORY_FILE)
+    parser.add_argument('--no-record', action='store_true', help="Don't append this run to the history")
+    parser.add_argument('--check', action='store_true', help=f"Exit 1 if any case is {REGRESSION_RATIO}x slower than last run")
+    args = parser.parse_args(argv)
+
+    history = load_history(args.history)
+    results = run_suite(args.filter, args.quick, args.min_time)
+    current = {'commit': _git('rev-parse', '--short', 'HEAD'), 'timestamp': 'now', 'results': results}
+    if not args.no_record:
+        current = record(results, args.history)
+
+    regressions = compare(history[-1], current) if history else []
+    if args.check and regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# catalog_store.py (Cached columnar loader for the NASA Exoplanet Archive CSVs)
+import os
+import hashlib
+import importlib.util
+
+# --- 1. Catalog Files and Shared Column Names ---
+KEPLER_FILE = "cumulative_2025.10.03_00.23.38.csv"
+CACHE_DIR = ".catalog_cache"
+
+ID_COLUMNS = ['kepid', 'kepoi_name']
+TARGET_COLUMN = 'koi_pdisposition'
+FEATURE_COLUMNS = [
+    'koi_period', 'koi_prad', 'koi_teq',
+    'koi_duration', 'koi_impact', 'koi_insol'
+]
+STAR_COLUMNS = ['kepid', 'koi_srad', 'koi_steff']
+
+# FALSE POSITIVE objects scored at or above this are written to the candidate file.
+CANDIDATE_FILE = 'ai_identified_candidates.csv'
+CONFIDENCE_THRESHOLD = 0.80
+
+# Parquet engine for the cache. Checked without importing it, and pandas is imported
+# inside the loaders, so pulling in the column constants above stays cheap.
+HAS_PARQUET = importlib.util.find_spec('pyarrow') is not None
+
+# Digests are memoised per (path, size, mtime) so a long-running worker hashes each file once.
+_digest_memo = {}
+
+
+# --- 2. Header Detection and Hashing ---
+def count_header_rows(path):
+    """Number of leading '#' metadata lines the archive puts above the real header."""
+    count = 0
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.startswith('#'):
+                break
+            count += 1
+    return count
+
+
+def file_digest(path):
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if key not in _digest_memo:
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                h.update(block)
+        _digest_memo[key] = h.hexdigest()
+    return _digest_memo[key]
+
+
+def dataset_version(*paths):
+    """Short content hash over several files; changes whenever any of them is rewritten."""
+    return '-'.join(file_digest(p)[:12] if os.path.exists(p) else 'missing' for p in paths)
+
+
+def cache_path(path):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(CACHE_DIR, f"{stem}-{file_digest(path)[:16]}.parquet")
+
+
+# --- 3. Parsing and Cache Building ---
+def read_catalog_csv(path, columns=None, **kwargs):
+    """Parse the raw archive CSV, skipping however many metadata rows it has."""
+    import pandas as pd
+    return pd.read_csv(path, skiprows=count_header_rows(path), usecols=columns, **kwargs)
+
+
+def build_cache(path):
+    """Parse the CSV once and write every column to a typed Parquet file next to it."""
+    target = cache_path(path)
+    if os.path.exists(target):
+        return target
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    df = read_catalog_csv(path, low_memory=False)
+    tmp = f"{target}.{os.getpid()}.tmp"
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, target)  # atomic, so concurrent workers never see half a file
+    return target
+
+
+# --- 4. Public Loader ---
+def load_catalog(path=KEPLER_FILE, columns=None):
+    """
+    Load a NASA archive catalog, reading only `columns` from the Parquet cache.
+    Falls back to parsing the CSV directly when pyarrow is not installed.
+    """
+    if not HAS_PARQUET:
+        return read_catalog_csv(path, columns=columns)
+    import pandas as pd
+    return pd.read_parquet(build_cache(path), columns=columns)
+
+
+if __name__ == "__main__":
+    import sys
+    for csv_file in sys.argv[1:] or [KEPLER_FILE]:
+        print(f"Cached {csv_file} -> {build_cache(csv_file)}")
@@ -0,0 +1,181 @@
+# confidence_store.py (Every scored object sorted by confidence, for any-threshold, top-k and histogram queries)
+import os
+import argparse
+import numpy as np
+from catalog_store import TARGET_COLUMN, FEATURE_COLUMNS, dataset_version
+from mission_catalogs import MISSION_COLUMN
+
+STORE_FILE = 'confidence_store.parquet'
+STORE_COLUMNS = [MISSION_COLUMN, 'kepid', 'kepoi_name', TARGET_COLUMN, 'confidence'] + FEATURE_COLUMNS
+PARTITION_COLUMNS = [MISSION_COLUMN, TARGET_COLUMN]
+OPTIONAL_COLUMNS = ['uncertainty']  # present when the scoring model is an ensemble
+
+
+# --- 1. Building (training side) ---
+def build_store(scored, path=STORE_FILE):
+    """Write every scored row, highest confidence first, to one Parquet file (atomically)."""
+    columns = STORE_COLUMNS + [c for c in OPTIONAL_COLUMNS if c in scored.columns]
+    store = scored[columns].sort_values('confidence', ascending=False, kind='stable', ignore_index=True)
+    store[MISSION_COLUMN] = store[MISSION_COLUMN].astype(str)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    store.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+    return len(store)
+
+
+def score_rows(df, model=None):
+    """
+    Add 'confidence' (and 'uncertainty', for an ensemble) to `df` in place with the active
+    registry model. Every catalog-level score (create, refresh, store rebuilds, BLS
+    detections) goes through here, so they all come from the model the app serves.
+    """
+    if model is None:
+        from model_registry import load_current
+        model = load_current()
+    X = df[FEATURE_COLUMNS].to_numpy(np.float64)
+    if hasattr(model, 'predict_with_uncertainty'):
+        df['confidence'], df['uncertainty'], _ = model.predict_with_uncertainty(X)
+    else:
+        df['confidence'] = model.predict_proba(X)[:, 1]
+    return df
+
+
+def score_catalogs(missions=('Kepler', 'TESS'), model=None):
+    """Score every cleaned object with the active registry model, without retraining."""
+    from mission_catalogs import load_unified
+    from feature_pipeline import clean
+    return score_rows(clean(load_unified(missions)), model)
+
+
+def ensure_store(path=STORE_FILE):
+    """Path to the store, scoring the catalogs with the current model first if it doesn't exist yet."""
+    if not os.path.exists(path):
+        build_store(score_catalogs(), path)
+    return path
+
+
+# --- 2. Queries ---
+class ConfidenceStore:
+    """
+    Rows sorted by confidence (highest first) plus, for each (mission, disposition)
+    partition, the ascending row positions that belong to it. Because the whole table
+    is in confidence order, "confidence >= t" is the prefix [0, n) found by one binary
+    search, and inside a partition it is that partition's positions below n (a second
+    binary search). Counts cost O(log n); returning k rows costs O(log n + k).
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self.confidence = df['confidence'].to_numpy()
+        self._descending = -self.confidence  # ascending copy for searchsorted
+        groups = df.groupby(PARTITION_COLUMNS, observed=True, sort=True).indices
+        self.partitions = {key: np.asarray(pos, dtype=np.int64) for key, pos in groups.items()}
+
+    def __len__(self):
+        return len(self.df)
+
+    def missions(self):
+        return sorted({mission for mission, _ in self.partitions})
+
+    def select(self, missions=None, dispositions=None):
+        """Partition keys for the given missions and dispositions (None means all of them)."""
+        return [key for key in self.partitions
+                if (missions is None or key[0] in missions) and (dispositions is None or key[1] in dispositions)]
+
+    def cut(self, threshold):
+        """Length of the prefix with confidence >= threshold."""
+        return int(np.searchsorted(self._descending, -threshold, side='right'))
+
+    def positions(self, threshold=0.0, partitions=None, within=None, limit=None):
+        """
+        Ascending (so highest-confidence-first) positions with confidence >= threshold,
+        restricted to `partitions` and to the sorted positions `within` (e.g. search hits).
+        """
+        n = self.cut(threshold)
+        if partitions is None:
+            pos = np.arange(n) if within is None else np.asarray(within, dtype=np.int64)
+            pos = pos[pos < n]
+        else:
+            # With a limit, each partition's first `limit` rows are enough for the overall top-k.
+            take = None if within is not None else limit
+            parts = [p[:np.searchsorted(p, n)][:take] for p in (self.partitions[key] for key in partitions)]
+            pos = np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+            if within is not None:
+                pos = np.intersect1d(pos, within, assume_unique=True)
+        return pos if limit is None else pos[:limit]
+
+    def count(self, threshold=0.0, partitions=None, within=None):
+        n = self.cut(threshold)
+        if within is not None:
+            return len(self.positions(threshold, partitions, within))
+        if partitions is None:
+            return n
+        return sum(int(np.searchsorted(self.partitions[key], n)) for key in partitions)
+
+    def rows(self, threshold=0.0, partitions=None, within=None, limit=None):
+        """Matching rows, highest confidence first. The unrestricted case is a prefix view."""
+        if partitions is None and within is None:
+            n = self.cut(threshold)
+            return self.df.iloc[:n if limit is None else min(n, limit)]
+        return self.df.iloc[self.positions(threshold, partitions, within, limit)]
+
+    def top_k(self, k, partitions=None, within=None):
+        return self.rows(-np.inf, partitions, within, limit=k)
+
+    def histogram(self, edges, partitions=None):
+        """Objects per bin [edges[i], edges[i+1]), last bin closed: one count() per edge."""
+        at_or_above = np.array([self.count(edge, partitions) for edge in edges])
+        counts = at_or_above[:-1] - at_or_above[1:]
+        counts[-1] += at_or_above[-1]
+        return counts
+
+
+def open_store(path=STORE_FILE):
+    """The store memory-mapped from shared memory (see shared_catalogs.py), one copy for all workers."""
+    import pandas as pd
+    from shared_catalogs import shared_frame
+    return ConfidenceStore(shared_frame('confidence_store', dataset_version(path), lambda: pd.read_parquet(path)))
+
+
+# --- 3. Self-check Against Brute-force Masks ---
+def check(store, n_trials=200, seed=0):
+    rng = np.random.default_rng(seed)
+    keys = list(store.partitions)
+    part_of = store.df[MISSION_COLUMN].astype(str) + '|' + store.df[TARGET_COLUMN].astype(str)
+    for _ in range(n_trials):
+        t = float(rng.random())
+        chosen = [keys[i] for i in np.flatnonzero(rng.random(len(keys)) < 0.5)] if rng.random() < 0.8 else None
+        within = np.sort(rng.choice(len(store), rng.integers(0, 200), replace=False)) if rng.random() < 0.3 else None
+        mask = store.confidence >= t
+        if chosen is not None:
+            mask &= part_of.isin([f'{m}|{d}' for m, d in chosen]).to_numpy()
+        expected = np.flatnonzero(mask)
+        if within is not None:
+            expected = np.intersect1d(expected, within)
+        k = int(rng.integers(1, 50))
+        if not (np.array_equal(store.positions(t, chosen, within), expected)
+                and store.count(t, chosen, within) == len(expected)
+                and np.array_equal(store.positions(t, chosen, within, limit=k), expected[:k])):
+            raise AssertionError(f"query mismatch at t={t:.3f}, partitions={chosen}")
+    edges = np.linspace(0.0, 1.0, 11)
+    if store.histogram(edges).sum() != len(store):
+        raise AssertionError("histogram does not cover every row")
+    return n_trials
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild or check the sorted confidence store.")
+    parser.add_argument('--rebuild', action='store_true', help="Re-score every object with the current model")
+    parser.add_argument('--check', action='store_true', help="Compare queries against brute-force masks")
+    args = parser.parse_args(argv)
+    if args.rebuild or not os.path.exists(STORE_FILE):
+        print(f"Scored {build_store(score_catalogs())} objects into {STORE_FILE}")
+    store = open_store()
+    for key, pos in store.partitions.items():
+        print(f"  {key[0]:7s} {key[1]:15s} {len(pos):6d} objects, {store.count(0.8, [key]):5d} at >= 0.80")
+    if args.check:
+        print(f"{check(store)} random queries match brute-force masks")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,33 @@
 # create_model.py (Modified to find more candidates)
-import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
-from sklearn.neural_network import MLPClassifier
+import numpy as np
 import joblib
+from catalog_store import FEATURE_COLUMNS, CANDIDATE_FILE, CONFIDENCE_THRESHOLD
+from mission_catalogs import MISSION_COLUMN, load_unified
+from feature_pipeline import clean
+from mlp_numpy import NumpyMLP, export_weights
+from incremental_update import SCALER_COLUMN, SPLIT_COLUMN, save_snapshot
+from confidence_store import build_store, score_rows
+from attributions import build_attributions
+from ensemble import ENSEMBLE_MEMBERS_FILE, fit_and_evaluate, format_metrics
+from model_registry import publish_ensemble
+from training import train_model, DEFAULT_PROFILE
 
-# --- 1. Data Import ---
-KEPLER_FILE = "cumulative_2025.10.03_00.23.38.csv"
-SKIP_ROWS = 53
+# --- 1. Feature and Target Selection (CRITICAL FIX: Including ID Columns) ---
+# Every mission is mapped onto the KOI columns, so the model sees one schema.
+MISSIONS = ('Kepler', 'TESS')
 
+# --- 2. Data Import (only the selected columns, read from the columnar cache) ---
 try:
-    df = pd.read_csv(KEPLER_FILE, skiprows=SKIP_ROWS)
+    df_model = load_unified(MISSIONS)
     print("1. Data Imported Successfully.")
 except Exception as e:
-    print(f"Error loading data: {e}. Check file name and skiprows value.")
+    print(f"Error loading data: {e}. Check the catalog file names.")
     exit()
 
-# --- 2. Feature and Target Selection (CRITICAL FIX: Including ID Columns) ---
-ID_COLUMNS = ['kepid', 'kepoi_name'] 
-TARGET_COLUMN = 'koi_pdisposition'
-FEATURE_COLUMNS = [
-    'koi_period', 'koi_prad', 'koi_teq',  
-    'koi_duration', 'koi_impact', 'koi_insol'
-]
-
-# Select all required columns
-ALL_COLUMNS = ID_COLUMNS + [TARGET_COLUMN] + FEATURE_COLUMNS
-df_model = df[ALL_COLUMNS].copy()
-
 # --- 3. Data Cleaning ---
-df_model.dropna(subset=FEATURE_COLUMNS, inplace=True)
-df_model['y'] = df_model[TARGET_COLUMN].apply(lambda x: 1 if x == 'CANDIDATE' else 0)
+df_model = clean(df_model)  # vectorised dropna + label encoding, shared with the streaming pipeline
 print(f"3. Shape after cleaning: {df_model.shape}")
 
 # --- 4. Data Splitting and Scaling ---
@@ -43,32 +40,60 @@ X_test_scaled = scaler.transform(X_test)
 print("4. Data preparation complete.")
 
 # --- 5. MLP Training ---
-mlp = MLPClassifier(hidden_layer_sizes=(16, 16), max_iter=500, random_state=42)
-mlp.fit(X_train_scaled, y_train)
-print("5. MLP Training Complete.")
+# float32, batches of 512 and early stopping on validation log-loss (training.py);
+# `python training.py` compares this against the old 500-epoch float64 setup.
+mlp = train_model(X_train_scaled, y_train, DEFAULT_PROFILE)
+print(f"5. MLP Training Complete ({DEFAULT_PROFILE} profile, {mlp.n_iter_} epochs).")
 
 # --- 6. Save Model and Scaler ---
 joblib.dump(mlp, 'mlp_exoplanet_model.pkl')
 joblib.dump(scaler, 'scaler_object.pkl')
-print("6. Model and Scaler saved.")
+export_weights(mlp, scaler)  # sklearn-free fallback for trees without a registry
+print(f"6. Model and Scaler saved (test accuracy {mlp.score(X_test_scaled, y_test):.2%}).")
 
 # --- 7. Identify New High-Confidence Candidates ---
-X_all_scaled = scaler.transform(X)
-df_model['confidence'] = mlp.predict_proba(X_all_scaled)[:, 1]
+# The served model is a calibrated seed ensemble (ensemble.py): confidence is the calibrated
+# mean over members and uncertainty their spread. It is published to the registry, so
+# /predict, the Live tool, sweeps, BLS detections and the catalogs all use the same scores;
+# the members are kept so incremental_update.py can warm-start them.
+# Both models' test metrics go into the manifest, so any accuracy the ensemble gives up for
+# its uncertainty estimate is recorded (and printed) rather than silent.
+ensemble, metrics = fit_and_evaluate(X_train, y_train, X_test, y_test, scaler, single=NumpyMLP.load())
+joblib.dump({'members': ensemble.members, 'scaler': scaler}, ENSEMBLE_MEMBERS_FILE)
+version = publish_ensemble(ensemble, scaler, metrics)
+print(f"7. Ensemble published (registry version {version}): {format_metrics(metrics)}.")
+score_rows(df_model)
 
 # ----- THE CRITICAL MODIFICATION IS HERE -----
 # আমরা কনফিডেন্স থ্রেশহোল্ড ০.৯০ থেকে কমিয়ে ০.৮০ করেছি
 new_candidates = df_model[
     (df_model['koi_pdisposition'] == 'FALSE POSITIVE') & 
-    (df_model['confidence'] >= 0.80)  # <-- পরিবর্তন করা হয়েছে
+    (df_model['confidence'] >= CONFIDENCE_THRESHOLD)  # <-- পরিবর্তন করা হয়েছে
 ].sort_values(by='confidence', ascending=False)
-print(f"7. Identified {len(new_candidates)} new candidates.")
+print(f"   Identified {len(new_candidates)} new candidates ({ensemble.n_members}-member calibrated ensemble).")
 
 # --- 8. Save Candidate List for the Web App (FINAL STEP) ---
 columns_for_app = [
-    'kepid', 'koi_pdisposition', 'confidence', 'koi_period', 'koi_prad', 
+    MISSION_COLUMN, 'kepid', 'kepoi_name', 'koi_pdisposition', 'confidence', 'uncertainty', 'koi_period', 'koi_prad', 
     'koi_teq', 'koi_duration', 'koi_impact', 'koi_insol'
 ]
 candidates_to_save = new_candidates[columns_for_app].copy()
-candidates_to_save.to_csv('ai_identified_candidates.csv', index=False)
-print("8. SUCCESS: Corrected 'ai_identified_candidates.csv' file has been saved.")
\ No newline at end of file
+candidates_to_save.to_csv(CANDIDATE_FILE, index=False)
+print("8. SUCCESS: Corrected 'ai_identified_candidates.csv' file has been saved.")
+
+# --- 9. Snapshot for Incremental Refreshes (see incremental_update.py) ---
+# Which split each row fed: the members' training rows, the calibration holdout or the test split.
+# Refreshes replay only 'fit' rows, re-fit the calibration on 'calibration' rows and score on 'test'.
+df_model[SPLIT_COLUMN] = 'test'
+df_model.loc[X_train.index, SPLIT_COLUMN] = np.where(ensemble.calibration_rows, 'calibration', 'fit')
+df_model[SCALER_COLUMN] = df_model.index.isin(X_train.index)  # the rows the scaler statistics came from
+save_snapshot(df_model)
+print("9. Snapshot saved for incremental refreshes.")
+
+# --- 10. Confidence Store (every scored object, so the app can use any threshold) ---
+build_store(df_model)
+print("10. Confidence store saved.")
+
+# --- 11. Feature Attributions (precomputed so the System View can explain any candidate instantly) ---
+attribution_info = build_attributions()
+print(f"11. Attributions saved for {attribution_info['rows']} candidates.")
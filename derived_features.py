@@ -0,0 +1,235 @@
+# derived_features.py (Physics-derived KOI features, registered declaratively and cached per dataset version)
+import os
+import argparse
+import numpy as np
+from catalog_store import KEPLER_FILE, ID_COLUMNS, dataset_version
+
+FEATURE_CACHE_DIR = '.feature_cache'
+
+R_SUN_CM = 6.957e10
+R_EARTH_CM = 6.371e8
+G_CGS = 6.674e-8
+SECONDS_PER_DAY = 86400.0
+KEPLER_BASELINE_DAYS = 1470.0  # Q0-Q17 span; sets how many transits a period allows
+
+
+# --- 1. Vectorised Feature Functions ---
+# Each takes a dict-like of columns (raw catalog columns and already computed features)
+# and returns one float64 array. Nothing here loops over rows.
+def _col(cols, name):
+    return np.asarray(cols[name], dtype=np.float64)
+
+
+def _log_ratio(a, b):
+    """log10(a / b), NaN where either side is missing or not positive (e.g. a zero catalog depth)."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where((a > 0) & (b > 0), np.log10(a / b), np.nan)
+
+
+def _radius_ratio(cols):
+    return _col(cols, 'koi_prad') * R_EARTH_CM / (_col(cols, 'koi_srad') * R_SUN_CM)
+
+
+def _depth_consistency(cols):
+    """log10(observed depth / (Rp/R*)^2). Near 0 for a clean planet; blends and grazing EBs stray."""
+    expected_ppm = _col(cols, 'radius_ratio') ** 2 * 1e6
+    return _log_ratio(_col(cols, 'koi_depth'), expected_ppm)
+
+
+def _transit_density(cols):
+    """
+    Stellar density (g/cm^3) implied by the transit shape for a circular orbit:
+    a/R* = P / (pi T) * sqrt((1 + k)^2 - b^2) and rho* = 3 pi (a/R*)^3 / (G P^2).
+    """
+    period_s = _col(cols, 'koi_period') * SECONDS_PER_DAY
+    duration_s = _col(cols, 'koi_duration') * 3600.0
+    chord = np.sqrt(np.clip((1 + _col(cols, 'radius_ratio')) ** 2 - _col(cols, 'koi_impact') ** 2, 0.0, None))
+    a_over_r = period_s / (np.pi * duration_s) * chord
+    return 3 * np.pi * a_over_r ** 3 / (G_CGS * period_s ** 2)
+
+
+def _density_mismatch(cols):
+    """log10(transit density / density from the catalog's log g and radius); far from 0 suggests a false positive."""
+    r_star = _col(cols, 'koi_srad') * R_SUN_CM
+    spectroscopic = 3 * 10 ** _col(cols, 'koi_slogg') / (4 * np.pi * G_CGS * r_star)
+    return _log_ratio(_col(cols, 'transit_density'), spectroscopic)
+
+
+def _n_transits(cols):
+    return np.maximum(np.floor(KEPLER_BASELINE_DAYS / _col(cols, 'koi_period')), 1.0)
+
+
+def _snr_per_transit(cols):
+    return _col(cols, 'koi_model_snr') / np.sqrt(_col(cols, 'n_transits'))
+
+
+def _error_normalized(column):
+    """value / mean(|upper|, |lower|) uncertainty: how many sigma the measurement is from zero."""
+    def compute(cols):
+        sigma = 0.5 * (np.abs(_col(cols, f'{column}_err1')) + np.abs(_col(cols, f'{column}_err2')))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(sigma > 0, _col(cols, column) / sigma, np.nan)
+    return compute
+
+
+# --- 2. Declarative Registry ---
+# 'requires' names raw catalog columns or other derived features; dependencies are resolved
+# and computed first. Adding a feature is a new entry here. The koi_fpflag_* columns are
+# deliberately absent: they are the vetting outcome behind koi_pdisposition, so using them
+# as inputs would leak the label.
+DERIVED_FEATURES = {
+    'radius_ratio': {'requires': ['koi_prad', 'koi_srad'], 'compute': _radius_ratio},
+    'depth_consistency': {'requires': ['koi_depth', 'radius_ratio'], 'compute': _depth_consistency},
+    'transit_density': {'requires': ['koi_period', 'koi_duration', 'koi_impact', 'radius_ratio'],
+                        'compute': _transit_density},
+    'density_mismatch': {'requires': ['transit_density', 'koi_slogg', 'koi_srad'], 'compute': _density_mismatch},
+    'n_transits': {'requires': ['koi_period'], 'compute': _n_transits},
+    'snr_per_transit': {'requires': ['koi_model_snr', 'n_transits'], 'compute': _snr_per_transit},
+}
+for _column in ('koi_depth', 'koi_duration', 'koi_prad', 'koi_impact', 'koi_period'):
+    DERIVED_FEATURES[f'{_column}_significance'] = {
+        'requires': [_column, f'{_column}_err1', f'{_column}_err2'], 'compute': _error_normalized(_column)}
+
+
+def resolve(names):
+    """(derived features in dependency order, raw catalog columns they need) for the requested names."""
+    order, raw, seen = [], set(), set()
+
+    def visit(name, chain=()):
+        if name in chain:
+            raise ValueError(f"circular feature dependency: {' -> '.join(chain + (name,))}")
+        if name in seen:
+            return
+        if name not in DERIVED_FEATURES:
+            raw.add(name)
+            return
+        for dependency in DERIVED_FEATURES[name]['requires']:
+            visit(dependency, chain + (name,))
+        seen.add(name)
+        order.append(name)
+
+    for name in names:
+        visit(name)
+    return order, sorted(raw)
+
+
+def compute_features(df, names):
+    """Only the requested features (and what they depend on), computed column-wise from `df`."""
+    order, raw = resolve(names)
+    missing = [c for c in raw if c not in df.columns]
+    if missing:
+        raise KeyError(f"features {list(names)} need catalog columns {missing}")
+    cols = {c: df[c].to_numpy() for c in raw}
+    for name in order:
+        cols[name] = DERIVED_FEATURES[name]['compute'](cols)
+    return {name: cols[name] for name in names}
+
+
+# --- 3. Per-version Cache Shared by Training and Comparison ---
+_memo = {}
+
+
+def _cache_file(version, name, cache_dir):
+    return os.path.join(cache_dir, version, f'{name}.npy')
+
+
+def load_features(names, path=KEPLER_FILE, cache_dir=FEATURE_CACHE_DIR):
+    """
+    ID columns plus the requested features for every row of the catalog at `path`, in file
+    order. Each feature is computed once per dataset version and saved as .npy; later calls
+    read the arrays (memory-mapped) instead of recomputing.
+    """
+    import pandas as pd
+    from catalog_store import load_catalog
+    version = dataset_version(path)
+    names = list(names)
+
+    arrays = {}
+    todo = []
+    for name in names:
+        key = (cache_dir, version, name)
+        if key in _memo:
+            arrays[name] = _memo[key]
+        elif os.path.exists(_cache_file(version, name, cache_dir)):
+            arrays[name] = _memo[key] = np.load(_cache_file(version, name, cache_dir), mmap_mode='r')
+        else:
+            todo.append(name)
+
+    if todo:
+        _, raw = resolve(todo)
+        os.makedirs(os.path.join(cache_dir, version), exist_ok=True)
+        for name, values in compute_features(load_catalog(path, columns=raw), todo).items():
+            target = _cache_file(version, name, cache_dir)
+            tmp = f'{target}.{os.getpid()}.tmp.npy'
+            np.save(tmp, values)
+            os.replace(tmp, target)
+            arrays[name] = _memo[(cache_dir, version, name)] = values
+
+    frame = load_catalog(path, columns=ID_COLUMNS)
+    return pd.concat([frame, pd.DataFrame({name: arrays[name] for name in names})], axis=1)
+
+
+def add_features(df, names, path=KEPLER_FILE, cache_dir=FEATURE_CACHE_DIR):
+    """`df` (rows from the same catalog, with kepoi_name) joined to the cached features by KOI name."""
+    features = load_features(names, path, cache_dir).drop(columns='kepid')
+    return df.merge(features, on='kepoi_name', how='left')
+
+
+def feature_matrix(df, columns, path=KEPLER_FILE, cache_dir=FEATURE_CACHE_DIR):
+    """
+    float64 model inputs for `columns`, which may mix raw catalog columns and registered
+    features. Only the features named are computed (or read from the cache); rows without
+    them come back as NaN.
+    """
+    derived = [c for c in columns if c in DERIVED_FEATURES]
+    if derived:
+        df = add_features(df, derived, path, cache_dir)
+    return df[list(columns)].to_numpy(np.float64)
+
+
+# --- 4. Offline Comparison ---
+def compare(names, seed=42):
+    """Test ROC AUC of the (16, 16) MLP on FEATURE_COLUMNS alone and with `names` added."""
+    from sklearn.model_selection import train_test_split
+    from sklearn.neural_network import MLPClassifier
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.metrics import roc_auc_score
+    from catalog_store import FEATURE_COLUMNS
+    from mission_catalogs import load_mission
+    from feature_pipeline import clean
+    df = clean(load_mission('Kepler'))
+    df = add_features(df, names).dropna(subset=names).reset_index(drop=True)
+    train, test = train_test_split(df, test_size=0.2, random_state=seed, stratify=df['y'])
+    scores = {}
+    for label, columns in (('baseline', FEATURE_COLUMNS), ('derived', FEATURE_COLUMNS + list(names))):
+        model = make_pipeline(StandardScaler(), MLPClassifier(hidden_layer_sizes=(16, 16), max_iter=500,
+                                                              random_state=seed))
+        model.fit(train[columns].to_numpy(np.float64), train['y'])
+        scores[label] = roc_auc_score(test['y'], model.predict_proba(test[columns].to_numpy(np.float64))[:, 1])
+    return scores, len(df)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compute and cache derived KOI features.")
+    parser.add_argument('features', nargs='*', help="Features to build (default: all registered)")
+    parser.add_argument('--list', action='store_true', help="List registered features and their inputs")
+    parser.add_argument('--compare', action='store_true',
+                        help="Train the baseline MLP with and without the features and report test ROC AUC")
+    args = parser.parse_args(argv)
+    if args.list:
+        for name, spec in DERIVED_FEATURES.items():
+            print(f"{name:28s} <- {', '.join(spec['requires'])}")
+        return
+    names = args.features or list(DERIVED_FEATURES)
+    df = load_features(names)
+    print(df[names].describe().T[['count', 'mean', '50%']].to_string())
+    print(f"Cached under {FEATURE_CACHE_DIR}/{dataset_version(KEPLER_FILE)}/")
+    if args.compare:
+        scores, n_rows = compare(names)
+        print(f"Test ROC AUC over {n_rows} KOIs: baseline {scores['baseline']:.4f}, "
+              f"with derived features {scores['derived']:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+# feature_pipeline.py (Streaming, out-of-core cleaning and scaling of the training features)
+import os
+import json
+import argparse
+import numpy as np
+from catalog_store import TARGET_COLUMN, FEATURE_COLUMNS
+from mission_catalogs import iter_mission_chunks
+
+FEATURE_STORE_DIR = '.feature_store'
+DEFAULT_CHUNK_ROWS = 100_000
+
+
+# --- 1. Per-chunk Cleaning (vectorised) ---
+def clean(df):
+    """Drop rows missing a feature or label and add the binary target y (1 = CANDIDATE)."""
+    df = df.dropna(subset=FEATURE_COLUMNS + [TARGET_COLUMN]).copy()
+    df['y'] = (df[TARGET_COLUMN] == 'CANDIDATE').astype(np.int64)
+    return df
+
+
+def iter_clean_chunks(sources, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Cleaned chunks from every (mission, path) source; path None means the mission's
+    default file. Any CSV already in the unified schema, such as a synthetic
+    augmentation written with a Kepler header, can be passed as ('Kepler', path).
+    """
+    for mission, path in sources:
+        for chunk in iter_mission_chunks(mission, path, chunk_rows):
+            cleaned = clean(chunk)
+            if len(cleaned):
+                yield cleaned
+
+
+# --- 2. One-pass Scaler Statistics ---
+class RunningStats:
+    """
+    Column mean/variance merged chunk by chunk (Chan et al.'s parallel form of
+    Welford's update), so the scaler is fitted without holding the catalog in memory.
+    """
+
+    def __init__(self, n_features=len(FEATURE_COLUMNS)):
+        self.n = 0
+        self.mean = np.zeros(n_features)
+        self.m2 = np.zeros(n_features)
+
+    def update(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        n_b = len(X)
+        if n_b == 0:
+            return self
+        mean_b = X.mean(axis=0)
+        m2_b = ((X - mean_b) ** 2).sum(axis=0)
+        n = self.n + n_b
+        delta = mean_b - self.mean
+        self.mean = self.mean + delta * n_b / n
+        self.m2 = self.m2 + m2_b + delta ** 2 * self.n * n_b / n
+        self.n = n
+        return self
+
+    @property
+    def var(self):
+        return self.m2 / self.n if self.n else np.zeros_like(self.m2)
+
+    @property
+    def scale(self):
+        return np.where(self.var > 0, np.sqrt(self.var), 1.0)
+
+    def to_standard_scaler(self):
+        """A fitted sklearn StandardScaler equivalent to fitting on every row seen."""
+        from sklearn.preprocessing import StandardScaler
+        scaler = StandardScaler()
+        scaler.mean_, scaler.var_, scaler.scale_ = self.mean.copy(), self.var.copy(), self.scale.copy()
+        scaler.n_samples_seen_ = self.n
+        scaler.n_features_in_ = len(self.mean)
+        return scaler
+
+
+# --- 3. Building the On-disk Feature Store ---
+def build_feature_store(sources, out_dir=FEATURE_STORE_DIR, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Pass 1 streams the sources to count rows and accumulate scaler statistics.
+    Pass 2 streams them again and writes scaled float32 features and int8 labels
+    into preallocated .npy memmaps. Peak memory is about one chunk.
+    """
+    stats = RunningStats()
+    for chunk in iter_clean_chunks(sources, chunk_rows):
+        stats.update(chunk[FEATURE_COLUMNS].to_numpy(np.float64))
+    if stats.n == 0:
+        raise ValueError("no usable rows in the given sources")
+
+    os.makedirs(out_dir, exist_ok=True)
+    X = np.lib.format.open_memmap(os.path.join(out_dir, 'X.npy'), mode='w+', dtype=np.float32,
+                                  shape=(stats.n, len(FEATURE_COLUMNS)))
+    y = np.lib.format.open_memmap(os.path.join(out_dir, 'y.npy'), mode='w+', dtype=np.int8, shape=(stats.n,))
+    row = 0
+    for chunk in iter_clean_chunks(sources, chunk_rows):
+        block = (chunk[FEATURE_COLUMNS].to_numpy(np.float64) - stats.mean) / stats.scale
+        X[row:row + len(block)] = block
+        y[row:row + len(block)] = chunk['y'].to_numpy()
+        row += len(block)
+    X.flush()
+    y.flush()
+
+    np.savez(os.path.join(out_dir, 'scaler.npz'), mean=stats.mean, var=stats.var, scale=stats.scale, n=stats.n)
+    with open(os.path.join(out_dir, 'meta.json'), 'w') as f:
+        json.dump({'rows': int(stats.n), 'feature_columns': FEATURE_COLUMNS,
+                   'sources': [[m, p] for m, p in sources]}, f, indent=2)
+    return stats
+
+
+def open_feature_store(out_dir=FEATURE_STORE_DIR):
+    """(X, y) as read-only memmaps; slicing them reads only the rows touched."""
+    return (np.load(os.path.join(out_dir, 'X.npy'), mmap_mode='r'),
+            np.load(os.path.join(out_dir, 'y.npy'), mmap_mode='r'))
+
+
+def iter_training_blocks(out_dir=FEATURE_STORE_DIR, block_rows=DEFAULT_CHUNK_ROWS, seed=None):
+    """Contiguous (X, y) blocks for partial_fit, optionally visited in a shuffled block order."""
+    X, y = open_feature_store(out_dir)
+    starts = np.arange(0, len(y), block_rows)
+    if seed is not None:
+        np.random.default_rng(seed).shuffle(starts)
+    for start in starts:
+        yield np.asarray(X[start:start + block_rows]), np.asarray(y[start:start + block_rows])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the scaled, on-disk feature store in one streaming pass.")
+    parser.add_argument('--source', action='append', nargs=2, metavar=('MISSION', 'CSV'),
+                        help="Extra mission-format CSV to include (repeatable)")
+    parser.add_argument('--out', default=FEATURE_STORE_DIR)
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS)
+    args = parser.parse_args(argv)
+    sources = [('Kepler', None), ('TESS', None)] + [tuple(s) for s in args.source or []]
+    stats = build_feature_store(sources, args.out, args.chunk_rows)
+    print(f"Wrote {stats.n} scaled rows to {args.out}/")
+
+
+if __name__ == "__main__":
+    main()
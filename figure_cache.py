@@ -0,0 +1,58 @@
+# figure_cache.py (LRU cache of built Plotly figures, shared across Streamlit reruns and sessions)
+import threading
+from collections import OrderedDict
+import plotly.io as pio
+import telemetry
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_ITEMS = 256
+
+
+class FigureCache:
+    """
+    Keeps built figures keyed by e.g. ('system', data_version, kepid). Entries are
+    evicted least-recently-used first once either the item count or the total
+    serialized size passes its cap. Figures are shared, so callers must not mutate them.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, max_items=DEFAULT_MAX_ITEMS):
+        self.max_bytes = max_bytes
+        self.max_items = max_items
+        self._entries = OrderedDict()  # key -> (figure, size in bytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, key, build):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                telemetry.cache_lookup('figure', hit=True)
+                return self._entries[key][0]
+            self.misses += 1
+        telemetry.cache_lookup('figure', hit=False)
+
+        # Built outside the lock so one slow figure doesn't block other sessions.
+        figure = build()
+        size = len(pio.to_json(figure, validate=False))
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = (figure, size)
+                self._bytes += size
+            while self._entries and (self._bytes > self.max_bytes or len(self._entries) > self.max_items):
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+        return figure
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {'items': len(self._entries), 'bytes': self._bytes, 'hits': self.hits,
+                    'misses': self.misses, 'hit_rate': self.hits / lookups if lookups else 0.0}
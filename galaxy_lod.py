@@ -0,0 +1,161 @@
+# galaxy_lod.py (Level-of-detail rendering for the Galaxy Explorer figures)
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import telemetry
+
+LOD_LEVELS = (16, 32, 64, 128)   # bins per axis, coarse to fine
+MAX_POINTS = 1000                # above this many stars in view, draw bins instead
+MAX_MARKER_SIZE = 20
+THEME = dict(plot_bgcolor='#0d1117', paper_bgcolor='#0d1117', font_color='white')
+
+
+# --- 1. Precomputed Aggregates ---
+def build_lod(stars_df, x='kepid', y='koi_steff', size='koi_srad', levels=LOD_LEVELS):
+    """
+    Sort the stars by x once and bin them at every level. Each bin keeps its edges,
+    star count, mean position and mean stellar radius, so drawing a level is a lookup.
+    """
+    stars = stars_df.dropna(subset=[x, y]).sort_values(x).reset_index(drop=True)
+    xs, ys = stars[x].to_numpy(np.float64), stars[y].to_numpy(np.float64)
+    sizes = stars[size].fillna(0).to_numpy(np.float64)
+
+    lod = {'stars': stars, 'x': xs, 'columns': (x, y, size), 'levels': {},
+           'size_ref': 2.0 * max(sizes.max(), 1e-9) / MAX_MARKER_SIZE ** 2}
+    for n_bins in levels:
+        x_edges = np.linspace(xs.min(), xs.max(), n_bins + 1)
+        y_edges = np.linspace(ys.min(), ys.max(), n_bins + 1)
+        counts, _, _ = np.histogram2d(xs, ys, bins=(x_edges, y_edges))
+        sums = {name: np.histogram2d(xs, ys, bins=(x_edges, y_edges), weights=w)[0]
+                for name, w in (('x', xs), ('y', ys), ('size', sizes))}
+        ix, iy = np.nonzero(counts)
+        n = counts[ix, iy]
+        lod['levels'][n_bins] = pd.DataFrame({
+            'x0': x_edges[ix], 'x1': x_edges[ix + 1], 'y0': y_edges[iy], 'y1': y_edges[iy + 1],
+            'count': n.astype(np.int64), 'x': sums['x'][ix, iy] / n, 'y': sums['y'][ix, iy] / n,
+            'size': sums['size'][ix, iy] / n,
+        })
+    return lod
+
+
+# --- 2. Picking What to Draw ---
+def visible_stars(lod, view=None):
+    """Full-resolution rows inside view=(x0, x1, y0, y1), via searchsorted on the sorted x column."""
+    if view is None:
+        return lod['stars']
+    x0, x1, y0, y1 = view
+    lo = np.searchsorted(lod['x'], x0, side='left')
+    hi = np.searchsorted(lod['x'], x1, side='right')
+    stars = lod['stars'].iloc[lo:hi]
+    y = stars[lod['columns'][1]]
+    return stars[(y >= y0) & (y <= y1)]
+
+
+def visible_bins(lod, view=None, max_points=MAX_POINTS):
+    """Bins of the finest level that still fits in `max_points` markers inside the view."""
+    chosen = None
+    for n_bins in sorted(lod['levels']):
+        bins = lod['levels'][n_bins]
+        if view is not None:
+            x0, x1, y0, y1 = view
+            bins = bins[(bins['x1'] >= x0) & (bins['x0'] <= x1) & (bins['y1'] >= y0) & (bins['y0'] <= y1)]
+        if chosen is not None and len(bins) > max_points:
+            break
+        chosen = bins
+    return chosen
+
+
+# --- 3. Figure ---
+@telemetry.traced('figure.galaxy.build')
+def galaxy_figure(lod, view=None, max_points=MAX_POINTS, title="Kepler Host Stars"):
+    """
+    WebGL scatter of the stars in `view`: every star when few enough are visible,
+    otherwise one marker per aggregated bin. customdata is [kepid] for a star and
+    [x0, x1, y0, y1] for a bin, so a click can either select a star or zoom in.
+    """
+    x_col, y_col, size_col = lod['columns']
+    stars = visible_stars(lod, view)
+    fig = go.Figure()
+    if len(stars) <= max_points:
+        fig.add_trace(go.Scattergl(
+            x=stars[x_col], y=stars[y_col], mode='markers', customdata=stars[[x_col]].to_numpy(),
+            marker=dict(size=stars[size_col].fillna(0), sizemode='area', sizeref=lod['size_ref'], sizemin=2,
+                        color=stars[y_col], colorscale='Plasma', showscale=True, colorbar_title=y_col),
+            hovertemplate="Kepler ID %{x}<br>Teff %{y:.0f} K<extra></extra>", name='Stars',
+        ))
+    else:
+        bins = visible_bins(lod, view, max_points)
+        fig.add_trace(go.Scattergl(
+            x=bins['x'], y=bins['y'], mode='markers', customdata=bins[['x0', 'x1', 'y0', 'y1']].to_numpy(),
+            marker=dict(size=4 + 4 * np.log2(bins['count']), color=bins['y'], colorscale='Plasma',
+                        showscale=True, colorbar_title=y_col, opacity=0.8),
+            text=bins['count'].astype(str) + " stars · click to zoom in",
+            hovertemplate="%{text}<br>Mean Teff %{y:.0f} K<extra></extra>", name='Star bins',
+        ))
+    if view is not None:
+        fig.update_xaxes(range=list(view[:2]))
+        fig.update_yaxes(range=list(view[2:]))
+    fig.update_layout(title=title, xaxis_title="Kepler ID", yaxis_title="Stellar Temperature (K)", **THEME)
+    return fig
+
+
+# --- 4. System View ---
+@telemetry.traced('figure.system.build')
+def system_figure(star_srad, planets, selected_id):
+    """
+    The star at the origin plus its candidate planets along the period axis. Hover text
+    is a client-side template over customdata instead of one Python string per row.
+    """
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=[0], y=[0], mode='markers', marker=dict(size=star_srad * 20, color='yellow'), name=f'Star {selected_id}'))
+    if not planets.empty:
+        names = planets['kepoi_name'].fillna('N/A') if 'kepoi_name' in planets else pd.Series('N/A', index=planets.index)
+        fig.add_trace(go.Scatter(
+            x=planets['koi_period'], y=np.zeros(len(planets)), mode='markers',
+            marker=dict(size=planets['koi_prad'] * 5, color=planets['koi_teq'], colorscale='cividis', showscale=True, colorbar_title='Planet Temp (K)'),
+            customdata=np.column_stack([names.to_numpy(dtype=object), planets['confidence'].to_numpy()]),
+            hovertemplate="Planet: %{customdata[0]}<br>Confidence: %{customdata[1]:.2%}<extra></extra>", name='Planets'
+        ))
+    fig.update_layout(title=f'Planetary System for Star {selected_id}', xaxis_title="Orbital Period (days)", yaxis=dict(visible=False), **THEME)
+    return fig
+
+
+# --- 5. Sky Map ---
+MISSION_COLORS = {'Kepler': '#f2cc60', 'TESS': '#58a6ff'}
+
+
+@telemetry.traced('figure.sky.build')
+def sky_figure(lod, view=None, max_points=MAX_POINTS, title="Host Stars on the Sky"):
+    """
+    RA/Dec map of the hosts in a build_lod(x='ra', y='dec') structure, RA increasing to the
+    left as on the sky. Stars are one trace per mission with customdata [select_kepid]
+    (NaN for a TESS star without a Kepler match); bins carry [x0, x1, y0, y1] as in galaxy_figure.
+    """
+    stars = visible_stars(lod, view)
+    fig = go.Figure()
+    if len(stars) <= max_points:
+        for mission, group in stars.groupby('mission', sort=True):
+            fig.add_trace(go.Scattergl(
+                x=group['ra'], y=group['dec'], mode='markers', customdata=group[['select_kepid']].to_numpy(),
+                marker=dict(size=group['koi_srad'].fillna(0), sizemode='area', sizeref=lod['size_ref'], sizemin=3,
+                            color=MISSION_COLORS.get(mission, 'white'), line_width=0),
+                text=mission + ' ' + group['kepid'].astype(str) + ' · ' + group['n_objects'].astype(str) + ' object(s), '
+                     + group['hz_objects'].astype(str) + ' in HZ',
+                hovertemplate="%{text}<br>RA %{x:.4f}°, Dec %{y:.4f}°<extra></extra>", name=mission,
+            ))
+    else:
+        bins = visible_bins(lod, view, max_points)
+        fig.add_trace(go.Scattergl(
+            x=bins['x'], y=bins['y'], mode='markers', customdata=bins[['x0', 'x1', 'y0', 'y1']].to_numpy(),
+            marker=dict(size=4 + 4 * np.log2(bins['count']), color=np.log10(bins['count']), colorscale='Plasma',
+                        showscale=True, colorbar_title='log10 stars', opacity=0.8),
+            text=bins['count'].astype(str) + " stars · click to zoom in",
+            hovertemplate="%{text}<br>RA %{x:.2f}°, Dec %{y:.2f}°<extra></extra>", name='Star bins',
+        ))
+    if view is not None:
+        fig.update_xaxes(range=[view[1], view[0]])
+        fig.update_yaxes(range=list(view[2:]))
+    else:
+        fig.update_xaxes(autorange='reversed')
+    fig.update_layout(title=title, xaxis_title="Right Ascension (deg)", yaxis_title="Declination (deg)", **THEME)
+    return fig
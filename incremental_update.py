@@ -0,0 +1,205 @@
+# incremental_update.py (Refresh the model from a new archive download without a full rebuild)
+import os
+import argparse
+import numpy as np
+import pandas as pd
+import joblib
+from catalog_store import (TARGET_COLUMN, FEATURE_COLUMNS, CANDIDATE_FILE,
+                           CONFIDENCE_THRESHOLD)
+from mission_catalogs import UNIFIED_COLUMNS, load_unified
+from feature_pipeline import clean
+from ensemble import CALIBRATION, ENSEMBLE_MEMBERS_FILE, StackedMLP, fit_calibration, stack_members
+from model_registry import load_current, publish_ensemble
+from confidence_store import build_store, score_rows
+from attributions import build_attributions
+
+# Cleaned rows plus their confidence and uncertainty from the last (full or incremental) run.
+SNAPSHOT_FILE = 'model_snapshot.parquet'
+SCORE_COLUMNS = ['confidence', 'uncertainty']
+# True for the rows the scaler's running statistics currently include (the training split,
+# plus rows added by refreshes); only those may be subtracted from it again.
+SCALER_COLUMN = 'in_scaler'
+# 'fit' (the members trained on it), 'calibration' (the calibration holdout) or 'test'.
+SPLIT_COLUMN = 'split'
+# Rows first seen in a refresh are assigned by a hash of their key, in create_model.py's proportions.
+TEST_FRACTION = 0.2
+CALIBRATION_FRACTION = 0.2 * (1 - TEST_FRACTION)
+
+KEY_COLUMN = 'kepoi_name'
+HASH_COLUMNS = ['kepid', 'kepoi_name', TARGET_COLUMN] + FEATURE_COLUMNS
+
+
+# --- 1. Snapshots ---
+def save_snapshot(df_model, path=SNAPSHOT_FILE):
+    extra = [c for c in SCORE_COLUMNS + [SCALER_COLUMN, SPLIT_COLUMN] if c in df_model.columns]
+    snapshot = df_model[UNIFIED_COLUMNS + extra].copy()
+    snapshot['mission'] = snapshot['mission'].astype(str)
+    snapshot.to_parquet(path, index=False)
+
+
+def row_hashes(df):
+    return pd.util.hash_pandas_object(df[HASH_COLUMNS], index=False).to_numpy()
+
+
+def diff_snapshots(old, new):
+    """
+    Compare two cleaned frames by kepoi_name and row content. Any edited field,
+    including a TOI 'rowupdate' that changed a disposition or feature, counts.
+    Returns (added_or_changed rows of `new`, removed_or_replaced rows of `old`).
+    """
+    old_keys = pd.Series(row_hashes(old), index=old[KEY_COLUMN].to_numpy())
+    new_keys = pd.Series(row_hashes(new), index=new[KEY_COLUMN].to_numpy())
+    new_is_changed = ~new_keys.reindex(new[KEY_COLUMN]).eq(old_keys.reindex(new[KEY_COLUMN])).to_numpy()
+    old_is_stale = ~old_keys.reindex(old[KEY_COLUMN]).eq(new_keys.reindex(old[KEY_COLUMN])).to_numpy()
+    return new[new_is_changed], old[old_is_stale]
+
+
+# --- 2. Scaler and Model Updates ---
+def update_scaler(scaler, removed_X, added_X):
+    """
+    Exactly replace `removed_X`'s contribution to the StandardScaler statistics with
+    `added_X`'s, using the running sums behind mean_ and var_. `removed_X` must be rows
+    the scaler was fit on (see SCALER_COLUMN), or the statistics drift.
+    """
+    n = float(scaler.n_samples_seen_)
+    s1 = scaler.mean_ * n
+    s2 = (scaler.var_ + scaler.mean_ ** 2) * n
+    n += len(added_X) - len(removed_X)
+    s1 = s1 + added_X.sum(axis=0) - removed_X.sum(axis=0)
+    s2 = s2 + (added_X ** 2).sum(axis=0) - (removed_X ** 2).sum(axis=0)
+
+    scaler.mean_ = s1 / n
+    scaler.var_ = np.maximum(s2 / n - scaler.mean_ ** 2, 0.0)
+    scaler.scale_ = np.where(scaler.var_ > 0, np.sqrt(scaler.var_), 1.0)
+    scaler.n_samples_seen_ = int(n)
+    return scaler
+
+
+def assign_split(keys):
+    """Deterministic 'test'/'calibration'/'fit' split for rows the last full run never saw."""
+    u = pd.util.hash_pandas_object(pd.Series(keys), index=False).to_numpy() / float(2 ** 64)
+    return np.where(u < TEST_FRACTION, 'test', np.where(u < TEST_FRACTION + CALIBRATION_FRACTION, 'calibration', 'fit'))
+
+
+def warm_start(mlp, scaler, changed, replay_pool, epochs=5, replay_ratio=1.0, seed=42):
+    """
+    partial_fit an existing MLP (one ensemble member) on the changed rows, mixed with an equal-sized
+    random replay sample of unchanged training rows so the update doesn't forget them.
+    """
+    rng = np.random.default_rng(seed)
+    n_replay = min(len(replay_pool), int(len(changed) * replay_ratio))
+    replay = replay_pool.iloc[rng.choice(len(replay_pool), n_replay, replace=False)]
+    batch = pd.concat([changed, replay])
+    X = scaler.transform(batch[FEATURE_COLUMNS])
+    y = batch['y'].to_numpy()
+    mlp.set_params(batch_size=min(200, len(X)))  # partial_fit warns when the batch size exceeds the rows
+    for _ in range(epochs):
+        order = rng.permutation(len(X))
+        mlp.partial_fit(X[order], y[order])
+    return mlp
+
+
+def evaluate(ensemble, rows):
+    """Test accuracy and ROC AUC on `rows`, in the registry's metric names."""
+    from sklearn.metrics import roc_auc_score
+    y = rows['y'].to_numpy()
+    p = ensemble.predict_proba(rows[FEATURE_COLUMNS].to_numpy(np.float64))[:, 1]
+    metrics = {'test_accuracy': float(((p >= 0.5) == y).mean())}
+    if len(np.unique(y)) == 2:
+        metrics['test_roc_auc'] = float(roc_auc_score(y, p))
+    return metrics
+
+
+# --- 3. Candidate File Patching ---
+def patch_candidates(scored, stale_keys, path=CANDIDATE_FILE, threshold=CONFIDENCE_THRESHOLD):
+    """Drop stale rows from the candidate file, append re-scored ones that qualify, re-sort."""
+    qualifying = scored[(scored[TARGET_COLUMN] == 'FALSE POSITIVE') & (scored['confidence'] >= threshold)]
+    candidates = pd.read_csv(path) if os.path.exists(path) else pd.DataFrame(columns=qualifying.columns)
+    if KEY_COLUMN not in candidates.columns:
+        raise ValueError(f"{path} has no '{KEY_COLUMN}' column; rerun create_model.py once to rebuild it.")
+
+    keep = candidates[~candidates[KEY_COLUMN].isin(stale_keys)]
+    added = qualifying[[c for c in candidates.columns if c in qualifying.columns]]
+    patched = pd.concat([keep, added], ignore_index=True).sort_values(by='confidence', ascending=False)
+    patched.to_csv(path, index=False)
+    return len(candidates) - len(keep), len(added)
+
+
+# --- 4. Public Entry Point ---
+def refresh(files=None, missions=('Kepler', 'TESS'), epochs=5):
+    """
+    Diff a fresh download against the snapshot, update the scaler statistics, warm-start
+    every ensemble member on the changed training rows, re-fit the calibration on the
+    holdout, publish the re-stacked ensemble and re-score every row with it.
+    `files` maps mission name to the new CSV path (defaults to the schema's file).
+    """
+    if not os.path.exists(ENSEMBLE_MEMBERS_FILE):
+        raise ValueError(f"no '{ENSEMBLE_MEMBERS_FILE}'; rerun create_model.py once to train the ensemble.")
+    old = pd.read_parquet(SNAPSHOT_FILE)
+    if SCALER_COLUMN not in old.columns or SPLIT_COLUMN not in old.columns:
+        raise ValueError(f"{SNAPSHOT_FILE} does not record which rows fed the scaler and the model; "
+                         "rerun create_model.py once.")
+    old['y'] = (old[TARGET_COLUMN] == 'CANDIDATE').astype(np.int64)
+    new = clean(load_unified(missions, files))
+    new['mission'] = new['mission'].astype(str)
+
+    changed, stale = diff_snapshots(old, new)
+    print(f"{len(changed)} added/changed rows, {len(stale)} removed/replaced rows.")
+    if changed.empty and stale.empty:
+        return
+
+    # A row keeps its split across edits; rows the last full run never saw get a hashed one.
+    new = new.merge(old[[KEY_COLUMN, SPLIT_COLUMN]], on=KEY_COLUMN, how='left')
+    unseen = new[SPLIT_COLUMN].isna()
+    new.loc[unseen, SPLIT_COLUMN] = assign_split(new.loc[unseen, KEY_COLUMN])
+    new[SCALER_COLUMN] = new[SPLIT_COLUMN] != 'test'
+    is_changed = new[KEY_COLUMN].isin(changed[KEY_COLUMN])
+
+    state = joblib.load(ENSEMBLE_MEMBERS_FILE)
+    members, scaler = state['members'], state['scaler']
+    removed, added = stale[stale[SCALER_COLUMN]], new[is_changed & new[SCALER_COLUMN]]
+    update_scaler(scaler, removed[FEATURE_COLUMNS].to_numpy(np.float64), added[FEATURE_COLUMNS].to_numpy(np.float64))
+
+    # Only the members' own training rows are learned from or replayed; the calibration
+    # holdout and the test split stay unseen so the calibration and metrics below are honest.
+    fit_rows = new[SPLIT_COLUMN] == 'fit'
+    learn, replay_pool = new[is_changed & fit_rows], new[~is_changed & fit_rows]
+    if not learn.empty:
+        for i, member in enumerate(members):
+            warm_start(member, scaler, learn, replay_pool, epochs=epochs, seed=42 + i)
+    previous = getattr(load_current(), 'calibration', None)
+    ensemble = StackedMLP(*stack_members(members, scaler), members[0].activation, None, members[0].classes_)
+    holdout = new[new[SPLIT_COLUMN] == 'calibration']
+    ensemble.calibration = fit_calibration(
+        ensemble.member_proba(holdout[FEATURE_COLUMNS].to_numpy(np.float64)).mean(axis=0),
+        holdout['y'].to_numpy(), previous['method'] if previous else CALIBRATION)
+
+    # Every row is re-scored, so the snapshot, store and candidate file all come from one model.
+    new = score_rows(new, ensemble)
+    metrics = evaluate(ensemble, new[new[SPLIT_COLUMN] == 'test'])
+    metrics['incremental_rows'] = int(len(changed))
+
+    joblib.dump({'members': members, 'scaler': scaler}, ENSEMBLE_MEMBERS_FILE)
+    publish_ensemble(ensemble, scaler, metrics)  # running apps hot-swap to it
+    save_snapshot(new)
+    build_store(new)
+
+    stale_keys = set(stale[KEY_COLUMN]) | set(new[KEY_COLUMN])
+    dropped, added = patch_candidates(new, stale_keys)
+    print(f"Candidate file rebuilt: {dropped} rows removed, {added} rows added "
+          f"(test accuracy {metrics['test_accuracy']:.2%}).")
+    build_attributions()  # the new model moves every candidate's attributions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Incrementally refresh the ExoSight model from new archive files.")
+    parser.add_argument('--kepler', help="New Kepler cumulative KOI CSV")
+    parser.add_argument('--toi', help="New TESS TOI CSV")
+    parser.add_argument('--epochs', type=int, default=5)
+    args = parser.parse_args(argv)
+    files = {'Kepler': args.kepler, 'TESS': args.toi}
+    refresh({k: v for k, v in files.items() if v}, epochs=args.epochs)
+
+
+if __name__ == "__main__":
+    main()
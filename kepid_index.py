@@ -0,0 +1,83 @@
+# kepid_index.py (Prebuilt lookup structures for kepid queries and candidate search)
+import numpy as np
+
+NGRAM = 3  # substrings up to this long are looked up directly; longer ones intersect trigrams
+
+
+# --- 1. Exact kepid -> rows ---
+class KepidIndex:
+    """
+    Stable argsort of the key column, so every row for one kepid is a contiguous
+    slice found with two binary searches instead of a full query() scan.
+    In unified frames a TESS row's kepid is its TIC ID, which can equal some star's
+    KIC ID; pass `mission` to index only that mission's rows, so stars are keyed on
+    (mission, kepid). Frames without a mission column are indexed whole.
+    """
+
+    def __init__(self, df, key='kepid', mission=None):
+        self.df = df
+        keys = df[key].to_numpy() if key in df.columns else np.empty(0, dtype=np.int64)
+        rows = np.arange(len(keys))
+        from mission_catalogs import MISSION_COLUMN
+        if mission is not None and MISSION_COLUMN in df.columns:
+            rows = np.flatnonzero((df[MISSION_COLUMN] == mission).to_numpy())
+        self.order = rows[np.argsort(keys[rows], kind='stable')]
+        self.sorted_keys = keys[self.order]
+
+    def positions(self, kepid):
+        lo = np.searchsorted(self.sorted_keys, kepid, side='left')
+        hi = np.searchsorted(self.sorted_keys, kepid, side='right')
+        return self.order[lo:hi]
+
+    def rows(self, kepid):
+        return self.df.iloc[self.positions(kepid)]
+
+    def __contains__(self, kepid):
+        return len(self.positions(kepid)) > 0
+
+
+# --- 2. Substring search over kepid / kepoi_name ---
+class SearchIndex:
+    """
+    Inverted index from every 1..NGRAM character substring of each field to the sorted
+    row positions containing it. Fields are indexed separately, so a query never matches
+    across the boundary between a kepid and a kepoi_name. A query is one dict lookup
+    (short queries) or an intersection of its trigram posting lists followed by a check
+    of the few surviving rows.
+    """
+
+    def __init__(self, df, columns=('kepid', 'kepoi_name')):
+        self.df = df
+        self.fields = [df[c].astype(str).str.upper().to_numpy() for c in columns if c in df.columns]
+
+        postings = {}
+        for row, texts in enumerate(zip(*self.fields)):
+            grams = {text[i:i + n] for text in texts for n in range(1, NGRAM + 1) for i in range(len(text) - n + 1)}
+            for gram in grams:
+                postings.setdefault(gram, []).append(row)
+        self.postings = {gram: np.array(rows, dtype=np.int64) for gram, rows in postings.items()}
+
+    def __len__(self):
+        return len(self.fields[0]) if self.fields else 0
+
+    def positions(self, query):
+        query = query.strip().upper()
+        if not query:
+            return np.arange(len(self))
+        if len(query) <= NGRAM:
+            return self.postings.get(query, np.empty(0, dtype=np.int64))
+
+        grams = sorted({query[i:i + NGRAM] for i in range(len(query) - NGRAM + 1)},
+                       key=lambda g: len(self.postings.get(g, ())))
+        candidates = self.postings.get(grams[0], np.empty(0, dtype=np.int64))
+        for gram in grams[1:]:
+            if len(candidates) == 0:
+                break
+            candidates = np.intersect1d(candidates, self.postings.get(gram, ()), assume_unique=True)
+        # The trigrams may come from different fields; keep rows where one field holds the whole query.
+        return np.array([row for row in candidates if any(query in field[row] for field in self.fields)],
+                        dtype=np.int64)
+
+    def search(self, query):
+        """Rows whose kepid or kepoi_name contains `query`, in their original order."""
+        return self.df.iloc[self.positions(query)]
@@ -0,0 +1,487 @@
+# lightcurves.py (Memory-mapped per-kepid flux store with vectorised, cached phase folding)
+import os
+import re
+import glob
+import json
+import time
+import hashlib
+import argparse
+import threading
+from collections import OrderedDict
+import numpy as np
+import telemetry
+from catalog_store import KEPLER_FILE, CANDIDATE_FILE
+
+LIGHTCURVE_DIR = 'lightcurves'          # drop Kepler/TESS *.fits or *.csv light curves here
+LIGHTCURVE_STORE = '.lightcurve_store'  # built from LIGHTCURVE_DIR; safe to delete
+SOURCE_PATTERNS = ('*.fits', '*.fits.gz', '*.csv', '*.csv.gz')
+
+# Times are stored in BKJD (BJD - 2454833), the system koi_time0bk uses. A CSV's time
+# column name says which system it is in; TESS FITS files are in BTJD (BJD - 2457000).
+TIME_OFFSETS = {'time': 0.0, 'bkjd': 0.0, 'btjd': 2457000.0 - 2454833.0, 'bjd': -2454833.0}
+FLUX_COLUMNS = ('pdcsap_flux', 'flux', 'sap_flux')
+EPHEMERIS_COLUMNS = ['kepid', 'kepoi_name', 'koi_period', 'koi_time0bk', 'koi_duration', 'koi_depth']
+
+N_BINS = 200
+MAX_RENDER_POINTS = 5000   # raw cadences drawn under the binned curve
+FOLD_CHUNK = 1 << 20       # cadences per block while folding, bounding the temporaries
+FOLD_CACHE_SIZE = 512      # binned folds kept per store (LRU)
+WINDOW_DURATIONS = 3.0     # the fold shows +/- this many transit durations around phase 0
+
+
+# --- 1. Reading Source Files ---
+def _kepid_from_name(path):
+    """kplr010797460-2009166043257_llc.csv -> 10797460; used when the file has no kepid column."""
+    match = re.search(r'(\d{5,})', os.path.basename(path))
+    return int(match.group(1)) if match else None
+
+
+def read_csv_lightcurve(path):
+    import pandas as pd
+    df = pd.read_csv(path, comment='#')
+    columns = {c.lower(): c for c in df.columns}
+    time_column = next((c for c in TIME_OFFSETS if c in columns), None)
+    flux_column = next((c for c in FLUX_COLUMNS if c in columns), None)
+    if time_column is None or flux_column is None:
+        raise ValueError(f"{path}: needs a time column {list(TIME_OFFSETS)} and a flux column {list(FLUX_COLUMNS)}")
+    kepid = int(df[columns['kepid']].iloc[0]) if 'kepid' in columns else _kepid_from_name(path)
+    quality = df[columns['quality']].to_numpy() if 'quality' in columns else None
+    # An explicit mission column wins; otherwise TESS time (BTJD) means a TESS star.
+    mission = str(df[columns['mission']].iloc[0]) if 'mission' in columns else \
+        'TESS' if time_column == 'btjd' else 'Kepler'
+    return (kepid, df[columns[time_column]].to_numpy(np.float64) + TIME_OFFSETS[time_column],
+            df[columns[flux_column]].to_numpy(np.float64), quality, mission)
+
+
+def read_fits_lightcurve(path):
+    """A Kepler/TESS SPOC light-curve file (PDCSAP flux). Needs astropy, imported only here."""
+    try:
+        from astropy.io import fits
+    except ImportError as e:
+        raise ImportError("reading FITS light curves needs astropy (pip install astropy)") from e
+    with fits.open(path, memmap=True) as hdul:
+        header, data = hdul[0].header, hdul[1].data
+        kepid = header.get('KEPLERID') or header.get('TICID') or _kepid_from_name(path)
+        mission = 'TESS' if str(header.get('TELESCOP', '')).strip() == 'TESS' else 'Kepler'
+        offset = TIME_OFFSETS['btjd'] if mission == 'TESS' else 0.0
+        return (int(kepid), np.asarray(data['TIME'], dtype=np.float64) + offset,
+                np.asarray(data['PDCSAP_FLUX'], dtype=np.float64), np.asarray(data['QUALITY']), mission)
+
+
+def read_lightcurve(path):
+    """
+    (kepid, time in BKJD, flux relative to the file's median, mission) with flagged and NaN
+    cadences dropped. For TESS files the kepid is the TIC ID.
+    """
+    reader = read_fits_lightcurve if '.fits' in os.path.basename(path).lower() else read_csv_lightcurve
+    kepid, t, flux, quality, mission = reader(path)
+    if kepid is None:
+        raise ValueError(f"{path}: no kepid column, header keyword or ID in the file name")
+    keep = np.isfinite(t) & np.isfinite(flux)
+    if quality is not None:
+        keep &= np.asarray(quality) == 0
+    t, flux = t[keep], flux[keep]
+    # Each file is one quarter/sector with its own flux level; normalising per file stitches them.
+    flux = (flux / np.median(flux)).astype(np.float32) if len(flux) else flux.astype(np.float32)
+    return kepid, t, flux, mission
+
+
+def list_sources(source_dir=LIGHTCURVE_DIR):
+    return sorted(p for pattern in SOURCE_PATTERNS for p in glob.glob(os.path.join(source_dir, '**', pattern),
+                                                                        recursive=True))
+
+
+def _fingerprint(paths):
+    h = hashlib.sha256()
+    for path in paths:
+        stat = os.stat(path)
+        h.update(f'{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}\n'.encode())
+    return h.hexdigest()[:12]
+
+
+# --- 2. Building the Store ---
+# Each build is a directory of its own; CURRENT names the active one and is swapped with
+# os.replace, as in the model registry, so readers see either the old build or the new one.
+CURRENT_FILE = 'CURRENT'
+KEEP_BUILDS = 2  # the active build and the one before it, for readers that read CURRENT just before a swap
+
+
+def current_build(store_dir=LIGHTCURVE_STORE):
+    try:
+        with open(os.path.join(store_dir, CURRENT_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def read_manifest(store_dir=LIGHTCURVE_STORE):
+    """The active build's manifest ('build' is its directory name), or None before the first build."""
+    build = current_build(store_dir)
+    if build is None:
+        return None
+    try:
+        with open(os.path.join(store_dir, build, 'manifest.json')) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _set_current(build, store_dir):
+    tmp = os.path.join(store_dir, f'.{CURRENT_FILE}.{os.getpid()}')
+    with open(tmp, 'w') as f:
+        f.write(build)
+    os.replace(tmp, os.path.join(store_dir, CURRENT_FILE))
+
+
+def _prune(store_dir, keep=KEEP_BUILDS):
+    """Remove all but the newest `keep` builds, and files from the older flat layout."""
+    import shutil
+    builds = sorted(e for e in os.listdir(store_dir) if not e.startswith('.') and e != CURRENT_FILE
+                    and os.path.isdir(os.path.join(store_dir, e)))
+    stale = builds[:-keep] + [e for e in os.listdir(store_dir) if os.path.isfile(os.path.join(store_dir, e))
+                              and not e.startswith('.') and e != CURRENT_FILE]
+    for entry in stale:
+        path = os.path.join(store_dir, entry)
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)  # open memory maps keep their pages
+        else:
+            os.remove(path)
+
+
+def ingest(source_dir=LIGHTCURVE_DIR, store_dir=LIGHTCURVE_STORE, force=False):
+    """
+    Pack every light curve under `source_dir` into two flat arrays, time.npy (float64) and
+    flux.npy (float32), grouped by kepid and time-sorted within each star, plus an index of
+    (kepid, offset, length). Files are staged to disk as they are read, so memory holds one
+    star at a time. The build is written to a staging directory, renamed into place and then
+    made current. Skipped when the source files are unchanged since the last build.
+    """
+    import shutil
+    from numpy.lib.format import open_memmap
+    paths = list_sources(source_dir)
+    if not paths:
+        raise FileNotFoundError(f"no light curves ({', '.join(SOURCE_PATTERNS)}) under {source_dir}/")
+    version = _fingerprint(paths)
+    manifest = read_manifest(store_dir)
+    if manifest and manifest['version'] == version and not force:
+        return manifest
+
+    # Build names sort by time, so pruning keeps the newest.
+    now_ns = time.time_ns()
+    build = time.strftime('%Y%m%dT%H%M%S', time.gmtime(now_ns // 10 ** 9)) + f'{now_ns % 10 ** 9:09d}-{version}'
+    staging = os.path.join(store_dir, f'.staging-{build}-{os.getpid()}')
+    os.makedirs(staging)
+    staged_time, staged_flux = os.path.join(staging, 'time.stage'), os.path.join(staging, 'flux.stage')
+    segments = []  # (kepid, offset, length) in the staging files
+    star_missions = {}
+    offset = 0
+    try:
+        with open(staged_time, 'wb') as ft, open(staged_flux, 'wb') as ff:
+            for path in paths:
+                kepid, t, flux, mission = read_lightcurve(path)
+                if star_missions.setdefault(kepid, mission) != mission:
+                    raise ValueError(f"{path}: ID {kepid} already has {star_missions[kepid]} light curves; "
+                                     f"keep Kepler and TESS stores separate")
+                ft.write(t.tobytes())
+                ff.write(flux.tobytes())
+                segments.append((kepid, offset, len(t)))
+                offset += len(t)
+
+        stage_t = np.memmap(staged_time, dtype=np.float64, mode='r', shape=(offset,)) if offset else np.empty(0)
+        stage_f = np.memmap(staged_flux, dtype=np.float32, mode='r', shape=(offset,)) if offset else np.empty(0, np.float32)
+        out_t = open_memmap(os.path.join(staging, 'time.npy'), mode='w+', dtype=np.float64, shape=(offset,))
+        out_f = open_memmap(os.path.join(staging, 'flux.npy'), mode='w+', dtype=np.float32, shape=(offset,))
+        kepids = np.array(sorted({kepid for kepid, _, _ in segments}), dtype=np.int64)
+        offsets, lengths = np.zeros(len(kepids), dtype=np.int64), np.zeros(len(kepids), dtype=np.int64)
+        by_star = {}
+        for kepid, start, length in segments:
+            by_star.setdefault(kepid, []).append((start, length))
+        position = 0
+        for i, kepid in enumerate(kepids):
+            t = np.concatenate([stage_t[s:s + n] for s, n in by_star[int(kepid)]])
+            flux = np.concatenate([stage_f[s:s + n] for s, n in by_star[int(kepid)]])
+            order = np.argsort(t, kind='stable')
+            out_t[position:position + len(t)] = t[order]
+            out_f[position:position + len(t)] = flux[order]
+            offsets[i], lengths[i] = position, len(t)
+            position += len(t)
+        out_t.flush()
+        out_f.flush()
+        del out_t, out_f, stage_t, stage_f
+
+        for staged in (staged_time, staged_flux):
+            os.remove(staged)
+        missions = np.array([star_missions[int(kepid)] for kepid in kepids], dtype=str)
+        mission_counts = dict(zip(*np.unique(missions, return_counts=True)))
+        np.savez(os.path.join(staging, 'index.npz'), kepids=kepids, offsets=offsets, lengths=lengths,
+                 missions=missions)
+        manifest = {'version': version, 'build': build, 'files': len(paths), 'stars': int(len(kepids)),
+                    'cadences': int(offset), 'missions': {str(m): int(n) for m, n in mission_counts.items()},
+                    'built': time.strftime('%Y-%m-%dT%H:%M:%S')}
+        with open(os.path.join(staging, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(staging, os.path.join(store_dir, build))
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    _set_current(build, store_dir)
+    _prune(store_dir)
+    return manifest
+
+
+# --- 3. Vectorised Folding ---
+def fold_and_bin(t, flux, period, t0, n_bins=N_BINS, window=0.5):
+    """
+    Phase-fold on (period, t0) so transits sit at phase 0, then average the flux in
+    `n_bins` equal bins over phase [-window, window). Two bincounts per block of
+    FOLD_CHUNK cadences; works straight off memory-mapped arrays.
+    Returns (bin centres, mean relative flux (NaN if empty), cadences per bin).
+    """
+    counts = np.zeros(n_bins, dtype=np.int64)
+    sums = np.zeros(n_bins, dtype=np.float64)
+    for start in range(0, len(t), FOLD_CHUNK):
+        phase = np.mod(t[start:start + FOLD_CHUNK] - t0 + 0.5 * period, period) / period - 0.5
+        bins = np.floor((phase + window) / (2 * window) * n_bins).astype(np.intp)
+        inside = (bins >= 0) & (bins < n_bins)
+        counts += np.bincount(bins[inside], minlength=n_bins)
+        sums += np.bincount(bins[inside], weights=flux[start:start + FOLD_CHUNK][inside], minlength=n_bins)
+    centres = (np.arange(n_bins) + 0.5) / n_bins * 2 * window - window
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return centres, np.where(counts > 0, sums / counts, np.nan), counts
+
+
+def fold_window(period, duration_hours):
+    """Half-width in phase of WINDOW_DURATIONS transit durations, clipped to [0.01, 0.5]."""
+    if not duration_hours or not np.isfinite(duration_hours):
+        return 0.5
+    return float(np.clip(WINDOW_DURATIONS * duration_hours / 24.0 / period, 0.01, 0.5))
+
+
+class LightCurveStore:
+    """
+    Read-only view of the store's current build: time/flux memory-mapped, one binary
+    search from kepid to its slice. Binned folds are cached per (kepid, period, t0, bins,
+    window) in an LRU, and persisted to the build's folds.npz by save_folds() so a
+    restarted app starts warm.
+    """
+
+    def __init__(self, store_dir=LIGHTCURVE_STORE):
+        self.store_dir = store_dir
+        self.manifest = read_manifest(store_dir)
+        if self.manifest is None:
+            raise FileNotFoundError(f"no light-curve store in {store_dir}/ (run python lightcurves.py)")
+        self.version = self.manifest['version']
+        self.build_dir = os.path.join(store_dir, self.manifest['build'])
+        self.time = np.load(os.path.join(self.build_dir, 'time.npy'), mmap_mode='r')
+        self.flux = np.load(os.path.join(self.build_dir, 'flux.npy'), mmap_mode='r')
+        with np.load(os.path.join(self.build_dir, 'index.npz')) as index:
+            self.kepids, self.offsets, self.lengths = index['kepids'], index['offsets'], index['lengths']
+            # Builds from before missions were recorded held Kepler light curves only.
+            self.missions = index['missions'] if 'missions' in index else np.full(len(self.kepids), 'Kepler')
+        self._folds = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_folds()
+
+    def __len__(self):
+        return len(self.kepids)
+
+    def __contains__(self, kepid):
+        return self._slot(kepid) is not None
+
+    def _slot(self, kepid):
+        i = int(np.searchsorted(self.kepids, int(kepid)))
+        return i if i < len(self.kepids) and self.kepids[i] == int(kepid) else None
+
+    def mission(self, kepid):
+        """'Kepler' or 'TESS' for a star in the store (its kepid is a TIC ID for TESS), else None."""
+        i = self._slot(kepid)
+        return None if i is None else str(self.missions[i])
+
+    def series(self, kepid):
+        """(time, relative flux) views into the mapping; empty if the star has no light curve."""
+        i = self._slot(kepid)
+        if i is None:
+            return self.time[:0], self.flux[:0]
+        start, stop = self.offsets[i], self.offsets[i] + self.lengths[i]
+        return self.time[start:stop], self.flux[start:stop]
+
+    def fold(self, kepid, period, t0, n_bins=N_BINS, window=0.5):
+        key = (int(kepid), float(period), float(t0), int(n_bins), round(float(window), 6))
+        with self._lock:
+            if key in self._folds:
+                self._folds.move_to_end(key)
+                telemetry.cache_lookup('lightcurve_fold', hit=True)
+                return self._folds[key]
+        telemetry.cache_lookup('lightcurve_fold', hit=False)
+        with telemetry.span('lightcurve.fold'):
+            result = fold_and_bin(*self.series(kepid), period, t0, n_bins, window)
+        with self._lock:
+            self._folds[key] = result
+            while len(self._folds) > FOLD_CACHE_SIZE:
+                self._folds.popitem(last=False)
+        return result
+
+    def sample(self, kepid, period, t0, window=0.5, max_points=MAX_RENDER_POINTS):
+        """About `max_points` raw (phase, flux) points inside the window: an even stride, never the whole array."""
+        t, flux = self.series(kepid)
+        stride = max(1, int(len(t) * 2 * window / max_points))
+        t, flux = t[::stride], flux[::stride]
+        phase = np.mod(t - t0 + 0.5 * period, period) / period - 0.5
+        inside = np.abs(phase) < window
+        return phase[inside], np.asarray(flux[inside])
+
+    def save_folds(self):
+        with self._lock:
+            items = list(self._folds.items())
+        arrays = {'keys': np.array([json.dumps(key) for key, _ in items])}
+        for i, (_, (centres, mean, counts)) in enumerate(items):
+            arrays.update({f'{i}_phase': centres, f'{i}_flux': mean, f'{i}_count': counts})
+        np.savez(os.path.join(self.build_dir, 'folds.npz'), **arrays)
+        return len(items)
+
+    def _load_folds(self):
+        path = os.path.join(self.build_dir, 'folds.npz')
+        if not os.path.exists(path):
+            return
+        with np.load(path) as data:
+            for i, key in enumerate(data['keys']):
+                self._folds[tuple(json.loads(str(key)))] = (data[f'{i}_phase'], data[f'{i}_flux'], data[f'{i}_count'])
+
+
+def open_store(store_dir=LIGHTCURVE_STORE):
+    return LightCurveStore(store_dir) if read_manifest(store_dir) else None
+
+
+def load_ephemerides(path=KEPLER_FILE):
+    """Period, epoch (BKJD) and duration of every KOI, for folding."""
+    from catalog_store import load_catalog
+    return load_catalog(path, columns=EPHEMERIS_COLUMNS).dropna(subset=['koi_period', 'koi_time0bk'])
+
+
+# --- 4. Rendering ---
+@telemetry.traced('lightcurve_figure')
+def lightcurve_figure(store, kepid, kepoi_name, period, t0, duration_hours=None):
+    """Downsampled raw cadences with the binned fold on top, phase in hours from mid-transit."""
+    import plotly.graph_objects as go
+    window = fold_window(period, duration_hours)
+    centres, mean, _ = store.fold(kepid, period, t0, window=window)
+    phase, flux = store.sample(kepid, period, t0, window)
+    hours = 24.0 * period
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(x=phase * hours, y=(flux - 1) * 1e6, mode='markers', name='cadences',
+                               marker=dict(size=2, color='#8b949e', opacity=0.4), hoverinfo='skip'))
+    fig.add_trace(go.Scatter(x=centres * hours, y=(mean - 1) * 1e6, mode='lines+markers', name='binned',
+                             line=dict(color='#58a6ff', width=2), marker=dict(size=4)))
+    fig.update_layout(title=f"{kepoi_name} folded at P = {period:.5f} d", xaxis_title="Hours from mid-transit",
+                      yaxis_title="Relative flux (ppm)", template="plotly_dark", height=350,
+                      margin=dict(l=10, r=10, t=40, b=10), legend=dict(orientation='h', y=-0.25))
+    return fig
+
+
+# --- 5. Synthetic Light Curves (demo data and the self-check) ---
+KEPLER_CADENCE_DAYS = 29.4244 / 1440.0
+KEPLER_START_BKJD = 131.5
+
+
+def synthetic_lightcurve(planets, n_cadences=65_000, noise_ppm=200.0, seed=0):
+    """
+    Long-cadence-like (time, flux) with box transits for each (period, t0, depth_ppm,
+    duration_hours) in `planets`. Clearly not real photometry: for demos and tests only.
+    """
+    rng = np.random.default_rng(seed)
+    t = KEPLER_START_BKJD + np.arange(n_cadences) * KEPLER_CADENCE_DAYS
+    flux = 1.0 + rng.normal(0.0, noise_ppm * 1e-6, n_cadences)
+    for period, t0, depth_ppm, duration_hours in planets:
+        phase_days = np.mod(t - t0 + 0.5 * period, period) - 0.5 * period
+        flux[np.abs(phase_days) < duration_hours / 48.0] -= depth_ppm * 1e-6
+    return t, flux
+
+
+def write_synthetic(kepid, planets, directory=LIGHTCURVE_DIR, **kwargs):
+    import pandas as pd
+    os.makedirs(directory, exist_ok=True)
+    t, flux = synthetic_lightcurve(planets, seed=int(kepid) % (2 ** 32), **kwargs)
+    path = os.path.join(directory, f'kplr{int(kepid):09d}_synthetic.csv')
+    pd.DataFrame({'time': t, 'pdcsap_flux': flux, 'quality': 0}).to_csv(path, index=False)
+    return path
+
+
+def write_synthetic_candidates(n_stars, directory=LIGHTCURVE_DIR, candidates_path=CANDIDATE_FILE):
+    """Synthetic curves for the hosts of the top `n_stars` AI candidates, using every KOI's catalog ephemeris."""
+    import pandas as pd
+    candidates = pd.read_csv(candidates_path)
+    if 'mission' in candidates.columns:
+        candidates = candidates[candidates['mission'] == 'Kepler']  # a TESS kepid is a TIC ID
+    hosts = candidates.sort_values('confidence', ascending=False)['kepid'].drop_duplicates().head(n_stars)
+    ephemerides = load_ephemerides()
+    ephemerides = ephemerides[ephemerides['kepid'].isin(hosts)].fillna({'koi_depth': 500.0, 'koi_duration': 3.0})
+    for kepid, koi in ephemerides.groupby('kepid'):
+        write_synthetic(kepid, koi[['koi_period', 'koi_time0bk', 'koi_depth', 'koi_duration']].to_numpy(), directory)
+    return ephemerides['kepid'].nunique()
+
+
+def precompute_candidate_folds(store, candidates_path=CANDIDATE_FILE):
+    """Bin the fold of every AI candidate that has a light curve and persist them; returns how many."""
+    import pandas as pd
+    candidates = pd.read_csv(candidates_path)
+    ephemerides = load_ephemerides()
+    # Older candidate files carry only kepid; then every KOI of those hosts is binned.
+    key = 'kepoi_name' if 'kepoi_name' in candidates.columns else 'kepid'
+    ephemerides = ephemerides[ephemerides[key].isin(candidates[key])]
+    n = 0
+    for row in ephemerides.itertuples(index=False):
+        if row.kepid in store:
+            store.fold(row.kepid, row.koi_period, row.koi_time0bk, window=fold_window(row.koi_period, row.koi_duration))
+            n += 1
+    store.save_folds()
+    return n
+
+
+def check(n_cadences=4_000_000):
+    """Ingest a multi-million-cadence synthetic star, fold it, and confirm the injected depth comes back."""
+    import tempfile
+    period, t0, depth_ppm, duration_hours = 3.5225, 134.1, 800.0, 2.9
+    with tempfile.TemporaryDirectory() as tmp:
+        source_dir = os.path.join(tmp, 'src')
+        write_synthetic(123456789, [(period, t0, depth_ppm, duration_hours)], source_dir, n_cadences=n_cadences)
+        start = time.perf_counter()
+        ingest(source_dir, os.path.join(tmp, 'store'))
+        ingest_s = time.perf_counter() - start
+        store = LightCurveStore(os.path.join(tmp, 'store'))
+        window = fold_window(period, duration_hours)
+        start = time.perf_counter()
+        centres, mean, _ = store.fold(123456789, period, t0, window=window)
+        fold_s = time.perf_counter() - start
+        start = time.perf_counter()
+        store.fold(123456789, period, t0, window=window)
+        cached_s = time.perf_counter() - start
+        in_transit = np.abs(centres) * period * 24.0 < duration_hours / 2 - 0.2
+        measured = (1 - np.nanmean(mean[in_transit])) * 1e6
+        print(f"{n_cadences:,} cadences: ingest {ingest_s:.2f} s, fold {fold_s * 1000:.0f} ms, "
+              f"cached fold {cached_s * 1e6:.0f} us, depth {measured:.0f} ppm (injected {depth_ppm:.0f})")
+        if abs(measured - depth_ppm) > 0.05 * depth_ppm:
+            raise AssertionError(f"folded depth {measured:.0f} ppm is not the injected {depth_ppm:.0f} ppm")
+        del store
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the light-curve store and bin folds for the AI candidates.")
+    parser.add_argument('--source', default=LIGHTCURVE_DIR, help="Directory of *.fits / *.csv light curves")
+    parser.add_argument('--synthetic', type=int, metavar='N',
+                        help="First write synthetic light curves for the hosts of the top N candidates")
+    parser.add_argument('--force', action='store_true', help="Rebuild even if the source files are unchanged")
+    parser.add_argument('--check', action='store_true', help="Fold a 4M-cadence synthetic star and verify it")
+    args = parser.parse_args(argv)
+    if args.check:
+        check()
+        return
+    if args.synthetic:
+        print(f"Wrote synthetic light curves for {write_synthetic_candidates(args.synthetic, args.source)} stars")
+    manifest = ingest(args.source, force=args.force)
+    print(f"{manifest['stars']} stars, {manifest['cadences']:,} cadences from {manifest['files']} files "
+          f"in {LIGHTCURVE_STORE}/ (version {manifest['version']})")
+    print(f"Binned folds for {precompute_candidate_folds(LightCurveStore())} AI candidates")
+
+
+if __name__ == "__main__":
+    main()
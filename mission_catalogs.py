@@ -0,0 +1,114 @@
+# mission_catalogs.py (Map Kepler KOI and TESS TOI catalogs onto one model schema)
+import numpy as np
+import pandas as pd
+from catalog_store import KEPLER_FILE, ID_COLUMNS, TARGET_COLUMN, FEATURE_COLUMNS, load_catalog, read_catalog_csv
+
+TOI_FILE = "TOI_2025.10.03_00.24.28.csv"
+
+# Unified frame: the KOI column names, plus the mission each row came from.
+# For TESS rows 'kepid' holds the TIC ID and 'kepoi_name' the TOI designation. TIC and KIC
+# IDs share a numeric range, so anything keyed on stars uses (mission, kepid), never kepid alone.
+MISSION_COLUMN = 'mission'
+UNIFIED_COLUMNS = [MISSION_COLUMN] + ID_COLUMNS + [TARGET_COLUMN] + FEATURE_COLUMNS
+
+R_SUN_CM = 6.957e10
+SECONDS_PER_DAY = 86400.0
+
+
+# --- 1. Vectorised Unit Conversions ---
+def impact_from_duration(period_days, duration_hours, logg, srad_rsun):
+    """
+    TOI rows have no impact parameter, so estimate it from the transit duration:
+    a/R* = (g P^2 / (4 pi^2 R*))^(1/3) and T ~ (P / pi) (R* / a) sqrt(1 - b^2).
+    Rows with missing stellar parameters come back NaN (and get dropped in cleaning).
+    """
+    period_s = np.asarray(period_days, dtype=np.float64) * SECONDS_PER_DAY
+    g = 10.0 ** np.asarray(logg, dtype=np.float64)
+    r_star = np.asarray(srad_rsun, dtype=np.float64) * R_SUN_CM
+    a_over_r = np.cbrt(g * period_s ** 2 / (4 * np.pi ** 2 * r_star))
+    duration_s = np.asarray(duration_hours, dtype=np.float64) * 3600.0
+    b_squared = 1.0 - (np.pi * duration_s * a_over_r / period_s) ** 2
+    return np.sqrt(np.clip(b_squared, 0.0, 1.0))
+
+
+def _toi_impact(df):
+    return impact_from_duration(df['pl_orbper'], df['pl_trandurh'], df['st_logg'], df['st_rad'])
+
+
+def _toi_name(df):
+    return 'TOI-' + df['toi'].map('{:.2f}'.format)
+
+
+# --- 2. Declarative Mission Schemas ---
+# 'rename' copies source columns straight across, 'derive' builds columns from the raw frame,
+# and 'disposition' maps the mission's labels onto koi_pdisposition's CANDIDATE / FALSE POSITIVE.
+# Adding K2 or a new TESS sector is a new entry here, not new code.
+MISSION_SCHEMAS = {
+    'Kepler': {
+        'file': KEPLER_FILE,
+        'source_columns': ID_COLUMNS + [TARGET_COLUMN] + FEATURE_COLUMNS,
+        'rename': {},
+        'derive': {},
+        'disposition_column': TARGET_COLUMN,
+        'disposition': {'CANDIDATE': 'CANDIDATE', 'FALSE POSITIVE': 'FALSE POSITIVE'},
+    },
+    'TESS': {
+        'file': TOI_FILE,
+        'source_columns': ['toi', 'tid', 'tfopwg_disp', 'pl_orbper', 'pl_rade', 'pl_eqt',
+                           'pl_trandurh', 'pl_insol', 'st_logg', 'st_rad'],
+        'rename': {
+            'tid': 'kepid', 'pl_orbper': 'koi_period', 'pl_rade': 'koi_prad',
+            'pl_eqt': 'koi_teq', 'pl_trandurh': 'koi_duration', 'pl_insol': 'koi_insol',
+        },
+        'derive': {'kepoi_name': _toi_name, 'koi_impact': _toi_impact},
+        'disposition_column': 'tfopwg_disp',
+        # Confirmed/known planets stay CANDIDATE, as they do in koi_pdisposition.
+        'disposition': {'PC': 'CANDIDATE', 'APC': 'CANDIDATE', 'CP': 'CANDIDATE', 'KP': 'CANDIDATE',
+                        'FP': 'FALSE POSITIVE', 'FA': 'FALSE POSITIVE'},
+    },
+}
+
+
+# --- 3. Loading ---
+def to_unified(raw, mission):
+    """Apply one mission's schema to a raw frame (or chunk) of its source columns."""
+    schema = MISSION_SCHEMAS[mission]
+    df = raw.rename(columns=schema['rename'])
+    for column, derive in schema['derive'].items():
+        df[column] = derive(raw)
+    df[TARGET_COLUMN] = raw[schema['disposition_column']].map(schema['disposition'])
+    df[MISSION_COLUMN] = mission
+    return df[UNIFIED_COLUMNS]
+
+
+def load_mission(mission, path=None):
+    """
+    One mission's catalog in the unified schema. Unknown dispositions become NaN.
+    `path` overrides the schema's file, e.g. for a fresh archive download.
+    """
+    schema = MISSION_SCHEMAS[mission]
+    raw = load_catalog(path or schema['file'], columns=schema['source_columns'])
+    df = to_unified(raw, mission).drop_duplicates(subset=['kepoi_name'], keep='last')
+    return df.reset_index(drop=True)
+
+
+def iter_mission_chunks(mission, path=None, chunk_rows=100_000):
+    """The same mapping streamed from the CSV in chunks, for catalogs bigger than RAM."""
+    schema = MISSION_SCHEMAS[mission]
+    chunks = read_catalog_csv(path or schema['file'], columns=schema['source_columns'], chunksize=chunk_rows)
+    for raw in chunks:
+        yield to_unified(raw, mission)
+
+
+def load_unified(missions=('Kepler', 'TESS'), files=None):
+    """All requested missions stacked into one frame with a categorical mission column."""
+    files = files or {}
+    df = pd.concat([load_mission(m, files.get(m)) for m in missions], ignore_index=True)
+    df[MISSION_COLUMN] = df[MISSION_COLUMN].astype('category')
+    return df
+
+
+if __name__ == "__main__":
+    unified = load_unified()
+    print(unified.groupby(MISSION_COLUMN, observed=True)[TARGET_COLUMN].value_counts(dropna=False))
+    print(unified[FEATURE_COLUMNS].describe().T)
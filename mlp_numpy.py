@@ -0,0 +1,112 @@
+# mlp_numpy.py (sklearn-free forward pass for the saved MLP)
+import numpy as np
+
+WEIGHTS_FILE = 'mlp_exoplanet_weights.npz'
+
+_ACTIVATIONS = {
+    'relu': lambda z: np.maximum(z, 0, out=z),
+    'tanh': lambda z: np.tanh(z, out=z),
+    'logistic': lambda z: _sigmoid(z),
+    'identity': lambda z: z,
+}
+
+
+def _sigmoid(z):
+    # Same clipping sklearn's expit effectively does, without importing scipy.
+    return 1.0 / (1.0 + np.exp(-np.clip(z, -500, 500)))
+
+
+# --- 1. Export (needs sklearn objects, runs at training time only) ---
+def fold_weights(mlp, scaler):
+    """
+    The MLP's layers with the StandardScaler folded into the first one:
+    ((x - mean) / scale) @ W + b  ==  x @ (W / scale[:, None]) + (b - (mean / scale) @ W)
+    """
+    coefs = [np.asarray(w, dtype=np.float64) for w in mlp.coefs_]
+    intercepts = [np.asarray(b, dtype=np.float64) for b in mlp.intercepts_]
+    mean = np.asarray(scaler.mean_, dtype=np.float64)
+    scale = np.asarray(scaler.scale_, dtype=np.float64)
+
+    intercepts[0] = intercepts[0] - (mean / scale) @ coefs[0]
+    coefs[0] = coefs[0] / scale[:, None]
+    return coefs, intercepts
+
+
+def export_weights(mlp, scaler, path=WEIGHTS_FILE):
+    coefs, intercepts = fold_weights(mlp, scaler)
+    arrays = {f'W{i}': w for i, w in enumerate(coefs)}
+    arrays.update({f'b{i}': b for i, b in enumerate(intercepts)})
+    np.savez_compressed(
+        path,
+        activation=np.array(mlp.activation),
+        out_activation=np.array(mlp.out_activation_),
+        classes=np.asarray(mlp.classes_),
+        **arrays,
+    )
+    return path
+
+
+# --- 2. Inference ---
+class NumpyMLP:
+    """Vectorised forward pass over raw (unscaled) feature rows."""
+
+    def __init__(self, coefs, intercepts, activation='relu', out_activation='logistic', classes=(0, 1)):
+        self.coefs = coefs
+        self.intercepts = intercepts
+        self.activation = activation
+        self.out_activation = out_activation
+        self.classes_ = np.asarray(classes)
+
+    @classmethod
+    def load(cls, path=WEIGHTS_FILE):
+        with np.load(path) as data:
+            n_layers = sum(1 for key in data.files if key.startswith('W'))
+            return cls(
+                [data[f'W{i}'] for i in range(n_layers)],
+                [data[f'b{i}'] for i in range(n_layers)],
+                str(data['activation']),
+                str(data['out_activation']),
+                data['classes'],
+            )
+
+    def decision(self, X):
+        a = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        hidden = _ACTIVATIONS[self.activation]
+        for W, b in zip(self.coefs[:-1], self.intercepts[:-1]):
+            a = hidden(a @ W + b)
+        return a @ self.coefs[-1] + self.intercepts[-1]
+
+    def predict_proba(self, X):
+        """Same layout as MLPClassifier.predict_proba: one column per class."""
+        z = self.decision(X)
+        if self.out_activation == 'softmax':
+            z = np.exp(z - z.max(axis=1, keepdims=True))
+            return z / z.sum(axis=1, keepdims=True)
+        p = _sigmoid(z[:, 0])
+        return np.column_stack([1.0 - p, p])
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+# --- 3. Parity Check Against sklearn ---
+def check_parity(mlp, scaler, engine, n_rows=10_000, atol=1e-9, seed=0):
+    """Score random rows spread around the scaler's training distribution with both paths."""
+    rng = np.random.default_rng(seed)
+    X = scaler.mean_ + rng.standard_normal((n_rows, len(scaler.mean_))) * scaler.scale_ * 2
+    expected = mlp.predict_proba(scaler.transform(X))
+    actual = engine.predict_proba(X)
+    max_diff = float(np.abs(expected - actual).max())
+    if max_diff > atol:
+        raise AssertionError(f"NumPy forward pass differs from sklearn by {max_diff:.3g} (> {atol})")
+    return max_diff
+
+
+if __name__ == "__main__":
+    # Re-export from the saved pickles and verify parity: python mlp_numpy.py
+    import joblib
+    mlp = joblib.load('mlp_exoplanet_model.pkl')
+    scaler = joblib.load('scaler_object.pkl')
+    export_weights(mlp, scaler)
+    max_diff = check_parity(mlp, scaler, NumpyMLP.load())
+    print(f"Exported {WEIGHTS_FILE}; max |sklearn - numpy| = {max_diff:.3g}")
@@ -0,0 +1,234 @@
+# model_registry.py (Versioned, hash-checked model artifacts with atomic hot-swap)
+import os
+import json
+import time
+import shutil
+import hashlib
+import threading
+from datetime import datetime, timezone
+import numpy as np
+from catalog_store import FEATURE_COLUMNS
+from mlp_numpy import WEIGHTS_FILE, NumpyMLP, fold_weights
+from ensemble import StackedMLP
+
+REGISTRY_DIR = 'model_registry'
+CURRENT_FILE = 'CURRENT'      # holds the active version name; replaced atomically
+MANIFEST_FILE = 'manifest.json'
+POLL_SECONDS = 2.0
+
+
+class RegistryError(Exception):
+    """A model version is missing, incomplete, or doesn't match its manifest."""
+
+
+# --- 1. Publishing (training side) ---
+def _sha256(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _write_version(arrays, manifest, registry, activate):
+    """
+    Save `arrays` as .npy files next to a manifest with the feature schema and a SHA-256
+    per file. The directory appears via rename and CURRENT is swapped with os.replace,
+    so readers never see a half-written version.
+    """
+    version = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%fZ')
+    staging = os.path.join(registry, f'.{version}.tmp')
+    os.makedirs(staging)
+    for name, array in arrays.items():
+        np.save(os.path.join(staging, f'{name}.npy'), np.ascontiguousarray(array))
+
+    manifest = {
+        'version': version,
+        'created': datetime.now(timezone.utc).isoformat(),
+        'feature_columns': list(FEATURE_COLUMNS),
+        **manifest,
+        'files': {f'{name}.npy': _sha256(os.path.join(staging, f'{name}.npy')) for name in arrays},
+    }
+    with open(os.path.join(staging, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    os.replace(staging, os.path.join(registry, version))
+    if activate:
+        set_current(version, registry)
+    return version
+
+
+def _layer_arrays(coefs, intercepts, scaler, classes):
+    arrays = {f'W{i}': w for i, w in enumerate(coefs)}
+    arrays.update({f'b{i}': b for i, b in enumerate(intercepts)})
+    arrays.update({'scaler_mean': np.asarray(scaler.mean_), 'scaler_scale': np.asarray(scaler.scale_),
+                   'classes': np.asarray(classes)})
+    return arrays
+
+
+def publish(mlp, scaler, metrics=None, registry=REGISTRY_DIR, activate=True):
+    """
+    Publish one MLP: one .npy per layer (scaler already folded in), the raw scaler
+    statistics and a manifest with the architecture and metrics.
+    """
+    coefs, intercepts = fold_weights(mlp, scaler)
+    manifest = {
+        'kind': 'mlp',
+        'n_layers': len(coefs),
+        'hidden_layer_sizes': [int(w.shape[1]) for w in coefs[:-1]],
+        'activation': mlp.activation,
+        'out_activation': mlp.out_activation_,
+        'metrics': metrics or {},
+    }
+    return _write_version(_layer_arrays(coefs, intercepts, scaler, mlp.classes_), manifest, registry, activate)
+
+
+def publish_ensemble(ensemble, scaler, metrics=None, registry=REGISTRY_DIR, activate=True):
+    """
+    Publish a calibrated StackedMLP: per-layer (members, n_in, n_out) arrays with the
+    scaler folded in, the raw scaler statistics, and the calibration (scalars in the
+    manifest, isotonic breakpoints as arrays).
+    """
+    arrays = _layer_arrays(ensemble.coefs, ensemble.intercepts, scaler, ensemble.classes_)
+    calibration = dict(ensemble.calibration or {'method': 'none'})
+    for key in ('x', 'y'):
+        if key in calibration:
+            arrays[f'calibration_{key}'] = np.asarray(calibration.pop(key), dtype=np.float64)
+    manifest = {
+        'kind': 'ensemble',
+        'n_layers': len(ensemble.coefs),
+        'n_members': int(ensemble.n_members),
+        'hidden_layer_sizes': [int(w.shape[2]) for w in ensemble.coefs[:-1]],
+        'activation': ensemble.activation,
+        'out_activation': 'logistic',
+        'calibration': {k: v if k == 'method' else float(v) for k, v in calibration.items()},
+        'metrics': metrics or {},
+    }
+    return _write_version(arrays, manifest, registry, activate)
+
+
+def set_current(version, registry=REGISTRY_DIR):
+    if not os.path.exists(os.path.join(registry, version, MANIFEST_FILE)):
+        raise RegistryError(f"no such model version: {version}")
+    tmp = os.path.join(registry, f'.{CURRENT_FILE}.{os.getpid()}')
+    with open(tmp, 'w') as f:
+        f.write(version)
+    os.replace(tmp, os.path.join(registry, CURRENT_FILE))
+
+
+def current_version(registry=REGISTRY_DIR):
+    try:
+        with open(os.path.join(registry, CURRENT_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def list_versions(registry=REGISTRY_DIR):
+    if not os.path.isdir(registry):
+        return []
+    return sorted(v for v in os.listdir(registry) if os.path.exists(os.path.join(registry, v, MANIFEST_FILE)))
+
+
+# --- 2. Loading (serving side, no sklearn or pickle) ---
+def load_version(version, registry=REGISTRY_DIR, verify=True):
+    """
+    Memory-map one version's arrays, check hashes and feature schema, and build a NumpyMLP
+    (or, for an ensemble version, a calibrated StackedMLP).
+    """
+    directory = os.path.join(registry, version)
+    try:
+        with open(os.path.join(directory, MANIFEST_FILE)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        raise RegistryError(f"cannot read manifest for {version}: {e}") from e
+
+    if manifest['feature_columns'] != list(FEATURE_COLUMNS):
+        raise RegistryError(f"{version} was trained on {manifest['feature_columns']}, app expects {FEATURE_COLUMNS}")
+    if verify:
+        for name, digest in manifest['files'].items():
+            path = os.path.join(directory, name)
+            if not os.path.exists(path) or _sha256(path) != digest:
+                raise RegistryError(f"{version}/{name} is missing or does not match its manifest hash")
+
+    def array(name):
+        return np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r')
+
+    n = manifest['n_layers']
+    if manifest.get('kind') == 'ensemble':
+        calibration = dict(manifest['calibration'])
+        if calibration['method'] == 'isotonic':
+            calibration.update(x=array('calibration_x'), y=array('calibration_y'))
+        model = StackedMLP([array(f'W{i}') for i in range(n)], [array(f'b{i}') for i in range(n)],
+                           manifest['activation'], None if calibration['method'] == 'none' else calibration,
+                           array('classes'))
+        model.manifest = manifest
+        return model
+    model = NumpyMLP([array(f'W{i}') for i in range(n)], [array(f'b{i}') for i in range(n)],
+                     manifest['activation'], manifest['out_activation'], array('classes'))
+    model.manifest = manifest
+    return model
+
+
+def load_current(registry=REGISTRY_DIR):
+    """
+    The active registry version, or the standalone exported weights file for trees that
+    predate the registry. Raises RegistryError instead of returning None.
+    """
+    version = current_version(registry)
+    if version is not None:
+        return load_version(version, registry)
+    if os.path.exists(WEIGHTS_FILE):
+        model = NumpyMLP.load(WEIGHTS_FILE)
+        model.manifest = {'version': 'legacy', 'feature_columns': list(FEATURE_COLUMNS), 'metrics': {}}
+        return model
+    raise RegistryError(f"no model in '{registry}' and no '{WEIGHTS_FILE}'; run create_model.py first")
+
+
+# --- 3. Hot-swapping Handle ---
+class ModelHandle:
+    """
+    Long-lived reference to the current model for app or service workers. get() re-reads
+    CURRENT at most every `poll_seconds` and only loads a version it hasn't seen; the swap
+    is a single attribute assignment, so in-flight callers keep the model they already had.
+    A broken new version leaves the previous model in place and is reported in last_error.
+    """
+
+    def __init__(self, registry=REGISTRY_DIR, poll_seconds=POLL_SECONDS):
+        self.registry = registry
+        self.poll_seconds = poll_seconds
+        self._lock = threading.Lock()
+        self._model = None
+        self._version = None
+        self._checked_at = 0.0
+        self.last_error = None
+
+    @property
+    def version(self):
+        return self._version
+
+    def get(self):
+        now = time.monotonic()
+        if self._model is not None and now - self._checked_at < self.poll_seconds:
+            return self._model
+        with self._lock:
+            self._checked_at = now
+            version = current_version(self.registry) or 'legacy'
+            if self._model is None or version != self._version:
+                try:
+                    model = load_current(self.registry)
+                except RegistryError as e:
+                    self.last_error = str(e)
+                    if self._model is None:
+                        raise
+                    return self._model
+                self._model, self._version, self.last_error = model, model.manifest['version'], None
+        return self._model
+
+
+def prune(keep=5, registry=REGISTRY_DIR):
+    """Delete all but the newest `keep` versions (never the active one)."""
+    active = current_version(registry)
+    for version in list_versions(registry)[:-keep]:
+        if version != active:
+            shutil.rmtree(os.path.join(registry, version))
@@ -0,0 +1,162 @@
+# model_search.py (Parallel, resumable hyperparameter search for the MLP)
+import os
+import json
+import hashlib
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from sklearn.model_selection import StratifiedKFold
+from sklearn.preprocessing import StandardScaler
+from sklearn.metrics import roc_auc_score
+from catalog_store import FEATURE_COLUMNS
+from mission_catalogs import load_unified
+from feature_pipeline import clean
+from training import train_model, DEFAULT_PROFILE
+
+SEARCH_DIR = '.search_cache'
+RESULTS_FILE = 'search_results.jsonl'
+
+# Thresholds are scored from each fit's probabilities, so they never trigger a refit.
+SEARCH_SPACE = {
+    'hidden_layer_sizes': [(16,), (16, 16), (32, 16), (32, 32), (64, 32), (16, 16, 16)],
+    'alpha': [1e-5, 1e-4, 1e-3, 1e-2],
+    'learning_rate_init': [1e-3, 3e-3, 1e-2],
+}
+THRESHOLDS = [0.5, 0.6, 0.7, 0.8, 0.9]
+
+
+# --- 1. Shared Inputs (written once per data version and fold count, memory-mapped by every worker) ---
+def prepare_inputs(n_folds=5, missions=('Kepler', 'TESS'), seed=42, refresh=False):
+    """
+    Write the unscaled X, y and fold assignment under SEARCH_DIR/<inputs id> and return
+    the id: a hash of the cleaned rows plus the fold count. A new download or a different
+    --folds gets its own directory, and results are tagged with the id they came from.
+    """
+    df = clean(load_unified(missions))
+    X = np.ascontiguousarray(df[FEATURE_COLUMNS].to_numpy(np.float64))
+    y = df['y'].to_numpy(np.int8)
+    inputs = f"{hashlib.sha256(X.tobytes() + y.tobytes()).hexdigest()[:12]}-k{n_folds}-s{seed}"
+    directory = os.path.join(SEARCH_DIR, inputs)
+    if os.path.exists(os.path.join(directory, 'folds.npy')) and not refresh:
+        return inputs
+
+    folds = np.empty(len(y), dtype=np.int8)
+    for k, (_, test_idx) in enumerate(StratifiedKFold(n_folds, shuffle=True, random_state=seed).split(X, y)):
+        folds[test_idx] = k
+    os.makedirs(directory, exist_ok=True)
+    for name, array in (('X', X), ('y', y), ('folds', folds)):  # folds last: its presence marks a complete set
+        np.save(os.path.join(directory, f'{name}.npy'), array)
+    return inputs
+
+
+def _open_inputs(inputs):
+    return tuple(np.load(os.path.join(SEARCH_DIR, inputs, f'{name}.npy'), mmap_mode='r') for name in ('X', 'y', 'folds'))
+
+
+# --- 2. Trials ---
+def trial_key(params):
+    return json.dumps(params, sort_keys=True)
+
+
+def iter_trials(mode='grid', n_iter=20, seed=42):
+    names = sorted(SEARCH_SPACE)
+    grid = [dict(zip(names, values)) for values in itertools.product(*(SEARCH_SPACE[n] for n in names))]
+    if mode == 'random':
+        rng = np.random.default_rng(seed)
+        grid = [grid[i] for i in rng.choice(len(grid), min(n_iter, len(grid)), replace=False)]
+    for params in grid:
+        yield {k: list(v) if isinstance(v, tuple) else v for k, v in params.items()}
+
+
+def run_fold(params, fold, inputs, profile=DEFAULT_PROFILE):
+    """
+    One cross-validation fold with the training.py engine. The scaler is fit on this fold's
+    training rows only, so the held-out fold never leaks into the standardisation.
+    """
+    X, y, folds = _open_inputs(inputs)
+    train, test = folds != fold, folds == fold
+    scaler = StandardScaler().fit(X[train])
+    mlp = train_model(scaler.transform(X[train]), y[train], profile,
+                      hidden_layer_sizes=tuple(params['hidden_layer_sizes']), alpha=params['alpha'],
+                      learning_rate_init=params['learning_rate_init'])
+    prob = mlp.predict_proba(scaler.transform(X[test]).astype(mlp.coefs_[0].dtype))[:, 1]
+    y_test = np.asarray(y[test])
+
+    result = {'key': trial_key(params), 'params': params, 'fold': int(fold), 'inputs': inputs, 'profile': profile,
+              'auc': float(roc_auc_score(y_test, prob)), 'n_iter': int(mlp.n_iter_), 'thresholds': {}}
+    for t in THRESHOLDS:
+        pred = prob >= t
+        tp = int((pred & (y_test == 1)).sum())
+        precision = tp / max(int(pred.sum()), 1)
+        recall = tp / max(int((y_test == 1).sum()), 1)
+        result['thresholds'][str(t)] = {
+            'accuracy': float((pred == y_test).mean()), 'precision': precision, 'recall': recall,
+            'f1': 2 * precision * recall / max(precision + recall, 1e-12),
+        }
+    return result
+
+
+# --- 3. Resumable Driver ---
+def load_results(path=RESULTS_FILE, inputs=None, profile=None):
+    """Stored fold results, optionally only those for one inputs id and training profile."""
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        results = [json.loads(line) for line in f if line.strip()]
+    return [r for r in results
+            if (inputs is None or r.get('inputs') == inputs) and (profile is None or r.get('profile') == profile)]
+
+
+def run_search(mode='grid', n_iter=20, n_folds=5, workers=None, path=RESULTS_FILE, profile=DEFAULT_PROFILE,
+               refresh_inputs=False):
+    """
+    Run every (trial, fold) pair not already in `path` for the current inputs and profile,
+    appending each as it finishes. Results from other data versions or fold counts stay in
+    the file but are neither resumed from nor summarized.
+    """
+    inputs = prepare_inputs(n_folds, refresh=refresh_inputs)
+    done = {(r['key'], r['fold']) for r in load_results(path, inputs, profile)}
+    todo = [(p, k) for p in iter_trials(mode, n_iter) for k in range(n_folds) if (trial_key(p), k) not in done]
+    print(f"Inputs {inputs}: {len(done)} folds already done, {len(todo)} to run.")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool, open(path, 'a') as out:
+        futures = [pool.submit(run_fold, params, fold, inputs, profile) for params, fold in todo]
+        for future in as_completed(futures):
+            out.write(json.dumps(future.result()) + '\n')
+            out.flush()  # an interrupted search keeps every finished fold
+    return summarize(path, inputs=inputs, profile=profile)
+
+
+def summarize(path=RESULTS_FILE, top=10, inputs=None, profile=None):
+    """Mean cross-validated AUC and best-threshold F1 per trial, best first."""
+    by_trial = {}
+    for r in load_results(path, inputs, profile):
+        by_trial.setdefault(r['key'], []).append(r)
+    rows = []
+    for key, runs in by_trial.items():
+        f1 = {t: np.mean([r['thresholds'][t]['f1'] for r in runs]) for t in runs[0]['thresholds']}
+        best_t = max(f1, key=f1.get)
+        rows.append({'params': runs[0]['params'], 'folds': len(runs), 'auc': float(np.mean([r['auc'] for r in runs])),
+                     'best_threshold': float(best_t), 'f1': float(f1[best_t])})
+    rows.sort(key=lambda r: r['auc'], reverse=True)
+    for r in rows[:top]:
+        print(f"AUC {r['auc']:.4f}  F1 {r['f1']:.4f} @ {r['best_threshold']:.2f}  ({r['folds']} folds)  {r['params']}")
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cross-validated hyperparameter search for the ExoSight MLP.")
+    parser.add_argument('--mode', choices=['grid', 'random'], default='random')
+    parser.add_argument('--n-iter', type=int, default=20, help="Trials to sample in random mode")
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--profile', default=DEFAULT_PROFILE, help="training.py profile each fold is fit with")
+    parser.add_argument('--results', default=RESULTS_FILE)
+    parser.add_argument('--refresh-inputs', action='store_true', help="Rewrite the shared X/y/fold arrays")
+    args = parser.parse_args(argv)
+    run_search(args.mode, args.n_iter, args.folds, args.workers, args.results, args.profile, args.refresh_inputs)
+
+
+if __name__ == "__main__":
+    main()
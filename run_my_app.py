@@ -1,9 +1,8 @@
 # run_my_app.py (Version 10.0 - Final Merged Version with Exoplanet Library)
+import os
+import hmac
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-import joblib
+import telemetry  # stdlib only; spans are no-ops unless EXOSIGHT_TRACE=1 or the admin page turns them on
 
 # --- 1. PAGE CONFIGURATION ---
 st.set_page_config(layout="wide", page_title="ExoSight AI Explorer", page_icon="🚀")
@@ -31,57 +30,236 @@ exoplanet_library_data = {
     "Kepler-452b": {"system": "Kepler-452", "discovery_mission": "Kepler", "planet_type": "Super-Earth", "fun_fact": "Sometimes nicknamed 'Earth's cousin' due to its similar orbit around a Sun-like star."},
 }
 
-# Functions to load dynamic data from your AI model
+# Functions to load dynamic data from your AI model. pandas, numpy and the app's
+# own modules are imported inside them, so a page only pays for what it uses
+# (startup_profile.py checks this against a time budget).
 @st.cache_resource
+def get_model_handle():
+    # Shared by every session; picks up newly published registry versions without a restart.
+    from model_registry import ModelHandle
+    return ModelHandle()
+
+@telemetry.traced('load_ml_assets')
 def load_ml_assets():
+    from model_registry import RegistryError
     try:
-        model = joblib.load('mlp_exoplanet_model.pkl')
-        scaler = joblib.load('scaler_object.pkl')
-        return model, scaler
-    except Exception: return None, None
+        return get_model_handle().get(), None
+    except RegistryError as e:
+        return None, str(e)
 
-@st.cache_data
-def load_candidate_data():
+# Each table is published once per dataset version to shared memory and memory-mapped by
+# every server process (shared_catalogs.py). cache_resource then hands all sessions that one
+# read-only frame, where cache_data would unpickle a private copy on every rerun.
+@telemetry.traced('load_confidence_store', cache=True)
+@st.cache_resource
+def load_confidence_store(version):
+    # Every scored object, highest confidence first, so any threshold is a binary search.
+    telemetry.cache_miss('load_confidence_store')
+    from confidence_store import open_store
     try:
-        df = pd.read_csv('ai_identified_candidates.csv')
-        return df
-    except Exception: return pd.DataFrame()
+        return open_store()
+    except Exception: return None
 
-@st.cache_data
-def load_full_kepler_data():
+@telemetry.traced('load_candidate_data', cache=True)
+@st.cache_resource
+def load_candidate_data(version, _store):
+    # The AI candidate list: archive FALSE POSITIVEs the model rates at or above CONFIDENCE_THRESHOLD.
+    telemetry.cache_miss('load_candidate_data')
+    import pandas as pd
+    from catalog_store import CONFIDENCE_THRESHOLD
+    if _store is None:
+        return pd.DataFrame()
+    return _store.rows(CONFIDENCE_THRESHOLD, _store.select(dispositions=['FALSE POSITIVE']))
+
+@telemetry.traced('load_full_kepler_data', cache=True)
+@st.cache_resource
+def load_full_kepler_data(version):
+    telemetry.cache_miss('load_full_kepler_data')
+    import pandas as pd
+    from shared_catalogs import load_host_stars
     try:
-        df = pd.read_csv("cumulative_2025.10.03_00.23.38.csv", skiprows=53)
-        stars_df = df[['kepid', 'koi_srad', 'koi_steff']].drop_duplicates(subset=['kepid'])
-        stars_df.dropna(subset=['koi_srad'], inplace=True)
-        return stars_df
+        return load_host_stars()
     except Exception: return pd.DataFrame()
 
-mlp_model, scaler = load_ml_assets()
-ai_planets_df = load_candidate_data()
-host_stars_df = load_full_kepler_data()
-FEATURE_COLUMNS = ['koi_period', 'koi_prad', 'koi_teq', 'koi_duration', 'koi_impact', 'koi_insol']
+def get_data_version():
+    # The confidence store is scored with the current model on first use if training never wrote it.
+    from catalog_store import KEPLER_FILE, dataset_version
+    from confidence_store import ensure_store
+    return dataset_version(KEPLER_FILE, ensure_store())
+
+# Derived structures are keyed on the data version; the leading underscore keeps
+# Streamlit from hashing the DataFrame itself on every rerun.
+@telemetry.traced('load_galaxy_lod', cache=True)
+@st.cache_resource
+def load_galaxy_lod(version, _stars_df):
+    # Binned aggregates for every zoom level, built once per dataset.
+    telemetry.cache_miss('load_galaxy_lod')
+    from galaxy_lod import build_lod
+    return build_lod(_stars_df)
+
+@telemetry.traced('load_lookup_indexes', cache=True)
+@st.cache_resource
+def load_lookup_indexes(version, _stars_df, _planets_df, _scored_df):
+    telemetry.cache_miss('load_lookup_indexes')
+    from kepid_index import KepidIndex, SearchIndex
+    # The System View opens Kepler hosts, so only Kepler candidates are keyed by kepid (TIC IDs can collide).
+    return KepidIndex(_stars_df), KepidIndex(_planets_df, mission='Kepler'), SearchIndex(_scored_df)
+
+@telemetry.traced('load_sky_catalog', cache=True)
+@st.cache_resource
+def load_sky_catalog(version):
+    # k-d trees over KOI/TOI sky positions, their cross-match and the sky map's LOD bins.
+    telemetry.cache_miss('load_sky_catalog')
+    from sky_index import SkyCatalog
+    return SkyCatalog.load()
+
+@telemetry.traced('load_attributions', cache=True)
+@st.cache_resource
+def load_attributions(version):
+    # Per-candidate integrated gradients written by attributions.py; None until it has run.
+    telemetry.cache_miss('load_attributions')
+    from attributions import open_attributions
+    return open_attributions()
+
+@telemetry.traced('load_lightcurve_store', cache=True)
+@st.cache_resource
+def load_lightcurve_store(build):
+    # Memory-mapped flux arrays of the store's current build (lightcurves.py); None until
+    # `python lightcurves.py` has built them. Keyed on the build, so a rebuild is picked up.
+    telemetry.cache_miss('load_lightcurve_store')
+    from lightcurves import open_store
+    return open_store()
+
+@telemetry.traced('load_ephemerides', cache=True)
+@st.cache_resource
+def load_ephemerides(version):
+    telemetry.cache_miss('load_ephemerides')
+    from lightcurves import load_ephemerides
+    from kepid_index import KepidIndex
+    return KepidIndex(load_ephemerides())
+
+@telemetry.traced('load_sweep', cache=True)
+@st.cache_resource(max_entries=16)
+def load_sweep(model_version, fixed_inputs, axes, _model):
+    # One scored grid per (model version, fixed inputs, grid spec); a new threshold only redraws it.
+    telemetry.cache_miss('load_sweep')
+    from catalog_store import FEATURE_COLUMNS
+    from sweep import sweep_grid
+    return sweep_grid(_model, dict(zip(FEATURE_COLUMNS, fixed_inputs)), axes)
+
+@st.cache_resource
+def get_figure_cache():
+    # One cache per server process, shared by every session.
+    from figure_cache import FigureCache
+    return FigureCache()
+
+@st.cache_resource
+def start_metrics_server(port):
+    # Optional Prometheus scrape endpoint: EXOSIGHT_METRICS_PORT=9464 streamlit run run_my_app.py
+    return telemetry.serve(port)
+
+if os.environ.get('EXOSIGHT_METRICS_PORT'):
+    start_metrics_server(int(os.environ['EXOSIGHT_METRICS_PORT']))
 
 if 'selected_star_kepid' not in st.session_state:
     st.session_state.selected_star_kepid = None
+if 'galaxy_view' not in st.session_state:
+    st.session_state.galaxy_view = None  # (kepid_min, kepid_max, teff_min, teff_max) or None for everything
+if 'sky_view' not in st.session_state:
+    st.session_state.sky_view = None  # (ra_min, ra_max, dec_min, dec_max) or None for everything
+
+# --- HIDDEN ADMIN PAGE (?page=admin; not listed in the sidebar) ---
+def admin_token():
+    # The page exists only when a token is configured: EXOSIGHT_ADMIN_TOKEN, or admin_token in .streamlit/secrets.toml.
+    token = os.environ.get('EXOSIGHT_ADMIN_TOKEN')
+    if not token:
+        try:
+            token = st.secrets.get('admin_token')
+        except FileNotFoundError:  # no secrets.toml at all
+            token = None
+    return str(token) if token else None
+
+if st.query_params.get("page") == "admin" and admin_token():
+    st.title("ExoSight Admin: Performance")
+    entered = st.text_input("Admin token", type="password", key="admin_token")
+    if not hmac.compare_digest(entered.encode(), admin_token().encode()):
+        if entered:
+            st.error("Wrong admin token.")
+        st.stop()  # nothing below, including the telemetry toggle and reset, runs without the token
+    telemetry.set_enabled(st.toggle("Record timings (all sessions in this server process)", value=telemetry.ENABLED))
+    if st.button("Reset metrics"):
+        telemetry.METRICS.reset()
+
+    traces = list(telemetry.METRICS.traces)[::-1]
+    st.subheader("Recent reruns")
+    if traces:
+        st.dataframe([{'page': t.name, 'started': f"{t.started:.0f}", 'total ms': round(t.total * 1000, 2),
+                       'slowest span': max(t.spans, key=lambda s: s[1])[0] if t.spans else ''} for t in traces],
+                     use_container_width=True)
+        chosen = st.selectbox("Rerun breakdown", range(len(traces)),
+                              format_func=lambda i: f"#{i} {traces[i].name} ({traces[i].total * 1000:.1f} ms)")
+        st.dataframe([{'span': '  ' * depth + name, 'ms': round(seconds * 1000, 3)}
+                      for name, seconds, depth in traces[chosen].spans], use_container_width=True)
+    else:
+        st.info("No reruns recorded yet. Turn on timings and use the app in another tab.")
+
+    st.subheader("Cache hit rates")
+    rates = telemetry.cache_hit_rates()
+    if rates:
+        st.dataframe([{'cache': name, 'lookups': lookups, 'misses': misses, 'hit rate': f"{rate:.1%}"}
+                      for name, (lookups, misses, rate) in sorted(rates.items())], use_container_width=True)
+    st.caption(f"Figure cache: {get_figure_cache().stats()}")
+
+    st.subheader("Prometheus export")
+    metrics_text = telemetry.prometheus_text()
+    st.download_button("Download metrics.txt", metrics_text, file_name="metrics.txt")
+    st.code(metrics_text, language=None)
+    st.stop()
 
 # --- 4. SIDEBAR CONTROLS ---
+# ?page=library (etc.) opens a tool directly, so a link to a light page never loads the heavy ones.
+PAGES = {"dashboard": "AI Dashboard & Explorer", "predict": "Live Prediction Tool", "library": "Exoplanet Library"}
+page_names = list(PAGES.values())
+# Sidebar disposition choices -> archive labels in the confidence store (None = every label).
+DISPOSITION_FILTERS = {"FALSE POSITIVE (AI re-evaluated)": ["FALSE POSITIVE"], "CANDIDATE": ["CANDIDATE"], "All": None}
+TABLE_ROWS = 1000  # top-k rows sent to the table; the metric above it counts all matches
+if 'app_mode' not in st.session_state:
+    st.session_state.app_mode = PAGES.get(st.query_params.get("page"), page_names[0])
+
 with st.sidebar:
     st.title("🚀 ExoSight Controls")
-    app_mode = st.radio(
-        "Choose a tool:",
-        ("AI Dashboard & Explorer", "Live Prediction Tool", "Exoplanet Library")
-    )
+    app_mode = st.radio("Choose a tool:", page_names, key='app_mode')
     st.markdown("---")
-    
-    filtered_planets = ai_planets_df.copy()
-    if app_mode == "AI Dashboard & Explorer" and not ai_planets_df.empty:
-        st.header("Candidate List Filters")
-        search_id = st.text_input("Search AI Candidates by Kepler ID")
-        if search_id:
-            filtered_planets = filtered_planets[filtered_planets['kepid'].astype(str).str.contains(search_id)]
-        
-        confidence_threshold = st.slider('Filter by AI Confidence Score', 0.80, 1.0, 0.80, 0.01)
-        filtered_planets = filtered_planets[filtered_planets['confidence'] >= confidence_threshold]
+st.query_params["page"] = next(slug for slug, name in PAGES.items() if name == app_mode)
+telemetry.start_trace(st.query_params["page"])
+
+if app_mode == "AI Dashboard & Explorer":
+    from catalog_store import CONFIDENCE_THRESHOLD
+    data_version = get_data_version()
+    confidence_store = load_confidence_store(data_version)
+    ai_planets_df = load_candidate_data(data_version, confidence_store)
+    host_stars_df = load_full_kepler_data(data_version)
+    figure_cache = get_figure_cache()
+
+    filtered_planets, candidates_in_view = ai_planets_df, len(ai_planets_df)
+    if not ai_planets_df.empty:
+        star_index, planet_index, candidate_search = load_lookup_indexes(data_version, host_stars_df, ai_planets_df,
+                                                                         confidence_store.df)
+        with st.sidebar, telemetry.span('dashboard.filter'):
+            st.header("Candidate List Filters")
+            search_id = st.text_input("Search AI Candidates by Kepler ID or KOI name")
+            search_positions = candidate_search.positions(search_id) if search_id else None
+
+            missions = st.multiselect("Missions", confidence_store.missions(), default=confidence_store.missions())
+            disposition = st.selectbox("Archive disposition", list(DISPOSITION_FILTERS))
+            confidence_threshold = st.slider('Filter by AI Confidence Score', 0.0, 1.0, CONFIDENCE_THRESHOLD, 0.01)
+            # Binary searches on the sorted store: any threshold works without retraining,
+            # and only the rows actually shown are gathered.
+            partitions = confidence_store.select(missions, DISPOSITION_FILTERS[disposition])
+            candidates_in_view = confidence_store.count(confidence_threshold, partitions, search_positions)
+            filtered_planets = confidence_store.rows(confidence_threshold, partitions, search_positions, limit=TABLE_ROWS)
+elif app_mode == "Live Prediction Tool":
+    mlp_model, model_error = load_ml_assets()
 
 # --- 5. MAIN PAGE LAYOUT ---
 st.title("ExoSight AI Explorer")
@@ -98,54 +276,128 @@ if app_mode == "AI Dashboard & Explorer":
         col1, col2, col3 = st.columns(3)
         col1.metric("Total AI Candidates", len(ai_planets_df))
         col2.metric("Highest Confidence", f"{ai_planets_df['confidence'].max():.2%}")
-        col3.metric("Candidates in View", len(filtered_planets))
+        col3.metric("Candidates in View", candidates_in_view)
         st.markdown("---")
 
         st.subheader("Filterable AI Candidate List")
         if not filtered_planets.empty:
-            st.dataframe(filtered_planets.style.format({'confidence': "{:.2%}"}))
+            with telemetry.span('render.candidate_table'):
+                st.dataframe(filtered_planets.style.format(
+                    {c: "{:.2%}" for c in ('confidence', 'uncertainty') if c in filtered_planets.columns}))
+            if candidates_in_view > len(filtered_planets):
+                st.caption(f"Showing the {len(filtered_planets)} highest-confidence of {candidates_in_view} matches.")
         else:
             st.warning("No candidates match your filters.")
+
+        st.subheader("Confidence Distribution")
+        import numpy as np
+        edges = np.linspace(0.0, 1.0, 21)
+        st.bar_chart({'confidence': [f"{lo:.2f}" for lo in edges[:-1]],
+                      'objects': confidence_store.histogram(edges, partitions)},
+                     x='confidence', y='objects')
         st.markdown("---")
 
         st.subheader("Galaxy Explorer")
         st.markdown("Click a host star in the 'Galaxy View' (left) to explore its system in the 'System View' (right).")
         exp_col1, exp_col2 = st.columns([2, 1])
 
+        from galaxy_lod import galaxy_figure, system_figure
+
         with exp_col1:
             st.subheader("Galaxy View: Host Stars")
-            fig_galaxy = px.scatter(
-                host_stars_df, x='kepid', y='koi_steff', size='koi_srad', color='koi_steff',
-                hover_name='kepid', custom_data=['kepid'],
-                color_continuous_scale=px.colors.sequential.Plasma, title="Kepler Host Stars"
-            )
-            fig_galaxy.update_layout(xaxis_title="Kepler ID", yaxis_title="Stellar Temperature (K)", plot_bgcolor='#0d1117', paper_bgcolor='#0d1117', font_color='white')
-            
-            click_data = st.plotly_chart(fig_galaxy, use_container_width=True, on_select="rerun")
+            galaxy_map = st.radio("Map", ["Sky (RA/Dec)", "Kepler ID vs temperature"], horizontal=True,
+                                  label_visibility="collapsed")
+            # Dense views are drawn as binned aggregates; clicking a bin zooms into it
+            # until few enough stars are in view to draw (and select) them individually.
+            if galaxy_map == "Sky (RA/Dec)":
+                from sky_index import SkyCatalog
+                from galaxy_lod import sky_figure
+                sky_version = SkyCatalog.version()
+                hz_only = st.checkbox("Only hosts of habitable-zone objects")
+                view_key, view = 'sky_view', st.session_state.sky_view
+                fig_galaxy = figure_cache.get_or_build(
+                    ('sky', sky_version, view, hz_only),
+                    lambda: sky_figure(load_sky_catalog(sky_version).lod(hz_only), view))
+            else:
+                view_key, view = 'galaxy_view', st.session_state.galaxy_view
+                fig_galaxy = figure_cache.get_or_build(
+                    ('galaxy', data_version, view),
+                    lambda: galaxy_figure(load_galaxy_lod(data_version, host_stars_df), view))
+            if view is not None and st.button("Reset Galaxy zoom"):
+                st.session_state[view_key] = None
+                st.rerun()
+
+            with telemetry.span('render.galaxy_chart'):  # Plotly JSON serialization + send
+                click_data = st.plotly_chart(fig_galaxy, use_container_width=True, on_select="rerun")
             if click_data.selection and click_data.selection['points']:
-                st.session_state.selected_star_kepid = click_data.selection['points'][0]['x']
+                point = click_data.selection['points'][0]
+                customdata = point.get('customdata') or [point['x']]
+                if len(customdata) == 4:  # an aggregated bin: zoom into its edges
+                    st.session_state[view_key] = tuple(customdata)
+                    st.rerun()
+                # Sky-map TESS stars without a Kepler counterpart have nothing to open.
+                if customdata[0] is not None and customdata[0] == customdata[0] and int(customdata[0]) in star_index:
+                    st.session_state.selected_star_kepid = int(customdata[0])
 
         with exp_col2:
             st.subheader("System View")
             if st.session_state.selected_star_kepid:
                 selected_id = st.session_state.selected_star_kepid
-                star_info = host_stars_df.query("kepid == @selected_id").iloc[0]
-                planets_in_system = ai_planets_df.query("kepid == @selected_id")
+                star_info = star_index.rows(selected_id).iloc[0]
+                planets_in_system = planet_index.rows(selected_id)
                 
                 st.metric("Exploring System", f"Kepler ID: {selected_id}")
-                
-                fig_system = go.Figure()
-                fig_system.add_trace(go.Scatter(x=[0], y=[0], mode='markers', marker=dict(size=star_info['koi_srad'] * 20, color='yellow'), name=f'Star {selected_id}'))
-                
-                if not planets_in_system.empty:
-                    fig_system.add_trace(go.Scatter(
-                        x=planets_in_system['koi_period'], y=[0] * len(planets_in_system), mode='markers',
-                        marker=dict(size=planets_in_system['koi_prad'] * 5, color=planets_in_system['koi_teq'], colorscale='cividis', showscale=True, colorbar_title='Planet Temp (K)'),
-                        hovertext=planets_in_system.apply(lambda r: f"Planet: {r.get('kepoi_name', 'N/A')}<br>Confidence: {r['confidence']:.2%}", axis=1),
-                        hoverinfo="text", name='Planets'
-                    ))
-                fig_system.update_layout(title=f'Planetary System for Star {selected_id}', xaxis_title="Orbital Period (days)", yaxis=dict(visible=False), plot_bgcolor='#0d1117', paper_bgcolor='#0d1117', font_color='white')
-                st.plotly_chart(fig_system, use_container_width=True)
+                fig_system = figure_cache.get_or_build(
+                    ('system', data_version, selected_id),
+                    lambda: system_figure(star_info['koi_srad'], planets_in_system, selected_id))
+                with telemetry.span('render.system_chart'):
+                    st.plotly_chart(fig_system, use_container_width=True)
+
+                from attributions import ATTRIBUTION_FILE, attribution_figure
+                from catalog_store import dataset_version
+                attribution_table = load_attributions(dataset_version(ATTRIBUTION_FILE))
+                explained = [name for name in planets_in_system['kepoi_name'] if attribution_table is not None
+                             and name in attribution_table]
+                if explained:
+                    st.subheader("Why the AI Flags It")
+                    explain_name = st.selectbox("Explain", explained) if len(explained) > 1 else explained[0]
+                    fig_attribution = figure_cache.get_or_build(
+                        ('attribution', dataset_version(ATTRIBUTION_FILE), explain_name),
+                        lambda: attribution_figure(attribution_table, explain_name))
+                    with telemetry.span('render.attribution_chart'):
+                        st.plotly_chart(fig_attribution, use_container_width=True)
+                    st.caption("Integrated gradients of the scoring model's confidence from an average object; "
+                               "the bars add up to the difference between the two scores.")
+                elif attribution_table is None:
+                    st.caption("Run `python attributions.py` to explain candidates here.")
+
+                from sky_index import SkyCatalog
+                sky_catalog = load_sky_catalog(SkyCatalog.version())
+                tess_matches = sky_catalog.counterparts(selected_id)
+                if not tess_matches.empty:
+                    st.caption(f"TESS objects within {sky_catalog.radius:g}\" of this star")
+                    st.dataframe(tess_matches[['kepoi_name', 'koi_pdisposition', 'separation_arcsec']]
+                                 .rename(columns={'kepoi_name': 'TOI', 'koi_pdisposition': 'disposition'}),
+                                 hide_index=True)
+
+                from lightcurves import read_manifest
+                lightcurve_manifest = read_manifest()
+                lightcurve_store = load_lightcurve_store(lightcurve_manifest['build']) if lightcurve_manifest else None
+                if lightcurve_store is not None and selected_id in lightcurve_store:
+                    st.subheader("Phase-folded Light Curve")
+                    kois = load_ephemerides(data_version).rows(selected_id)
+                    koi_name = st.selectbox("Fold on", kois['kepoi_name'].tolist()) if len(kois) > 1 \
+                        else kois['kepoi_name'].iloc[0]
+                    koi = kois[kois['kepoi_name'] == koi_name].iloc[0]
+                    from lightcurves import lightcurve_figure
+                    fig_fold = figure_cache.get_or_build(
+                        ('fold', lightcurve_store.version, koi_name),
+                        lambda: lightcurve_figure(lightcurve_store, selected_id, koi_name, koi['koi_period'],
+                                                  koi['koi_time0bk'], koi['koi_duration']))
+                    with telemetry.span('render.lightcurve_chart'):
+                        st.plotly_chart(fig_fold, use_container_width=True)
+                elif lightcurve_manifest is None:
+                    st.caption("Add light curves to lightcurves/ and run `python lightcurves.py` to fold transits here.")
             else:
                 st.info("Click a star to see its system here.")
 
@@ -153,7 +405,14 @@ if app_mode == "AI Dashboard & Explorer":
 elif app_mode == "Live Prediction Tool":
     st.subheader("Live MLP Prediction Tool")
     st.markdown("Enter the parameters of a potential transit to get a real-time prediction from our AI model.")
-    if mlp_model and scaler:
+    if mlp_model:
+        model_metrics = mlp_model.manifest.get('metrics', {})
+        if 'test_accuracy' in model_metrics:
+            line = f"Model {mlp_model.manifest['version']}: test accuracy {model_metrics['test_accuracy']:.1%}"
+            if 'single_mlp_test_accuracy' in model_metrics:
+                line += f" (single MLP on the same split: {model_metrics['single_mlp_test_accuracy']:.1%})"
+            st.caption(line)
+        prediction_mode = st.radio("Mode", ["Single prediction", "Sensitivity sweep"], horizontal=True)
         with st.container():
             cols = st.columns(3)
             period = cols[0].number_input('Orbital Period (days)', value=5.0, format="%.4f")
@@ -163,14 +422,52 @@ elif app_mode == "Live Prediction Tool":
             impact = cols[1].number_input('Impact Parameter', value=0.5, format="%.2f")
             insol = cols[2].number_input('Insolation Flux (Earth flux)', value=100.0, format="%.2f")
 
-            if st.button('Analyze with AI', type="primary", use_container_width=True):
-                input_data = pd.DataFrame([[period, prad, teq, duration, impact, insol]], columns=FEATURE_COLUMNS)
-                input_scaled = scaler.transform(input_data)
-                prediction_prob = mlp_model.predict_proba(input_scaled)[0, 1] * 100
+            if prediction_mode == "Single prediction" and st.button('Analyze with AI', type="primary", use_container_width=True):
+                input_data = [[period, prad, teq, duration, impact, insol]]
+                with telemetry.span('predict'):
+                    prediction_prob = mlp_model.predict_proba(input_data)[0, 1] * 100
                 st.subheader("AI Analysis Result:")
                 st.metric(label="Probability of being a real Exoplanet Candidate", value=f"{prediction_prob:.2f}%")
+
+        if prediction_mode == "Sensitivity sweep":
+            from catalog_store import FEATURE_COLUMNS, CONFIDENCE_THRESHOLD
+            from sweep import SWEEP_RANGES, FEATURE_LABELS, axis_spec, fraction_above, sweep_figure
+            st.markdown("Vary one or two inputs across their range while the others stay at the values above.")
+            sweep_cols = st.columns(3)
+            x_feature = sweep_cols[0].selectbox("Sweep", FEATURE_COLUMNS, format_func=FEATURE_LABELS.get)
+            y_options = [''] + [c for c in FEATURE_COLUMNS if c != x_feature]  # '' sweeps x alone
+            y_feature = sweep_cols[1].selectbox("Against", y_options, index=1,
+                                                format_func=lambda c: FEATURE_LABELS.get(c, "Nothing (1-D curve)"))
+            resolutions = [100, 250, 500, 1000] if y_feature else [1000, 10_000, 100_000, 1_000_000]
+            resolution = sweep_cols[2].select_slider("Points per axis", resolutions, value=resolutions[2])
+            with st.expander("Axis ranges"):
+                ranges = {}
+                for feature in filter(None, (x_feature, y_feature)):
+                    lo, hi, log = SWEEP_RANGES[feature]
+                    range_cols = st.columns(2)
+                    ranges[feature] = (range_cols[0].number_input(f"{FEATURE_LABELS[feature]} from", value=lo),
+                                       range_cols[1].number_input(f"{FEATURE_LABELS[feature]} to", value=hi))
+            sweep_threshold = st.slider("Candidate threshold", 0.0, 1.0, CONFIDENCE_THRESHOLD, 0.01)
+            try:
+                axes = tuple(axis_spec(f, resolution, *ranges[f]) for f in filter(None, (x_feature, y_feature)))
+            except ValueError as e:
+                st.error(str(e))
+            else:
+                # Scoring is keyed on everything but the threshold, so moving that slider
+                # (or coming back to an earlier setting) re-renders without rescoring.
+                model_version = mlp_model.manifest['version']
+                fixed_inputs = (period, prad, teq, duration, impact, insol)
+                with telemetry.span('predict.sweep'):
+                    grid = load_sweep(model_version, fixed_inputs, axes, mlp_model)
+                fig_sweep = get_figure_cache().get_or_build(
+                    ('sweep', model_version, fixed_inputs, axes, sweep_threshold),
+                    lambda: sweep_figure(grid, axes, sweep_threshold))
+                st.metric(f"Share of the {grid.size:,}-point grid at or above {sweep_threshold:.2f}",
+                          f"{fraction_above(grid, sweep_threshold):.1%}")
+                with telemetry.span('render.sweep_chart'):
+                    st.plotly_chart(fig_sweep, use_container_width=True)
     else:
-        st.error("AI Model not loaded! Please ensure create_model.py was run and .pkl files are present.")
+        st.error(f"AI Model not loaded! {model_error}")
 
 # --- PAGE 3: NEW EXOPLANET LIBRARY ---
 elif app_mode == "Exoplanet Library":
@@ -197,3 +494,5 @@ elif app_mode == "Exoplanet Library":
             st.markdown("---")
             st.subheader("Fun Fact")
             st.info(planet_info['fun_fact'])
+
+telemetry.end_trace()
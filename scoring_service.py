@@ -0,0 +1,242 @@
+# scoring_service.py (Headless HTTP API for the ExoSight model and candidate list)
+import os
+import time
+import asyncio
+import argparse
+import numpy as np
+from aiohttp import web
+from catalog_store import FEATURE_COLUMNS, CANDIDATE_FILE
+from model_registry import POLL_SECONDS, ModelHandle
+from kepid_index import KepidIndex
+from mission_catalogs import MISSION_COLUMN
+from shared_catalogs import load_candidates
+import telemetry
+
+DEFAULT_PORT = 8600
+MAX_BATCH_ROWS = 4096     # rows merged into one forward pass
+MAX_WAIT_SECONDS = 0.002  # how long the first queued request waits for company
+MAX_REQUEST_ROWS = MAX_BATCH_ROWS  # per /predict/batch call; whole catalogs belong in batch_predict.py
+DEFAULT_CANDIDATE_LIMIT = 100
+MAX_CANDIDATE_LIMIT = 1000  # larger ?limit= values are capped; the full list is the CSV itself
+
+
+# --- 1. Micro-batching ---
+class MicroBatcher:
+    """
+    Collects feature rows from concurrent requests and scores them with one
+    vectorised predict_proba call, then hands each request back its own slice.
+    """
+
+    def __init__(self, model_handle, max_rows=MAX_BATCH_ROWS, max_wait=MAX_WAIT_SECONDS):
+        self.model_handle = model_handle
+        self.max_rows = max_rows
+        self.max_wait = max_wait
+        self.queue = asyncio.Queue()
+        self.batches = 0
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+
+    async def score(self, X):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((X, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self.queue.get()]
+            rows = len(pending[0][0])
+            deadline = loop.time() + self.max_wait
+            while rows < self.max_rows:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                pending.append(item)
+                rows += len(item[0])
+
+            # A caller that disconnected or timed out has a cancelled future; leave it alone.
+            pending = [(X, future) for X, future in pending if not future.done()]
+            try:
+                self._score(pending)
+            except Exception as e:  # never let one bad batch stop the loop for everyone else
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _score(self, pending):
+        if not pending:
+            return
+        with telemetry.span('service.predict_batch'):
+            confidence = self.model_handle.get().predict_proba(np.concatenate([X for X, _ in pending]))[:, 1]
+        self.batches += 1
+        start = 0
+        for X, future in pending:
+            if not future.done():
+                future.set_result(confidence[start:start + len(X)])
+            start += len(X)
+
+
+# --- 2. Request Parsing ---
+def parse_rows(payload, max_rows=MAX_REQUEST_ROWS):
+    """Accepts one {feature: value} object or 6-value list, or a list of either (at most `max_rows`)."""
+    rows = payload if isinstance(payload, list) else [payload]
+    if rows and not isinstance(rows[0], (list, dict)):
+        rows = [rows]
+    if len(rows) > max_rows:
+        raise ValueError(f"{len(rows)} rows is more than the {max_rows} allowed per request")
+    if rows and isinstance(rows[0], dict):
+        for i, row in enumerate(rows):
+            if not isinstance(row, dict):
+                raise ValueError(f"row {i} is not a {{feature: value}} object like row 0")
+            missing = [c for c in FEATURE_COLUMNS if c not in row]
+            if missing:
+                raise ValueError(f"row {i} is missing features: {missing}")
+        rows = [[row[c] for c in FEATURE_COLUMNS] for row in rows]
+    X = np.asarray(rows, dtype=np.float64)
+    if X.ndim != 2 or X.shape[1] != len(FEATURE_COLUMNS):
+        raise ValueError(f"expected rows of {len(FEATURE_COLUMNS)} features: {FEATURE_COLUMNS}")
+    if not np.isfinite(X).all():
+        raise ValueError("features must be finite numbers")
+    return X
+
+
+async def _read_features(request):
+    try:
+        return parse_rows(await request.json())
+    except (ValueError, TypeError) as e:
+        raise web.HTTPBadRequest(text=str(e))
+
+
+# --- 3. Handlers ---
+async def health(request):
+    handle = request.app['model_handle']
+    handle.get()
+    return web.json_response({'status': 'ok', 'model_version': handle.version, 'model_error': handle.last_error,
+                              'candidates': len(request.app['candidates'].get()[0])})
+
+
+async def predict(request):
+    X = await _read_features(request)
+    if len(X) != 1:
+        raise web.HTTPBadRequest(text="use /predict/batch for more than one row")
+    confidence = await request.app['batcher'].score(X)
+    return web.json_response({'confidence': float(confidence[0])})
+
+
+async def predict_batch(request):
+    X = await _read_features(request)
+    confidence = await request.app['batcher'].score(X)
+    return web.json_response({'confidence': confidence.tolist()})
+
+
+async def candidates(request):
+    """
+    GET /candidates?min_confidence=0.9&max_confidence=1&kepid=123&mission=Kepler&limit=100
+    A kepid is a KIC ID by default; pass mission=TESS to look up a TIC ID.
+    """
+    df, index = request.app['candidates'].get()
+    try:
+        lo = float(request.query.get('min_confidence', 0.0))
+        hi = float(request.query.get('max_confidence', 1.0))
+        limit = int(request.query.get('limit', DEFAULT_CANDIDATE_LIMIT))
+        if limit < 1:
+            raise ValueError(f"limit must be at least 1, got {limit}")
+        kepid = request.query.get('kepid')
+        if kepid is not None:
+            mission = request.query.get('mission', 'Kepler')
+            if mission not in index:
+                raise ValueError(f"unknown mission {mission!r}; expected one of {sorted(index)}")
+            df = index[mission].rows(int(kepid))
+    except ValueError as e:
+        raise web.HTTPBadRequest(text=str(e))
+    df = df[(df['confidence'] >= lo) & (df['confidence'] <= hi)].head(min(limit, MAX_CANDIDATE_LIMIT))
+    # DataFrame.to_json turns NaN into null, which json.dumps would not.
+    body = f'{{"count": {len(df)}, "candidates": {df.to_json(orient="records")}}}'
+    return web.Response(text=body, content_type='application/json')
+
+
+async def metrics(request):
+    """Prometheus scrape endpoint; spans are recorded when started with --trace or EXOSIGHT_TRACE=1."""
+    return web.Response(text=telemetry.prometheus_text(), headers={'Content-Type': telemetry.CONTENT_TYPE})
+
+
+# --- 4. App Setup ---
+class CandidateHandle:
+    """
+    The candidate table and a kepid index per mission, reloaded when the file changes on
+    disk (a create_model run or an incremental refresh rewrites it), checked at most every
+    `poll_seconds` like ModelHandle. Callers get the frame and indexes as one pair.
+    """
+
+    def __init__(self, path=CANDIDATE_FILE, poll_seconds=POLL_SECONDS):
+        self.path = path
+        self.poll_seconds = poll_seconds
+        self._loaded = None
+        self._stamp = None
+        self._checked_at = 0.0
+
+    def _file_stamp(self):
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def get(self):
+        now = time.monotonic()
+        if self._loaded is not None and now - self._checked_at < self.poll_seconds:
+            return self._loaded
+        self._checked_at = now
+        stamp = self._file_stamp()
+        if stamp != self._stamp:
+            df = load_candidates(self.path)  # same shared-memory table the app workers map
+            missions = df[MISSION_COLUMN].unique() if MISSION_COLUMN in df.columns else ['Kepler']
+            self._loaded = df, {str(m): KepidIndex(df, mission=str(m)) for m in missions}
+            self._stamp = stamp
+        return self._loaded
+
+
+def create_app(candidate_file=CANDIDATE_FILE):
+    app = web.Application()
+    app['model_handle'] = ModelHandle()
+    app['model_handle'].get()  # fail at startup, not on the first request
+    app['candidates'] = CandidateHandle(candidate_file)
+    app['candidates'].get()  # likewise for a missing or unreadable candidate file
+    app['batcher'] = MicroBatcher(app['model_handle'])
+
+    async def start_batcher(app):
+        app['batcher'].start()
+
+    async def stop_batcher(app):
+        await app['batcher'].stop()
+
+    app.on_startup.append(start_batcher)
+    app.on_cleanup.append(stop_batcher)
+    app.router.add_get('/health', health)
+    app.router.add_post('/predict', predict)
+    app.router.add_post('/predict/batch', predict_batch)
+    app.router.add_get('/candidates', candidates)
+    app.router.add_get('/metrics', metrics)
+    return app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve ExoSight predictions over HTTP.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--trace', action='store_true', help="Record timing spans for /metrics")
+    args = parser.parse_args(argv)
+    if args.trace:
+        telemetry.set_enabled(True)
+    web.run_app(create_app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
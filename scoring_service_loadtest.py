@@ -0,0 +1,60 @@
+# scoring_service_loadtest.py (Latency/throughput benchmark against a running scoring_service.py)
+import time
+import asyncio
+import argparse
+import numpy as np
+import aiohttp
+from catalog_store import FEATURE_COLUMNS
+from scoring_service import DEFAULT_PORT
+
+# A plausible KOI row; each request jitters it so no two payloads are identical.
+BASE_ROW = [5.0, 1.5, 700.0, 3.0, 0.5, 100.0]
+
+
+async def _worker(session, url, n_requests, rows_per_request, latencies, rng):
+    for _ in range(n_requests):
+        rows = (np.array(BASE_ROW) * rng.uniform(0.5, 1.5, (rows_per_request, len(FEATURE_COLUMNS)))).tolist()
+        payload = rows[0] if rows_per_request == 1 else rows
+        start = time.perf_counter()
+        async with session.post(url, json=payload) as response:
+            response.raise_for_status()
+            await response.read()
+        latencies.append(time.perf_counter() - start)
+
+
+async def run_load(base_url, concurrency=32, requests_per_worker=200, rows_per_request=1):
+    url = f"{base_url}/predict" if rows_per_request == 1 else f"{base_url}/predict/batch"
+    latencies = []
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            _worker(session, url, requests_per_worker, rows_per_request, latencies, np.random.default_rng(i))
+            for i in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - start
+
+    ms = np.array(latencies) * 1000
+    report = {
+        'requests': len(ms), 'concurrency': concurrency, 'rows_per_request': rows_per_request,
+        'p50_ms': float(np.percentile(ms, 50)), 'p99_ms': float(np.percentile(ms, 99)),
+        'requests_per_s': len(ms) / elapsed, 'rows_per_s': len(ms) * rows_per_request / elapsed,
+    }
+    print(f"{report['requests']} requests x {rows_per_request} rows @ concurrency {concurrency}: "
+          f"p50 {report['p50_ms']:.2f} ms, p99 {report['p99_ms']:.2f} ms, "
+          f"{report['requests_per_s']:.0f} req/s, {report['rows_per_s']:.0f} rows/s")
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test a local scoring_service.py instance.")
+    parser.add_argument('--url', default=f"http://127.0.0.1:{DEFAULT_PORT}")
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=200, help="Requests per concurrent client")
+    parser.add_argument('--rows', type=int, default=1, help="Rows per request (1 uses /predict)")
+    args = parser.parse_args(argv)
+    asyncio.run(run_load(args.url, args.concurrency, args.requests, args.rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# shared_catalogs.py (Catalog and candidate tables published once to shared memory, opened zero-copy)
+import os
+import glob
+import tempfile
+import importlib.util
+from catalog_store import KEPLER_FILE, STAR_COLUMNS, CANDIDATE_FILE, dataset_version
+
+# /dev/shm is RAM-backed on Linux, so every worker's memory map of a table points at
+# the same physical pages. Elsewhere the OS page cache gives the same sharing.
+SHARED_DIR = os.environ.get('EXOSIGHT_SHARED_DIR') or (
+    '/dev/shm/exosight' if os.path.isdir('/dev/shm') else os.path.join(tempfile.gettempdir(), 'exosight'))
+HAS_ARROW = importlib.util.find_spec('pyarrow') is not None
+
+
+# --- 1. Arrow IPC Files ---
+def shared_path(name, version, shared_dir=SHARED_DIR):
+    return os.path.join(shared_dir, f'{name}-{version}.arrow')
+
+
+def _to_arrow(df):
+    """
+    Float columns keep NaN as a value rather than becoming Arrow nulls: a null-free
+    float column converts back to pandas without a copy, a nullable one does not.
+    """
+    import pyarrow as pa
+    arrays = [pa.array(df[c].to_numpy(), from_pandas=False) if df[c].dtype.kind in 'fiub' else pa.array(df[c])
+              for c in df.columns]
+    return pa.Table.from_arrays(arrays, names=[str(c) for c in df.columns])
+
+
+def publish_frame(df, name, version, shared_dir=SHARED_DIR):
+    """Write `df` as an uncompressed Arrow IPC file (atomically) and remove older versions of `name`."""
+    import pyarrow as pa
+    os.makedirs(shared_dir, exist_ok=True)
+    target = shared_path(name, version, shared_dir)
+    table = _to_arrow(df)
+    tmp = f'{target}.{os.getpid()}.tmp'
+    with pa.OSFile(tmp, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp, target)
+    # Workers still mapping an old version keep their pages until they let go of them; one
+    # that has not mapped it yet gets FileNotFoundError, which shared_frame handles.
+    for old in glob.glob(os.path.join(shared_dir, f'{name}-*.arrow')):
+        if old != target:
+            os.remove(old)
+    return target
+
+
+def open_frame(path):
+    """
+    Memory-map a published table and wrap it as a DataFrame without copying: numeric
+    columns are read-only NumPy views of the mapping and strings are Arrow-backed.
+    pandas' copy-on-write copies a column only if something writes to it.
+    """
+    import pyarrow as pa
+    table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+    return table.to_pandas(split_blocks=True, self_destruct=False)
+
+
+def shared_frame(name, version, build, shared_dir=SHARED_DIR):
+    """
+    The published copy of `name` at `version`, building and publishing it first if no
+    worker has yet. Without pyarrow this is just build(), one private copy per process.
+    """
+    if not HAS_ARROW:
+        return build()
+    path = shared_path(name, version, shared_dir)
+    if not os.path.exists(path):
+        publish_frame(build(), name, version, shared_dir)
+    try:
+        return open_frame(path)
+    except FileNotFoundError:
+        # A newer version was published (removing this one) between the check and the map.
+        # Republishing would delete the newer file in turn, so keep a private copy instead.
+        return build()
+
+
+# --- 2. The App's Shared Tables ---
+def _read_candidates(path):
+    import pandas as pd
+    # Highest confidence first, the order the app and the service list candidates in.
+    return pd.read_csv(path).sort_values('confidence', ascending=False, ignore_index=True)
+
+
+def _read_host_stars(path):
+    from catalog_store import load_catalog
+    stars = load_catalog(path, columns=STAR_COLUMNS).drop_duplicates(subset=['kepid'])
+    return stars.dropna(subset=['koi_srad']).reset_index(drop=True)
+
+
+def load_candidates(path=CANDIDATE_FILE):
+    return shared_frame('candidates', dataset_version(path), lambda: _read_candidates(path))
+
+
+def load_host_stars(path=KEPLER_FILE):
+    return shared_frame('host_stars', dataset_version(path), lambda: _read_host_stars(path))
+
+
+def check(shared_dir=SHARED_DIR):
+    """Publish the app's tables and confirm a reopened copy shares the mapped buffers."""
+    for name, df in (('candidates', load_candidates()), ('host_stars', load_host_stars())):
+        numeric = [c for c in df.columns if df[c].dtype.kind in 'fi']
+        copied = [c for c in numeric if df[c].to_numpy().flags.writeable]
+        print(f"{name}: {len(df)} rows, {len(numeric) - len(copied)}/{len(numeric)} numeric columns zero-copy "
+              f"from {shared_dir}")
+        if copied:
+            raise AssertionError(f"{name}: columns {copied} were copied out of shared memory")
+
+
+if __name__ == "__main__":
+    check()
@@ -0,0 +1,232 @@
+# sky_index.py (Sky-position index over KOI and TOI objects: cone search, cross-match and the RA/Dec sky map)
+import time
+import argparse
+import numpy as np
+from catalog_store import KEPLER_FILE, TARGET_COLUMN, dataset_version
+from mission_catalogs import TOI_FILE, MISSION_COLUMN, MISSION_SCHEMAS
+
+# KIC and TIC positions of the same star agree to ~1"; a TESS pixel is 21".
+MATCH_RADIUS_ARCSEC = 3.0
+ARCSEC = np.pi / (180.0 * 3600.0)
+# Conservative habitable zone of a Sun-like star in insolation (Earth = 1): maximum
+# greenhouse to runaway greenhouse, Kopparapu et al. (2013).
+HZ_INSOL = (0.36, 1.11)
+
+# Source columns per mission and their names in the sky tables; kepoi_name and the
+# disposition come from the mission schema, so TOI designations match load_mission().
+SKY_COLUMNS = {
+    'Kepler': {'kepid': 'kepid', 'kepoi_name': 'kepoi_name', 'ra': 'ra', 'dec': 'dec',
+               'koi_srad': 'koi_srad', 'koi_steff': 'koi_steff', 'koi_insol': 'koi_insol'},
+    'TESS': {'tid': 'kepid', 'toi': 'toi', 'ra': 'ra', 'dec': 'dec',
+             'st_rad': 'koi_srad', 'st_teff': 'koi_steff', 'pl_insol': 'koi_insol'},
+}
+OBJECT_COLUMNS = [MISSION_COLUMN, 'kepid', 'kepoi_name', TARGET_COLUMN, 'ra', 'dec',
+                  'koi_srad', 'koi_steff', 'koi_insol', 'in_hz']
+
+
+# --- 1. Unit Vectors ---
+def unit_vectors(ra_deg, dec_deg):
+    """(n, 3) Cartesian positions on the unit sphere for RA/Dec in degrees."""
+    ra = np.radians(np.asarray(ra_deg, dtype=np.float64))
+    dec = np.radians(np.asarray(dec_deg, dtype=np.float64))
+    cos_dec = np.cos(dec)
+    return np.column_stack([cos_dec * np.cos(ra), cos_dec * np.sin(ra), np.sin(dec)])
+
+
+def chord_length(radius_arcsec):
+    """Straight-line distance between two unit vectors `radius_arcsec` apart on the sky."""
+    return 2.0 * np.sin(0.5 * np.asarray(radius_arcsec, dtype=np.float64) * ARCSEC)
+
+
+def separation_arcsec(chord):
+    return 2.0 * np.arcsin(np.clip(0.5 * np.asarray(chord, dtype=np.float64), 0.0, 1.0)) / ARCSEC
+
+
+# --- 2. Loading ---
+def load_objects(mission, path=None):
+    """One row per KOI/TOI with its position, host radius/temperature, insolation and HZ flag."""
+    from catalog_store import load_catalog
+    schema, columns = MISSION_SCHEMAS[mission], SKY_COLUMNS[mission]
+    raw = load_catalog(path or schema['file'], columns=list(columns) + [schema['disposition_column']])
+    df = raw.rename(columns=columns)
+    if 'kepoi_name' in schema['derive']:
+        df['kepoi_name'] = schema['derive']['kepoi_name'](raw)
+    df[TARGET_COLUMN] = raw[schema['disposition_column']].map(schema['disposition'])
+    df[MISSION_COLUMN] = mission
+    df['in_hz'] = df['koi_insol'].between(*HZ_INSOL).to_numpy()
+    df = df.dropna(subset=['ra', 'dec']).drop_duplicates(subset=['kepoi_name'], keep='last')
+    return df[OBJECT_COLUMNS].reset_index(drop=True)
+
+
+# --- 3. Index ---
+class SkyIndex:
+    """
+    k-d tree over unit vectors. Angular separation grows monotonically with chord length,
+    so a cone of radius theta is the ball of radius 2 sin(theta / 2) around its centre:
+    no RA wrap-around or pole special cases, and a query visits O(log n + k) nodes.
+    """
+
+    def __init__(self, df):
+        from scipy.spatial import cKDTree
+        from kepid_index import KepidIndex
+        self.df = df
+        self.xyz = unit_vectors(df['ra'].to_numpy(), df['dec'].to_numpy())
+        self.tree = cKDTree(self.xyz)
+        self.stars = KepidIndex(df)
+
+    def __len__(self):
+        return len(self.df)
+
+    def cone(self, ra, dec, radius_arcsec):
+        """(ascending row positions, separations in arcsec) within `radius_arcsec` of (ra, dec)."""
+        centre = unit_vectors([ra], [dec])[0]
+        pos = np.sort(np.asarray(self.tree.query_ball_point(centre, chord_length(radius_arcsec)), dtype=np.int64))
+        return pos, separation_arcsec(np.linalg.norm(self.xyz[pos] - centre, axis=1))
+
+    def cone_rows(self, ra, dec, radius_arcsec):
+        """Matching rows, nearest first, with a separation_arcsec column."""
+        pos, sep = self.cone(ra, dec, radius_arcsec)
+        order = np.argsort(sep, kind='stable')
+        return self.df.iloc[pos[order]].assign(separation_arcsec=sep[order])
+
+    def cross_match(self, other, radius_arcsec=MATCH_RADIUS_ARCSEC):
+        """
+        Every (row here, row in `other`, separation) within the radius, from one dual-tree
+        traversal instead of comparing all n x m pairs.
+        """
+        pairs = self.tree.sparse_distance_matrix(other.tree, float(chord_length(radius_arcsec)), output_type='ndarray')
+        return pairs['i'].astype(np.int64), pairs['j'].astype(np.int64), separation_arcsec(pairs['v'])
+
+
+# --- 4. Catalogs Together ---
+class SkyCatalog:
+    """
+    A SkyIndex per mission, the Kepler x TESS object cross-match and one row per host
+    star for the sky map. Built once per dataset version (see version()).
+    """
+
+    def __init__(self, objects, radius_arcsec=MATCH_RADIUS_ARCSEC):
+        import pandas as pd
+        self.radius = radius_arcsec
+        self.indexes = {mission: SkyIndex(df) for mission, df in objects.items()}
+        kepler, tess = self.indexes['Kepler'], self.indexes['TESS']
+        i, j, sep = kepler.cross_match(tess, radius_arcsec)
+        left = kepler.df.iloc[i][['kepid', 'kepoi_name', TARGET_COLUMN, 'in_hz']].reset_index(drop=True)
+        right = tess.df.iloc[j][['kepid', 'kepoi_name', TARGET_COLUMN]].reset_index(drop=True)
+        right.columns = ['tic_id', 'toi', 'toi_disposition']
+        self.matches = pd.concat([left, right], axis=1).assign(separation_arcsec=sep)
+        self.hosts = self._hosts()
+        self._lod = {}
+
+    def _hosts(self):
+        """
+        One row per (mission, star) with its number of HZ objects and `select_kepid`: the
+        Kepler ID a click on it should open (itself, or a TESS star's matched Kepler host).
+        """
+        import pandas as pd
+        tess_to_kepler = self.matches.drop_duplicates('tic_id').set_index('tic_id')['kepid']
+        frames = []
+        for mission, index in self.indexes.items():
+            df = index.df
+            hosts = df.groupby('kepid', sort=False).agg(
+                ra=('ra', 'first'), dec=('dec', 'first'), koi_srad=('koi_srad', 'first'),
+                koi_steff=('koi_steff', 'first'), n_objects=('kepoi_name', 'size'), hz_objects=('in_hz', 'sum'),
+            ).reset_index()
+            hosts[MISSION_COLUMN] = mission
+            hosts['select_kepid'] = (hosts['kepid'] if mission == 'Kepler'
+                                     else hosts['kepid'].map(tess_to_kepler)).astype('float64')
+            frames.append(hosts)
+        return pd.concat(frames, ignore_index=True)
+
+    def cone(self, ra, dec, radius_arcsec, missions=None):
+        """Objects of the given missions (default: all) within the radius, nearest first."""
+        import pandas as pd
+        frames = [index.cone_rows(ra, dec, radius_arcsec) for mission, index in self.indexes.items()
+                  if missions is None or mission in missions]
+        return pd.concat(frames, ignore_index=True).sort_values('separation_arcsec', kind='stable')
+
+    def counterparts(self, kepid, mission='Kepler', radius_arcsec=None):
+        """Objects of the other missions within the match radius of one star, nearest first."""
+        rows = self.indexes[mission].stars.rows(kepid)
+        others = [m for m in self.indexes if m != mission]
+        if rows.empty or not others:
+            return rows.iloc[:0]
+        return self.cone(rows['ra'].iloc[0], rows['dec'].iloc[0], radius_arcsec or self.radius, others)
+
+    def lod(self, hz_only=False):
+        """Level-of-detail bins over RA/Dec (galaxy_lod.build_lod), memoised per filter."""
+        if hz_only not in self._lod:
+            from galaxy_lod import build_lod
+            hosts = self.hosts[self.hosts['hz_objects'] > 0] if hz_only else self.hosts
+            self._lod[hz_only] = build_lod(hosts, x='ra', y='dec', size='koi_srad')
+        return self._lod[hz_only]
+
+    @staticmethod
+    def version(kepler_path=KEPLER_FILE, toi_path=TOI_FILE):
+        return dataset_version(kepler_path, toi_path)
+
+    @classmethod
+    def load(cls, radius_arcsec=MATCH_RADIUS_ARCSEC):
+        return cls({mission: load_objects(mission) for mission in SKY_COLUMNS}, radius_arcsec)
+
+
+# --- 5. Self-check Against Brute Force ---
+def brute_force_pairs(a, b, radius_arcsec, chunk=1024):
+    """All (i, j) pairs with angular separation <= radius, by comparing every pair (chunked)."""
+    limit = np.cos(radius_arcsec * ARCSEC)
+    pairs = []
+    for start in range(0, len(a), chunk):
+        i, j = np.nonzero(a[start:start + chunk] @ b.T >= limit)
+        pairs.append(np.column_stack([i + start, j]))
+    return np.concatenate(pairs) if pairs else np.empty((0, 2), dtype=np.int64)
+
+
+def check(catalog, radius_arcsec=60.0, n_cones=200, seed=0):
+    """Cross-match and random cone searches must equal brute force (at a wide radius, so there are many pairs)."""
+    rng = np.random.default_rng(seed)
+    kepler, tess = catalog.indexes['Kepler'], catalog.indexes['TESS']
+    i, j, _ = kepler.cross_match(tess, radius_arcsec)
+    got = np.unique(np.column_stack([i, j]), axis=0)
+    expected = np.unique(brute_force_pairs(kepler.xyz, tess.xyz, radius_arcsec), axis=0)
+    if not np.array_equal(got, expected):
+        raise AssertionError(f"cross-match found {len(got)} pairs, brute force {len(expected)}")
+    for _ in range(n_cones):
+        index = kepler if rng.random() < 0.5 else tess
+        centre = index.df.iloc[int(rng.integers(len(index)))]
+        ra, dec = centre['ra'] + rng.normal(0, 0.5), float(np.clip(centre['dec'] + rng.normal(0, 0.5), -90, 90))
+        radius = float(rng.uniform(1, 3600))
+        pos, _ = index.cone(ra, dec, radius)
+        expected = np.flatnonzero(index.xyz @ unit_vectors([ra], [dec])[0] >= np.cos(radius * ARCSEC))
+        if not np.array_equal(pos, expected):
+            raise AssertionError(f"cone ({ra:.4f}, {dec:.4f}, {radius:.0f}\") mismatch")
+    return len(got), n_cones
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cross-match KOIs with TOIs by sky position, or run a cone search.")
+    parser.add_argument('--radius', type=float, default=MATCH_RADIUS_ARCSEC, help="Match radius in arcsec")
+    parser.add_argument('--cone', nargs=3, type=float, metavar=('RA', 'DEC', 'RADIUS'),
+                        help="List objects within RADIUS arcsec of RA/Dec (degrees)")
+    parser.add_argument('--output', help="Write the cross-match to this CSV")
+    parser.add_argument('--check', action='store_true', help="Compare queries against brute-force pairwise distances")
+    args = parser.parse_args(argv)
+
+    objects = {mission: load_objects(mission) for mission in SKY_COLUMNS}
+    start = time.perf_counter()
+    catalog = SkyCatalog(objects, args.radius)
+    elapsed = time.perf_counter() - start
+    print(f"{len(catalog.matches)} KOI-TOI pairs within {args.radius:g}\" "
+          f"({catalog.matches['kepid'].nunique()} Kepler hosts) from {len(objects['Kepler'])} KOIs "
+          f"x {len(objects['TESS'])} TOIs: indexed and matched in {elapsed * 1000:.0f} ms")
+    print(catalog.matches.groupby([TARGET_COLUMN, 'toi_disposition'], dropna=False).size().to_string())
+    if args.output:
+        catalog.matches.to_csv(args.output, index=False)
+    if args.cone:
+        print(catalog.cone(*args.cone).to_string(index=False))
+    if args.check:
+        n_pairs, n_cones = check(catalog)
+        print(f"Cross-match ({n_pairs} pairs at 60\") and {n_cones} cone searches match brute force")
+
+
+if __name__ == "__main__":
+    main()
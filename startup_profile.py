@@ -0,0 +1,108 @@
+# startup_profile.py (Cold-start profiler and time budget for run_my_app.py)
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+APP_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'run_my_app.py')
+
+# Seconds for the first script run of each page in a fresh process (harness import excluded).
+# Roughly 2x what a cold run measures on a laptop-class core; tighten as the app gets faster.
+STARTUP_BUDGETS = {'library': 1.0, 'predict': 1.5, 'dashboard': 4.0, 'admin': 1.5}
+
+# Modules a page must not pull in. sklearn never belongs on the serving path.
+FORBIDDEN_MODULES = {
+    'library': ['pandas', 'numpy', 'sklearn', 'pyarrow'],
+    'predict': ['pandas', 'sklearn', 'pyarrow'],
+    'dashboard': ['sklearn'],
+    'admin': ['sklearn', 'pyarrow'],
+}
+
+# Runs in a fresh interpreter under -X importtime; prints one JSON line on stdout.
+_CHILD = r"""
+import os, sys, time, json
+from streamlit.testing.v1 import AppTest
+before = set(sys.modules)
+at = AppTest.from_file({app!r}, default_timeout=120)
+at.query_params['page'] = {page!r}
+at.session_state['admin_token'] = os.environ['EXOSIGHT_ADMIN_TOKEN']  # unlocks the admin page
+start = time.perf_counter()
+at.run()
+elapsed = time.perf_counter() - start
+print(json.dumps({{'first_run_s': elapsed, 'exceptions': [e.value for e in at.exception],
+                  'new_modules': sorted(set(sys.modules) - before)}}))
+"""
+
+
+# --- 1. Measuring ---
+def parse_importtime(stderr, only=None):
+    """Cumulative import time (seconds) of each top-level import in `python -X importtime` output."""
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if name.startswith('  '):  # nested import, already counted in its parent
+            continue
+        name = name.strip()
+        if only is None or name in only:
+            times[name] = times.get(name, 0.0) + int(cumulative) / 1e6
+    return times
+
+
+def profile_page(page, app_file=APP_FILE):
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-W', 'ignore', '-c', _CHILD.format(app=app_file, page=page)],
+        capture_output=True, text=True, cwd=os.path.dirname(app_file),
+        env=dict(os.environ, EXOSIGHT_ADMIN_TOKEN=f'profile-{os.getpid()}'),
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"profiling page '{page}' failed:\n{proc.stderr[-2000:]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result['page'] = page
+    result['imports_s'] = parse_importtime(proc.stderr, only=set(result['new_modules']))
+    return result
+
+
+# --- 2. Budget Check ---
+def check(result, budgets=STARTUP_BUDGETS, forbidden=FORBIDDEN_MODULES):
+    page = result['page']
+    problems = [f"exception on first run: {e}" for e in result['exceptions']]
+    if result['first_run_s'] > budgets[page]:
+        problems.append(f"first run took {result['first_run_s']:.2f}s, budget is {budgets[page]:.2f}s")
+    loaded = {m.split('.')[0] for m in result['new_modules']}
+    problems += [f"imported '{m}'" for m in forbidden.get(page, []) if m in loaded]
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile the app's cold start per page and enforce a budget.")
+    parser.add_argument('pages', nargs='*', default=list(STARTUP_BUDGETS))
+    parser.add_argument('--check', action='store_true', help="Exit 1 if any page is over budget")
+    parser.add_argument('--top', type=int, default=8, help="Slowest imports to list per page")
+    parser.add_argument('--json', help="Also write the raw results here")
+    args = parser.parse_args(argv)
+
+    results, failed = [], False
+    for page in args.pages:
+        result = profile_page(page)
+        results.append(result)
+        problems = check(result)
+        failed |= bool(problems)
+        print(f"[{'FAIL' if problems else 'ok'}] {page}: first run {result['first_run_s']:.2f}s "
+              f"(budget {STARTUP_BUDGETS[page]:.2f}s)")
+        for name, seconds in sorted(result['imports_s'].items(), key=lambda kv: -kv[1])[:args.top]:
+            print(f"      {seconds * 1000:8.1f} ms  import {name}")
+        for problem in problems:
+            print(f"      !! {problem}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.check and failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+# sweep.py (Sensitivity sweeps for the Live Prediction Tool: score a 1-D or 2-D grid of inputs in batches)
+import time
+import argparse
+import numpy as np
+from catalog_store import FEATURE_COLUMNS, CONFIDENCE_THRESHOLD
+import telemetry
+
+# Default range per input and whether its axis is logarithmic (the catalogs span decades
+# in period, radius and insolation).
+SWEEP_RANGES = {
+    'koi_period': (0.5, 500.0, True),
+    'koi_prad': (0.5, 30.0, True),
+    'koi_teq': (100.0, 3000.0, False),
+    'koi_duration': (0.5, 15.0, False),
+    'koi_impact': (0.0, 1.2, False),
+    'koi_insol': (0.1, 10000.0, True),
+}
+FEATURE_LABELS = {'koi_period': 'Orbital Period (days)', 'koi_prad': 'Planet Radius (Earth radii)',
+                  'koi_teq': 'Equilibrium Temp (K)', 'koi_duration': 'Transit Duration (hrs)',
+                  'koi_impact': 'Impact Parameter', 'koi_insol': 'Insolation Flux (Earth flux)'}
+MAX_GRID_POINTS = 1_000_000
+CHUNK_ROWS = 1 << 18      # grid rows per forward pass, bounding the hidden-layer temporaries
+MAX_RENDER_CELLS = 300    # per axis; finer grids are block-averaged before they reach the browser
+
+
+# --- 1. Grid Specification ---
+def axis_spec(feature, n, lo=None, hi=None, log=None):
+    """Hashable (feature, lo, hi, n, log) tuple; unspecified parts come from SWEEP_RANGES."""
+    default_lo, default_hi, default_log = SWEEP_RANGES[feature]
+    lo = default_lo if lo is None else float(lo)
+    hi = default_hi if hi is None else float(hi)
+    log = default_log if log is None else bool(log)
+    if not hi > lo or (log and lo <= 0):
+        raise ValueError(f"invalid range for {feature}: [{lo}, {hi}]{' on a log axis' if log else ''}")
+    return (feature, lo, hi, int(n), log)
+
+
+def axis_values(spec):
+    _, lo, hi, n, log = spec
+    return np.geomspace(lo, hi, n) if log else np.linspace(lo, hi, n)
+
+
+# --- 2. Batched Scoring ---
+def sweep_grid(model, fixed, axes, chunk_rows=CHUNK_ROWS):
+    """
+    P(CANDIDATE) over the grid spanned by one or two axis specs, with every other input
+    held at `fixed` (a mapping over FEATURE_COLUMNS). Returns an (n,) array for one axis and
+    (n_y, n_x) for two. The grid is written into one (points, features) matrix and scored
+    with predict_proba over contiguous chunks, so there is no per-point Python work.
+    """
+    axes = tuple(axes)
+    if len(axes) not in (1, 2):
+        raise ValueError("a sweep varies one or two inputs")
+    if len({spec[0] for spec in axes}) != len(axes):
+        raise ValueError("the two swept inputs must differ")
+    shape = tuple(spec[3] for spec in reversed(axes))
+    n_points = int(np.prod(shape))
+    if n_points > MAX_GRID_POINTS:
+        raise ValueError(f"{n_points:,} grid points is more than the {MAX_GRID_POINTS:,} allowed")
+
+    X = np.empty((n_points, len(FEATURE_COLUMNS)), dtype=np.float64)
+    X[:] = [float(fixed[c]) for c in FEATURE_COLUMNS]
+    x_values = axis_values(axes[0])
+    X[:, FEATURE_COLUMNS.index(axes[0][0])] = np.tile(x_values, n_points // len(x_values))
+    if len(axes) == 2:
+        X[:, FEATURE_COLUMNS.index(axes[1][0])] = np.repeat(axis_values(axes[1]), len(x_values))
+
+    proba = np.empty(n_points, dtype=np.float64)
+    for start in range(0, n_points, chunk_rows):
+        proba[start:start + chunk_rows] = model.predict_proba(X[start:start + chunk_rows])[:, 1]
+    return proba.reshape(shape)
+
+
+def fraction_above(grid, threshold):
+    """Share of the swept grid scoring at or above `threshold`: cheap to redo for any slider value."""
+    return float(np.count_nonzero(grid >= threshold)) / grid.size
+
+
+# --- 3. Rendering ---
+def _block_mean(values, axis, max_cells):
+    """Average consecutive runs along `axis` so at most `max_cells` remain (the last run may be shorter)."""
+    n = values.shape[axis]
+    if n <= max_cells:
+        return values
+    starts = np.arange(0, n, -(-n // max_cells))
+    sums = np.add.reduceat(values, starts, axis=axis)
+    counts = np.diff(np.append(starts, n))
+    return sums / counts.reshape([-1 if i == axis else 1 for i in range(values.ndim)])
+
+
+def _render_axis(spec, max_cells):
+    """Cell centres after block averaging, averaged in log space on a log axis."""
+    values = axis_values(spec)
+    if spec[4]:
+        return np.exp(_block_mean(np.log(values), 0, max_cells))
+    return _block_mean(values, 0, max_cells)
+
+
+@telemetry.traced('figure.sweep.build')
+def sweep_figure(grid, axes, threshold=CONFIDENCE_THRESHOLD, max_cells=MAX_RENDER_CELLS):
+    """Heatmap (two axes) or curve (one axis) of P(CANDIDATE), with the threshold marked."""
+    import plotly.graph_objects as go
+    x_spec = axes[0]
+    x = _render_axis(x_spec, max_cells)
+    fig = go.Figure()
+    if len(axes) == 1:
+        fig.add_trace(go.Scattergl(x=x, y=_block_mean(grid, 0, max_cells), mode='lines', name='P(CANDIDATE)',
+                                   line=dict(color='#58a6ff', width=2)))
+        fig.add_hline(y=threshold, line_dash='dash', line_color='#f85149',
+                      annotation_text=f"threshold {threshold:.2f}")
+        fig.update_yaxes(range=[0, 1], title="Probability of being a candidate")
+    else:
+        y_spec = axes[1]
+        y = _render_axis(y_spec, max_cells)
+        z = _block_mean(_block_mean(grid, 0, max_cells), 1, max_cells)
+        fig.add_trace(go.Heatmap(x=x, y=y, z=z, zmin=0, zmax=1, colorscale='Viridis',
+                                 colorbar_title='P(CANDIDATE)',
+                                 hovertemplate="x %{x:.4g}<br>y %{y:.4g}<br>P %{z:.3f}<extra></extra>"))
+        fig.add_trace(go.Contour(x=x, y=y, z=z, contours=dict(start=threshold, end=threshold, size=1, coloring='none'),
+                                 line=dict(color='white', width=2, dash='dash'), showscale=False,
+                                 hoverinfo='skip', name=f"P = {threshold:.2f}"))
+        fig.update_yaxes(type='log' if y_spec[4] else 'linear', title=FEATURE_LABELS.get(y_spec[0], y_spec[0]))
+    fig.update_xaxes(type='log' if x_spec[4] else 'linear', title=FEATURE_LABELS.get(x_spec[0], x_spec[0]))
+    fig.update_layout(template="plotly_dark", height=500, margin=dict(l=10, r=10, t=30, b=10))
+    return fig
+
+
+# --- 4. Self-check and Timing ---
+def check(model, n=40, seed=0):
+    """Every grid cell must equal a one-row predict_proba of the same inputs."""
+    rng = np.random.default_rng(seed)
+    fixed = {c: float(rng.uniform(*SWEEP_RANGES[c][:2])) for c in FEATURE_COLUMNS}
+    axes = (axis_spec('koi_period', n), axis_spec('koi_prad', n + 7))
+    grid = sweep_grid(model, fixed, axes, chunk_rows=97)
+    xs, ys = axis_values(axes[0]), axis_values(axes[1])
+    for _ in range(200):
+        i, j = int(rng.integers(len(ys))), int(rng.integers(len(xs)))
+        row = dict(fixed, koi_period=xs[j], koi_prad=ys[i])
+        expected = model.predict_proba([[row[c] for c in FEATURE_COLUMNS]])[0, 1]
+        if abs(grid[i, j] - expected) > 1e-12:
+            raise AssertionError(f"grid cell ({i}, {j}) = {grid[i, j]}, single prediction {expected}")
+    return grid.size
+
+
+def main(argv=None):
+    from model_registry import load_current
+    parser = argparse.ArgumentParser(description="Time or check a sensitivity sweep with the current model.")
+    parser.add_argument('--x', default='koi_period', choices=FEATURE_COLUMNS)
+    parser.add_argument('--y', default='koi_prad', choices=FEATURE_COLUMNS)
+    parser.add_argument('--points', type=int, default=MAX_GRID_POINTS, help="Total grid points (square grid)")
+    parser.add_argument('--check', action='store_true', help="Compare grid cells with single-row predictions")
+    args = parser.parse_args(argv)
+    model = load_current()
+    n = int(np.sqrt(args.points))
+    fixed = {'koi_period': 5.0, 'koi_prad': 1.5, 'koi_teq': 700.0, 'koi_duration': 3.0, 'koi_impact': 0.5,
+             'koi_insol': 100.0}
+    axes = (axis_spec(args.x, n), axis_spec(args.y, n))
+    start = time.perf_counter()
+    grid = sweep_grid(model, fixed, axes)
+    scored = time.perf_counter() - start
+    start = time.perf_counter()
+    sweep_figure(grid, axes)
+    print(f"{grid.size:,} points scored in {scored * 1000:.0f} ms, heatmap built in "
+          f"{(time.perf_counter() - start) * 1000:.0f} ms; {fraction_above(grid, CONFIDENCE_THRESHOLD):.1%} "
+          f"at >= {CONFIDENCE_THRESHOLD}")
+    if args.check:
+        print(f"{check(model):,}-point grid matches single-row predictions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+# telemetry.py (Lightweight timing spans, counters and Prometheus export for the hot paths)
+import os
+import time
+import threading
+import functools
+import contextlib
+from collections import deque
+
+# Off unless EXOSIGHT_TRACE=1 (or set_enabled(True) from the admin page). While off,
+# span() hands back one shared no-op context and @traced calls straight through.
+ENABLED = os.environ.get('EXOSIGHT_TRACE', '0') == '1'
+
+SPAN_METRIC = 'exosight_span_seconds'
+LOOKUP_METRIC = 'exosight_cache_lookups_total'
+MISS_METRIC = 'exosight_cache_misses_total'
+METRIC_HELP = {
+    SPAN_METRIC: 'Wall time spent in instrumented code paths.',
+    LOOKUP_METRIC: 'Lookups against a cache (st.cache_data, st.cache_resource or the figure cache).',
+    MISS_METRIC: 'Cache lookups that had to compute the value.',
+}
+# Seconds; the usual Prometheus latency ladder, extended down to half a millisecond.
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+RECENT_TRACES = 50  # finished reruns kept for the admin page
+
+_NULL_SPAN = contextlib.nullcontext()
+
+
+def set_enabled(enabled):
+    global ENABLED
+    ENABLED = bool(enabled)
+
+
+# --- 1. Metric Storage ---
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        i = 0
+        while i < len(self.buckets) and value > self.buckets[i]:
+            i += 1
+        self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Process-wide counters and histograms keyed by (metric, sorted label items)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.traces = deque(maxlen=RECENT_TRACES)
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            if key not in self.histograms:
+                self.histograms[key] = Histogram()
+            self.histograms[key].observe(value)
+
+    def counter(self, name, **labels):
+        return self.counters.get((name, tuple(sorted(labels.items()))), 0)
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+            self.traces.clear()
+
+
+METRICS = MetricsRegistry()
+
+
+# --- 2. Spans and Per-rerun Traces ---
+_local = threading.local()  # Streamlit runs each session's script on its own thread
+
+
+class Trace:
+    """Every span finished during one script run, in completion order, with nesting depth."""
+
+    def __init__(self, name):
+        self.name = name
+        self.started = time.time()
+        self._t0 = time.perf_counter()
+        self.spans = []   # (name, seconds, depth)
+        self.total = None
+
+    def finish(self):
+        self.total = time.perf_counter() - self._t0
+
+
+class _Span:
+    __slots__ = ('name', 'labels', 'start')
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        _local.depth = getattr(_local, 'depth', 0) + 1
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        _local.depth -= 1
+        METRICS.observe(SPAN_METRIC, elapsed, span=self.name, **self.labels)
+        trace = getattr(_local, 'trace', None)
+        if trace is not None:
+            trace.spans.append((self.name, elapsed, _local.depth))
+        return False
+
+
+def span(name, **labels):
+    """with span('dashboard.filter'): ... -- times the block into a histogram and the current trace."""
+    if not ENABLED:
+        return _NULL_SPAN
+    return _Span(name, labels)
+
+
+def traced(name=None, cache=False):
+    """
+    Decorator form of span(). With cache=True each call also counts as a cache lookup;
+    the cached body calls cache_miss(name) so hit rate = 1 - misses / lookups.
+    """
+    def decorate(fn):
+        span_name = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            if cache:
+                METRICS.inc(LOOKUP_METRIC, cache=span_name)
+            with _Span(span_name, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def cache_miss(name):
+    if ENABLED:
+        METRICS.inc(MISS_METRIC, cache=name)
+
+
+def cache_lookup(name, hit):
+    if ENABLED:
+        METRICS.inc(LOOKUP_METRIC, cache=name)
+        if not hit:
+            METRICS.inc(MISS_METRIC, cache=name)
+
+
+def start_trace(name):
+    """Begin a per-rerun trace on this thread (an unfinished earlier one is dropped)."""
+    _local.trace = Trace(name) if ENABLED else None
+    _local.depth = 0
+
+
+def end_trace():
+    trace = getattr(_local, 'trace', None)
+    _local.trace = None
+    if trace is not None:
+        trace.finish()
+        METRICS.traces.append(trace)
+    return trace
+
+
+# --- 3. Reporting ---
+def cache_hit_rates():
+    """{cache name: (lookups, misses, hit rate)} from the lookup and miss counters."""
+    rates = {}
+    for (name, labels), lookups in list(METRICS.counters.items()):
+        if name == LOOKUP_METRIC:
+            cache = dict(labels)['cache']
+            misses = METRICS.counter(MISS_METRIC, cache=cache)
+            rates[cache] = (lookups, misses, 1.0 - misses / lookups if lookups else 0.0)
+    return rates
+
+
+def _labels(items, extra=()):
+    items = list(items) + list(extra)
+    if not items:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in items)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(items, escaped)) + '}'
+
+
+def prometheus_text(registry=METRICS):
+    """Every counter and histogram in the Prometheus text exposition format (version 0.0.4)."""
+    lines = []
+    with registry._lock:
+        counters = sorted(registry.counters.items())
+        histograms = sorted(registry.histograms.items())
+
+    for metric in sorted({name for (name, _), _ in counters}):
+        lines += [f'# HELP {metric} {METRIC_HELP.get(metric, metric)}', f'# TYPE {metric} counter']
+        lines += [f'{metric}{_labels(labels)} {value}' for (name, labels), value in counters if name == metric]
+
+    for metric in sorted({name for (name, _), _ in histograms}):
+        lines += [f'# HELP {metric} {METRIC_HELP.get(metric, metric)}', f'# TYPE {metric} histogram']
+        for (name, labels), hist in histograms:
+            if name != metric:
+                continue
+            cumulative = 0
+            for bound, count in zip(list(hist.buckets) + ['+Inf'], hist.counts):
+                cumulative += count
+                lines.append(f'{metric}_bucket{_labels(labels, [("le", bound)])} {cumulative}')
+            lines.append(f'{metric}_sum{_labels(labels)} {hist.sum}')
+            lines.append(f'{metric}_count{_labels(labels)} {hist.count}')
+    return '\n'.join(lines) + '\n'
+
+
+def serve(port, host='127.0.0.1'):
+    """Expose /metrics for a Prometheus scraper on a daemon thread (stdlib only)."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = prometheus_text().encode()
+            self.send_response(200 if self.path == '/metrics' else 404)
+            self.send_header('Content-Type', CONTENT_TYPE)
+            self.end_headers()
+            if self.path == '/metrics':
+                self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
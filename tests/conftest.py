@@ -0,0 +1,41 @@
+# conftest.py (Run the tests from the repository root, where the modules and data files live)
+import os
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def pytest_configure(config):
+    # The shipped scaler was fit on a DataFrame; the engines under test take plain arrays.
+    config.addinivalue_line('filterwarnings', 'ignore:X does not have valid feature names:UserWarning')
+    config.addinivalue_line('markers', 'slow: runs subprocesses or real workloads; deselect with -m "not slow"')
+
+
+@pytest.fixture(autouse=True)
+def repo_root(monkeypatch):
+    # Catalogs, pickles and weights are opened by relative path, as the scripts do.
+    monkeypatch.chdir(ROOT)
+    return ROOT
+
+
+@pytest.fixture(scope='session')
+def shipped_model():
+    """The committed sklearn MLP and its scaler."""
+    import joblib
+    return joblib.load(os.path.join(ROOT, 'mlp_exoplanet_model.pkl')), joblib.load(os.path.join(ROOT, 'scaler_object.pkl'))
+
+
+@pytest.fixture(scope='session')
+def stacked_model(shipped_model):
+    """A Platt-calibrated two-member StackedMLP built from the shipped MLP and a perturbed copy."""
+    import copy
+    import numpy as np
+    from ensemble import StackedMLP, stack_members
+    mlp, scaler = shipped_model
+    other = copy.deepcopy(mlp)
+    rng = np.random.default_rng(0)
+    other.coefs_ = [w + rng.normal(0, 0.05, w.shape) for w in other.coefs_]
+    return StackedMLP(*stack_members([mlp, other], scaler), mlp.activation,
+                      {'method': 'platt', 'a': 1.2, 'b': -0.1}, mlp.classes_)
@@ -0,0 +1,45 @@
+import pytest
+import telemetry
+from streamlit.testing.v1 import AppTest
+
+TOKEN = 's3cret-token'
+
+
+def _admin_page(monkeypatch, configured, entered=None):
+    if configured:
+        monkeypatch.setenv('EXOSIGHT_ADMIN_TOKEN', configured)
+    else:
+        monkeypatch.delenv('EXOSIGHT_ADMIN_TOKEN', raising=False)
+    at = AppTest.from_file('../run_my_app.py', default_timeout=120)
+    at.query_params['page'] = 'admin'
+    at.run()
+    if entered is not None:
+        at.text_input(key='admin_token').set_value(entered).run()
+    return at
+
+
+def _shows_admin_controls(at):
+    return len(at.toggle) > 0 or any(b.label == 'Reset metrics' for b in at.button) or len(at.code) > 0
+
+
+def test_no_configured_token_means_no_admin_page(monkeypatch):
+    at = _admin_page(monkeypatch, None)
+    assert not at.exception
+    assert 'ExoSight Admin: Performance' not in [t.value for t in at.title]
+    assert not _shows_admin_controls(at)
+
+
+@pytest.mark.parametrize('entered', [None, '', 'wrong', TOKEN + 'x', TOKEN[:-1]])
+def test_missing_or_wrong_token_renders_nothing(monkeypatch, entered):
+    enabled = telemetry.ENABLED
+    at = _admin_page(monkeypatch, TOKEN, entered)
+    assert not at.exception
+    assert not _shows_admin_controls(at)
+    assert telemetry.ENABLED == enabled  # the toggle never ran
+    assert [e.value for e in at.error] == (['Wrong admin token.'] if entered else [])
+
+
+def test_right_token_renders_the_page(monkeypatch):
+    at = _admin_page(monkeypatch, TOKEN, TOKEN)
+    assert not at.exception
+    assert _shows_admin_controls(at) and not at.error
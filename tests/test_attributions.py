@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+from attributions import input_gradients, integrated_gradients, completeness_error
+from mlp_numpy import NumpyMLP
+
+
+@pytest.fixture(params=['single', 'ensemble'])
+def model(request, stacked_model):
+    return NumpyMLP.load() if request.param == 'single' else stacked_model
+
+
+@pytest.fixture
+def rows(shipped_model):
+    _, scaler = shipped_model
+    return scaler.mean_ + np.random.default_rng(1).standard_normal((40, len(scaler.mean_))) * scaler.scale_ * 0.5
+
+
+def test_gradients_match_finite_differences(model, rows):
+    p, grad = input_gradients(model, rows)
+    np.testing.assert_allclose(p, model.predict_proba(rows)[:, 1], atol=1e-12)
+    for j in range(rows.shape[1]):
+        step = np.zeros(rows.shape[1])
+        step[j] = 1e-6 * max(1.0, float(np.abs(rows[:, j]).mean()))
+        fd = (model.predict_proba(rows + step)[:, 1] - model.predict_proba(rows - step)[:, 1]) / (2 * step[j])
+        np.testing.assert_allclose(grad[:, j], fd, rtol=1e-4, atol=1e-7)
+
+
+def test_attributions_are_complete(stacked_model, rows):
+    # Pinned to the fixed two-member fixture, so the bound does not move with retraining; the
+    # residual is midpoint-rule error at the ReLU kinks and shrinks as the steps grow.
+    baseline = rows.mean(axis=0)
+    errors = [completeness_error(stacked_model, rows, baseline[None],
+                                 integrated_gradients(stacked_model, rows, baseline, steps)) for steps in (256, 2048)]
+    assert errors[1] < errors[0] and errors[1] < 2e-3
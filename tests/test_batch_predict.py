@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+from batch_predict import load_model, score_features, score_file
+from catalog_store import FEATURE_COLUMNS, load_catalog
+
+
+def _read(path):
+    return pd.read_parquet(path) if path.endswith('.parquet') else pd.read_csv(path)
+
+
+def _write(df, path):
+    if path.endswith('.parquet'):
+        df.to_parquet(path)
+    else:
+        df.to_csv(path, index=False)
+
+
+@pytest.fixture(scope='module')
+def kois():
+    return load_catalog(columns=['kepid', 'kepoi_name'] + FEATURE_COLUMNS).head(2500)
+
+
+@pytest.mark.parametrize('suffix', ['.csv', '.parquet'])
+def test_pool_scores_match_in_process_scores(tmp_path, kois, suffix):
+    source, output = str(tmp_path / f'in{suffix}'), str(tmp_path / f'out{suffix}')
+    _write(kois, source)
+
+    assert score_file(source, output, chunk_rows=300, workers=2) == len(kois)
+    scored = _read(output)
+    assert scored['kepoi_name'].tolist() == kois['kepoi_name'].tolist()  # chunks come back in order
+    expected = score_features(kois[FEATURE_COLUMNS].to_numpy(), load_model())
+    np.testing.assert_allclose(scored['confidence'].to_numpy(), expected, rtol=1e-12)
+    assert np.isnan(expected).any() and not np.isnan(expected).all()  # rows with NaN features stay unscored
+
+
+@pytest.mark.parametrize('suffix', ['.csv', '.parquet'])
+def test_empty_input_still_writes_a_header(tmp_path, kois, suffix):
+    source, output = str(tmp_path / f'in{suffix}'), str(tmp_path / f'out{suffix}')
+    _write(kois.iloc[:0], source)
+
+    assert score_file(source, output, workers=2) == 0
+    assert list(_read(output).columns) == list(kois.columns) + ['confidence']
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+from bls_search import check, score
+from catalog_store import FEATURE_COLUMNS
+
+
+def test_recovers_injected_planets():
+    check()
+
+
+def test_score_leaves_incomplete_rows_unscored():
+    df = pd.DataFrame([[5.0, 1.5, 700.0, 3.0, 0.5, 100.0], [5.0, np.nan, 700.0, 3.0, 0.5, 100.0]],
+                      columns=FEATURE_COLUMNS)
+    scored = score(df)
+    assert 0.0 <= scored['confidence'].iloc[0] <= 1.0
+    assert np.isnan(scored['confidence'].iloc[1])
+
+
+def test_search_stars_takes_the_mission_from_the_store(tmp_path):
+    from lightcurves import TIME_OFFSETS, ingest, synthetic_lightcurve, write_synthetic
+    from mission_catalogs import MISSION_COLUMN
+    from bls_search import search_stars
+    planet = [(3.5225, 134.1, 2000.0, 2.9)]
+    source, store_dir = tmp_path / 'src', str(tmp_path / 'store')
+    write_synthetic(757076, planet, str(source), n_cadences=20_000)
+    t, flux = synthetic_lightcurve(planet, n_cadences=20_000, seed=2)
+    pd.DataFrame({'btjd': t - TIME_OFFSETS['btjd'], 'pdcsap_flux': flux}).to_csv(source / 'tic261136679.csv', index=False)
+
+    manifest = ingest(str(source), store_dir)
+    assert manifest['missions'] == {'Kepler': 1, 'TESS': 1}
+    # The TIC ID also appears as a KIC host here; its parameters must not be used for the TESS star.
+    host = (1.0, 4.44, 5778.0)
+    found = search_stars(store_dir=store_dir, workers=1, hosts={757076: host, 261136679: host})
+    missions = found.groupby('kepid')[MISSION_COLUMN].unique().map(list).to_dict()
+    assert missions == {757076: ['Kepler'], 261136679: ['TESS']}
+    assert found.loc[found['kepid'] == 757076, 'koi_prad'].notna().all()
+    assert found.loc[found['kepid'] == 261136679, 'koi_prad'].isna().all()
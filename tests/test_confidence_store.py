@@ -0,0 +1,20 @@
+import numpy as np
+import pandas as pd
+import pytest
+from confidence_store import ConfidenceStore, build_store, score_catalogs, check
+
+
+@pytest.fixture(scope='module')
+def store(tmp_path_factory):
+    path = tmp_path_factory.mktemp('store') / 'confidence_store.parquet'
+    build_store(score_catalogs(), path)
+    return ConfidenceStore(pd.read_parquet(path))
+
+
+def test_queries_match_brute_force_masks(store):
+    assert check(store) == 200
+
+
+def test_store_is_sorted_by_confidence(store):
+    assert np.all(np.diff(store.confidence) <= 0)
+    assert store.cut(0.0) == len(store) and store.cut(1.01) == 0
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+import derived_features
+from derived_features import (DERIVED_FEATURES, R_EARTH_CM, R_SUN_CM, compute_features, feature_matrix,
+                              load_features, resolve)
+
+
+def test_resolve_orders_dependencies_first():
+    order, raw = resolve(['density_mismatch', 'depth_consistency'])
+    assert order.index('radius_ratio') < order.index('transit_density') < order.index('density_mismatch')
+    assert order.index('radius_ratio') < order.index('depth_consistency')
+    assert order.count('radius_ratio') == 1
+    assert raw == sorted({'koi_prad', 'koi_srad', 'koi_depth', 'koi_period', 'koi_duration', 'koi_impact', 'koi_slogg'})
+
+
+def test_resolve_rejects_cycles(monkeypatch):
+    monkeypatch.setitem(DERIVED_FEATURES, 'a', {'requires': ['b'], 'compute': None})
+    monkeypatch.setitem(DERIVED_FEATURES, 'b', {'requires': ['koi_period', 'a'], 'compute': None})
+    with pytest.raises(ValueError, match='a -> b -> a'):
+        resolve(['a'])
+
+
+def test_compute_features_matches_the_formulas():
+    df = pd.DataFrame({'koi_prad': [1.0, 11.2], 'koi_srad': [1.0, 0.5], 'koi_depth': [84.0, 0.0],
+                       'koi_period': [365.25, 2.0], 'koi_model_snr': [20.0, 300.0]})
+    out = compute_features(df, ['radius_ratio', 'depth_consistency', 'snr_per_transit'])
+    k = df['koi_prad'] * R_EARTH_CM / (df['koi_srad'] * R_SUN_CM)
+    np.testing.assert_allclose(out['radius_ratio'], k)
+    assert out['depth_consistency'][0] == pytest.approx(np.log10(84.0 / (k[0] ** 2 * 1e6)))
+    assert np.isnan(out['depth_consistency'][1])  # a zero depth has no log ratio
+    np.testing.assert_allclose(out['snr_per_transit'], [20.0 / np.sqrt(4), 300.0 / np.sqrt(735)])
+    assert list(out) == ['radius_ratio', 'depth_consistency', 'snr_per_transit']
+
+
+def test_compute_features_names_missing_columns():
+    with pytest.raises(KeyError, match='koi_srad'):
+        compute_features(pd.DataFrame({'koi_prad': [1.0]}), ['radius_ratio'])
+
+
+def test_load_features_caches_per_version(tmp_path, monkeypatch):
+    monkeypatch.setattr(derived_features, '_memo', {})
+    first = load_features(['radius_ratio'], cache_dir=str(tmp_path))
+    (version,) = [p.name for p in tmp_path.iterdir()]
+    assert (tmp_path / version / 'radius_ratio.npy').exists()
+
+    monkeypatch.setattr(derived_features, '_memo', {})
+    monkeypatch.setattr(derived_features, 'compute_features', None)  # a second call must not recompute
+    second = load_features(['radius_ratio'], cache_dir=str(tmp_path))
+    np.testing.assert_array_equal(first['radius_ratio'], second['radius_ratio'])
+    assert list(second.columns) == ['kepid', 'kepoi_name', 'radius_ratio']
+
+
+def test_feature_matrix_mixes_raw_and_derived_columns(tmp_path):
+    catalog = load_features(['radius_ratio'], cache_dir=str(tmp_path))
+    rows = catalog[['kepoi_name']].iloc[:5].assign(koi_period=np.arange(5.0))
+    X = feature_matrix(rows, ['koi_period', 'radius_ratio'], cache_dir=str(tmp_path))
+    assert X.shape == (5, 2) and X.dtype == np.float64
+    np.testing.assert_array_equal(X[:, 1], catalog['radius_ratio'].to_numpy()[:5])
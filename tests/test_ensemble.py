@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+from catalog_store import FEATURE_COLUMNS
+from confidence_store import score_rows
+from ensemble import StackedMLP, apply_calibration, fit_calibration, stack_members
+
+ROWS = pd.DataFrame([[5.0, 1.5, 700.0, 3.0, 0.5, 100.0], [300.0, 2.0, 300.0, 8.0, 0.2, 1.0],
+                     [1.2, 12.0, 1800.0, 2.0, 0.9, 900.0]], columns=FEATURE_COLUMNS)
+
+
+def test_stacked_members_match_sklearn(shipped_model, stacked_model):
+    mlp, scaler = shipped_model
+    expected = mlp.predict_proba(scaler.transform(ROWS.to_numpy()))[:, 1]
+    np.testing.assert_allclose(stacked_model.member_proba(ROWS.to_numpy())[0], expected, atol=1e-9)
+
+
+def test_uncertainty_is_the_spread_of_calibrated_members(stacked_model):
+    confidence, spread, raw_mean = stacked_model.predict_with_uncertainty(ROWS.to_numpy())
+    members = stacked_model.member_proba(ROWS.to_numpy())
+    np.testing.assert_allclose(raw_mean, members.mean(axis=0))
+    np.testing.assert_allclose(confidence, apply_calibration(raw_mean, stacked_model.calibration))
+    np.testing.assert_allclose(spread, apply_calibration(members, stacked_model.calibration).std(axis=0))
+
+
+def test_identical_members_have_no_spread(shipped_model):
+    mlp, scaler = shipped_model
+    ensemble = StackedMLP(*stack_members([mlp, mlp, mlp], scaler), mlp.activation,
+                          {'method': 'platt', 'a': 2.0, 'b': 0.3}, mlp.classes_)
+    assert np.allclose(ensemble.predict_with_uncertainty(ROWS.to_numpy())[1], 0.0)
+
+
+@pytest.mark.parametrize('method', ['platt', 'isotonic'])
+def test_calibration_is_monotone(method):
+    rng = np.random.default_rng(0)
+    p = rng.uniform(size=2000)
+    y = (rng.uniform(size=2000) < p ** 2).astype(int)
+    calibrated = apply_calibration(np.linspace(0, 1, 101), fit_calibration(p, y, method))
+    assert np.all(np.diff(calibrated) >= -1e-12) and calibrated.min() >= 0 and calibrated.max() <= 1
+
+
+def test_score_rows_adds_ensemble_uncertainty(stacked_model):
+    scored = score_rows(ROWS.copy(), stacked_model)
+    confidence, uncertainty, _ = stacked_model.predict_with_uncertainty(ROWS.to_numpy())
+    np.testing.assert_allclose(scored['confidence'], confidence)
+    np.testing.assert_allclose(scored['uncertainty'], uncertainty)
@@ -0,0 +1,60 @@
+import copy
+import warnings
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import StandardScaler
+from catalog_store import FEATURE_COLUMNS, TARGET_COLUMN
+from mission_catalogs import load_unified
+from feature_pipeline import clean
+from incremental_update import KEY_COLUMN, assign_split, diff_snapshots, update_scaler, warm_start
+
+
+@pytest.fixture(scope='module')
+def kepler():
+    return clean(load_unified(('Kepler',))).reset_index(drop=True)
+
+
+def test_diff_snapshots_finds_added_edited_and_removed_rows(kepler):
+    old = kepler.iloc[:-5]
+    new = kepler.drop(index=[0, 1]).copy()  # rows 0 and 1 removed, the last five added
+    new.loc[10, 'koi_prad'] += 1.0  # an edited feature
+    new.loc[11, TARGET_COLUMN] = 'FALSE POSITIVE' if new.loc[11, TARGET_COLUMN] == 'CANDIDATE' else 'CANDIDATE'
+
+    changed, stale = diff_snapshots(old, new)
+    assert set(changed[KEY_COLUMN]) == set(kepler.loc[[10, 11], KEY_COLUMN]) | set(kepler[KEY_COLUMN].iloc[-5:])
+    assert set(stale[KEY_COLUMN]) == set(kepler.loc[[0, 1, 10, 11], KEY_COLUMN])
+
+
+def test_diff_snapshots_of_identical_frames_is_empty(kepler):
+    changed, stale = diff_snapshots(kepler, kepler.sample(frac=1.0, random_state=0))
+    assert changed.empty and stale.empty
+
+
+def test_update_scaler_matches_a_refit(kepler):
+    X = kepler[FEATURE_COLUMNS].to_numpy(np.float64)
+    scaler = StandardScaler().fit(X[:3000])
+    update_scaler(scaler, X[:400], X[3000:3600])
+
+    refit = StandardScaler().fit(X[400:3600])
+    assert scaler.n_samples_seen_ == refit.n_samples_seen_
+    np.testing.assert_allclose(scaler.mean_, refit.mean_, rtol=1e-9)
+    np.testing.assert_allclose(scaler.var_, refit.var_, rtol=1e-7)
+    np.testing.assert_allclose(scaler.transform(X[:50]), refit.transform(X[:50]), rtol=1e-6, atol=1e-9)
+
+
+def test_assign_split_is_deterministic_and_proportional(kepler):
+    split = assign_split(kepler[KEY_COLUMN])
+    np.testing.assert_array_equal(split, assign_split(kepler[KEY_COLUMN]))
+    share = pd.Series(split).value_counts(normalize=True)
+    assert abs(share['test'] - 0.2) < 0.03 and abs(share['calibration'] - 0.16) < 0.03
+
+
+def test_warm_start_on_a_few_rows_does_not_warn(kepler, shipped_model):
+    mlp, scaler = shipped_model
+    mlp = copy.deepcopy(mlp)
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', UserWarning)
+        warnings.filterwarnings('ignore', 'X does not have valid feature names')
+        warm_start(mlp, scaler, kepler.iloc[:10], kepler.iloc[10:], epochs=2)
+    assert mlp.batch_size == 20
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+from catalog_store import load_catalog
+from kepid_index import KepidIndex, SearchIndex
+
+
+@pytest.fixture(scope='module')
+def kois():
+    return load_catalog(columns=['kepid', 'kepoi_name'])
+
+
+@pytest.fixture(scope='module')
+def index(kois):
+    return SearchIndex(kois)
+
+
+def _brute_force(kois, query):
+    query = query.strip().upper()
+    hit = kois['kepid'].astype(str).str.upper().str.contains(query, regex=False) | \
+        kois['kepoi_name'].astype(str).str.upper().str.contains(query, regex=False)
+    return np.flatnonzero(hit.to_numpy())
+
+
+@pytest.mark.parametrize('query', ['7', '10797460', 'K00752', 'k00752.01', '752.0', '.01', '2445', ' 1079 ', 'ZZZ9'])
+def test_search_matches_brute_force(kois, index, query):
+    np.testing.assert_array_equal(index.positions(query), _brute_force(kois, query))
+
+
+@pytest.mark.parametrize('query', ['|', '0|K', '1|K00', '|K0'])
+def test_separator_matches_nothing(index, query):
+    assert len(index.positions(query)) == 0
+
+
+def test_queries_do_not_span_fields():
+    df = pd.DataFrame({'kepid': [10797460, 123], 'kepoi_name': ['K00752.01', 'K00001.01']})
+    index = SearchIndex(df)
+    assert len(index.positions('0K')) == 0
+    assert len(index.positions('460K007')) == 0
+    assert index.positions('0K0').tolist() == []
+    assert index.search('123')['kepid'].tolist() == [123]
+    assert len(index.positions('')) == 2
+
+
+def test_kepid_index_returns_every_row_of_a_star(kois):
+    index = KepidIndex(kois)
+    kepid = kois['kepid'].value_counts().index[0]
+    assert index.rows(kepid)['kepid'].eq(kepid).all()
+    assert len(index.rows(kepid)) == (kois['kepid'] == kepid).sum()
+    assert -1 not in index
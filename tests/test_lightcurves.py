@@ -0,0 +1,59 @@
+import os
+import numpy as np
+import pytest
+import lightcurves
+from lightcurves import CURRENT_FILE, LightCurveStore, check, current_build, ingest, read_manifest, write_synthetic
+
+PLANET = [(3.5225, 134.1, 800.0, 2.9)]
+
+
+@pytest.mark.slow
+def test_fold_recovers_the_injected_depth():
+    check()
+
+
+def _builds(store_dir):
+    return sorted(e for e in os.listdir(store_dir) if e != CURRENT_FILE)
+
+
+def test_ingest_swaps_builds_through_current(tmp_path):
+    source, store_dir = str(tmp_path / 'src'), str(tmp_path / 'store')
+    write_synthetic(11, PLANET, source, n_cadences=2000)
+    first = ingest(source, store_dir)
+    store = LightCurveStore(store_dir)
+    assert current_build(store_dir) == first['build'] and 11 in store
+
+    write_synthetic(22, PLANET, source, n_cadences=2000)
+    second = ingest(source, store_dir)
+    assert second['build'] != first['build'] and read_manifest(store_dir) == second
+    assert 22 in LightCurveStore(store_dir) and 22 not in store  # the open store keeps its own build
+    assert len(store.series(11)[0]) == 2000
+
+    assert ingest(source, store_dir) == second  # unchanged sources: no rebuild
+    third = ingest(source, store_dir, force=True)
+    assert _builds(store_dir) == [second['build'], third['build']]
+
+
+def test_failed_ingest_leaves_the_current_build(tmp_path, monkeypatch):
+    source, store_dir = str(tmp_path / 'src'), str(tmp_path / 'store')
+    write_synthetic(11, PLANET, source, n_cadences=2000)
+    before = ingest(source, store_dir)
+
+    def broken(path):
+        raise ValueError("unreadable")
+    monkeypatch.setattr(lightcurves, 'read_lightcurve', broken)
+    with pytest.raises(ValueError):
+        ingest(source, store_dir, force=True)
+    assert read_manifest(store_dir) == before
+    assert _builds(store_dir) == [before['build']]
+
+
+def test_ingest_removes_the_flat_layout(tmp_path):
+    source, store_dir = str(tmp_path / 'src'), tmp_path / 'store'
+    store_dir.mkdir()
+    np.save(store_dir / 'time.npy', np.zeros(3))
+    (store_dir / 'manifest.json').write_text('{"version": "old"}')
+    assert read_manifest(str(store_dir)) is None
+    write_synthetic(11, PLANET, source, n_cadences=2000)
+    manifest = ingest(source, str(store_dir))
+    assert sorted(os.listdir(store_dir)) == sorted([CURRENT_FILE, manifest['build']])
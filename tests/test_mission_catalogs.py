@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+from catalog_store import FEATURE_COLUMNS, TARGET_COLUMN
+from kepid_index import KepidIndex
+from mission_catalogs import MISSION_COLUMN, UNIFIED_COLUMNS, impact_from_duration, load_unified, to_unified
+
+SUN_LOGG = 4.438
+# Central-transit duration of an Earth-Sun analogue: (P / pi) (R* / a) with a / R* = 215.
+EARTH_DURATION_HOURS = 365.25 * 24.0 / np.pi / 215.03
+
+
+@pytest.fixture
+def toi_rows():
+    return pd.DataFrame({
+        'toi': [101.01, 1234.02, 7.1], 'tid': [231663901, 8, 9], 'tfopwg_disp': ['PC', 'FP', 'XX'],
+        'pl_orbper': [365.25, 365.25, 1.0], 'pl_rade': [1.0, 2.0, 3.0], 'pl_eqt': [255.0, 300.0, 1500.0],
+        'pl_trandurh': [EARTH_DURATION_HOURS, EARTH_DURATION_HOURS / 2, 2.0], 'pl_insol': [1.0, 2.0, 500.0],
+        'st_logg': [SUN_LOGG, SUN_LOGG, np.nan], 'st_rad': [1.0, 1.0, 1.0],
+    })
+
+
+def test_toi_rows_map_onto_the_koi_schema(toi_rows):
+    df = to_unified(toi_rows, 'TESS')
+    assert list(df.columns) == UNIFIED_COLUMNS
+    assert df['kepid'].tolist() == [231663901, 8, 9]  # the TIC ID
+    assert df['kepoi_name'].tolist() == ['TOI-101.01', 'TOI-1234.02', 'TOI-7.10']
+    assert df[TARGET_COLUMN].tolist()[:2] == ['CANDIDATE', 'FALSE POSITIVE'] and pd.isna(df[TARGET_COLUMN].iloc[2])
+    assert (df[MISSION_COLUMN] == 'TESS').all()
+    renamed = {'koi_period': 'pl_orbper', 'koi_prad': 'pl_rade', 'koi_teq': 'pl_eqt',
+               'koi_duration': 'pl_trandurh', 'koi_insol': 'pl_insol'}
+    for koi, toi in renamed.items():
+        np.testing.assert_array_equal(df[koi].to_numpy(), toi_rows[toi].to_numpy())
+
+
+def test_toi_impact_is_derived_from_the_duration(toi_rows):
+    impact = to_unified(toi_rows, 'TESS')['koi_impact'].to_numpy()
+    assert impact[0] == pytest.approx(0.0, abs=0.02)        # full-length transit: central
+    assert impact[1] == pytest.approx(np.sqrt(0.75), abs=0.01)  # half the duration: b^2 = 1 - 1/4
+    assert np.isnan(impact[2])                                # no log g, no estimate
+    assert impact_from_duration(10.0, 1e3, SUN_LOGG, 1.0) == 0.0  # longer than central clips to 0
+
+
+def test_unified_catalogs_keep_each_mission_apart():
+    df = load_unified()
+    assert set(df[MISSION_COLUMN].cat.categories) == {'Kepler', 'TESS'}
+    assert df['kepoi_name'].is_unique
+    assert df[FEATURE_COLUMNS].dtypes.map(lambda d: d.kind == 'f').all()
+
+
+def test_kepid_index_keys_stars_on_mission_and_id():
+    df = pd.DataFrame({MISSION_COLUMN: ['Kepler', 'TESS', 'Kepler', 'TESS'], 'kepid': [42, 42, 7, 5],
+                       'kepoi_name': ['K00001.01', 'TOI-1.01', 'K00002.01', 'TOI-2.01']})
+    assert KepidIndex(df, mission='Kepler').rows(42)['kepoi_name'].tolist() == ['K00001.01']
+    assert KepidIndex(df, mission='TESS').rows(42)['kepoi_name'].tolist() == ['TOI-1.01']
+    assert 5 not in KepidIndex(df, mission='Kepler')
+    assert len(KepidIndex(df).rows(42)) == 2
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from mlp_numpy import NumpyMLP, fold_weights, check_parity
+
+
+@pytest.fixture(scope='module')
+def engine():
+    return NumpyMLP.load()
+
+
+def sklearn_proba(shipped_model, X):
+    mlp, scaler = shipped_model
+    return mlp.predict_proba(scaler.transform(np.atleast_2d(np.asarray(X, dtype=np.float64))))
+
+
+def test_shipped_weights_match_the_shipped_pipeline(shipped_model, engine):
+    assert check_parity(*shipped_model, engine) <= 1e-9
+
+
+def test_fold_weights_reproduces_the_pipeline(shipped_model):
+    mlp, scaler = shipped_model
+    folded = NumpyMLP(*fold_weights(mlp, scaler), mlp.activation, mlp.out_activation_, mlp.classes_)
+    assert check_parity(mlp, scaler, folded, n_rows=2000) <= 1e-9
+
+
+@pytest.mark.parametrize('X', [
+    np.zeros((3, 6)),
+    np.full((2, 6), 1e6),
+    np.full((2, 6), -1e6),
+    np.array([[1e-300, 1e300, 0.0, -1.0, 0.5, 1e-12]]),
+], ids=['zeros', 'huge', 'huge-negative', 'mixed-magnitudes'])
+def test_edge_inputs_match_sklearn(shipped_model, engine, X):
+    with np.errstate(over='raise', invalid='raise'):
+        actual = engine.predict_proba(X)
+    np.testing.assert_allclose(actual, sklearn_proba(shipped_model, X), rtol=0, atol=1e-9)
+    np.testing.assert_allclose(actual.sum(axis=1), 1.0)
+
+
+def test_single_row_and_dtypes(shipped_model, engine):
+    row = [5.0, 1.5, 700.0, 3.0, 0.5, 100.0]
+    expected = sklearn_proba(shipped_model, [row])
+    np.testing.assert_allclose(engine.predict_proba(row), expected, atol=1e-12)
+    np.testing.assert_allclose(engine.predict_proba(np.array([row], dtype=np.float32)), expected, atol=1e-6)
+    assert engine.predict(row)[0] == shipped_model[0].predict(shipped_model[1].transform([row]))[0]
+
+
+def test_empty_input(engine):
+    assert engine.predict_proba(np.empty((0, 6))).shape == (0, 2)
@@ -0,0 +1,44 @@
+import os
+import numpy as np
+import pytest
+from ensemble import StackedMLP
+from model_registry import (RegistryError, publish, publish_ensemble, load_version, load_current,
+                            current_version)
+from mlp_numpy import NumpyMLP, fold_weights
+
+
+@pytest.fixture
+def rows(shipped_model):
+    _, scaler = shipped_model
+    return scaler.mean_ + np.random.default_rng(0).standard_normal((500, len(scaler.mean_))) * scaler.scale_
+
+
+def test_publish_single_mlp(tmp_path, shipped_model, rows):
+    mlp, scaler = shipped_model
+    version = publish(mlp, scaler, {'test_accuracy': 0.5}, registry=tmp_path)
+    model = load_current(tmp_path)
+    assert isinstance(model, NumpyMLP) and current_version(tmp_path) == version
+    np.testing.assert_allclose(model.predict_proba(rows), mlp.predict_proba(scaler.transform(rows)), atol=1e-9)
+
+
+@pytest.mark.parametrize('calibration', [None, 'platt', 'isotonic'])
+def test_publish_ensemble_round_trip(tmp_path, shipped_model, stacked_model, rows, calibration):
+    _, scaler = shipped_model
+    ensemble = StackedMLP(stacked_model.coefs, stacked_model.intercepts, stacked_model.activation, {
+        None: None, 'platt': stacked_model.calibration,
+        'isotonic': {'method': 'isotonic', 'x': np.linspace(0, 1, 11), 'y': np.linspace(0, 1, 11) ** 2},
+    }[calibration])
+    version = publish_ensemble(ensemble, scaler, registry=tmp_path)
+    model = load_version(version, tmp_path)
+    assert isinstance(model, StackedMLP) and model.manifest['kind'] == 'ensemble'
+    for a, b in zip(model.predict_with_uncertainty(rows), ensemble.predict_with_uncertainty(rows)):
+        np.testing.assert_allclose(a, b, atol=1e-12)
+
+
+def test_tampered_version_is_rejected(tmp_path, shipped_model):
+    mlp, scaler = shipped_model
+    version = publish(mlp, scaler, registry=tmp_path)
+    W0 = os.path.join(tmp_path, version, 'W0.npy')
+    np.save(W0, fold_weights(mlp, scaler)[0][0] * 2)
+    with pytest.raises(RegistryError):
+        load_version(version, tmp_path)
@@ -0,0 +1,119 @@
+import asyncio
+import os
+import shutil
+import numpy as np
+import pandas as pd
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+from catalog_store import FEATURE_COLUMNS, CANDIDATE_FILE
+from scoring_service import MAX_CANDIDATE_LIMIT, MicroBatcher, create_app, parse_rows
+
+ROW = dict(zip(FEATURE_COLUMNS, [5.0, 1.5, 700.0, 3.0, 0.5, 100.0]))
+
+
+def test_parse_rows_accepts_objects_and_lists():
+    assert parse_rows(ROW).shape == (1, 6)
+    assert parse_rows([ROW, ROW]).shape == (2, 6)
+    assert parse_rows(list(ROW.values())).shape == (1, 6)
+
+
+@pytest.mark.parametrize('payload', [
+    [ROW, {'koi_period': 1.0}],
+    [ROW, list(ROW.values())],
+    [[1.0, 2.0], list(ROW.values())],
+    dict(ROW, koi_prad=float('nan')),
+    [list(ROW.values())] * 5,
+])
+def test_parse_rows_rejects_bad_payloads(payload):
+    with pytest.raises((ValueError, TypeError)):
+        parse_rows(payload, max_rows=4)
+
+
+class FlakyHandle:
+    """Fails the first batch, then scores P = first feature."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def get(self):
+        self.calls += 1
+        if self.calls == 1:
+            raise RuntimeError("model unavailable")
+        return self
+
+    def predict_proba(self, X):
+        return np.column_stack([1 - X[:, 0], X[:, 0]])
+
+
+def test_batcher_survives_errors_and_cancelled_callers():
+    async def run():
+        batcher = MicroBatcher(FlakyHandle(), max_wait=0.01)
+        batcher.start()
+        with pytest.raises(RuntimeError):
+            await batcher.score(np.array([[0.1]]))
+        abandoned = asyncio.ensure_future(batcher.score(np.array([[0.2]])))
+        await asyncio.sleep(0)
+        abandoned.cancel()
+        result = await batcher.score(np.array([[0.3], [0.4]]))
+        alive = not batcher._task.done()
+        await batcher.stop()
+        return result, alive
+
+    result, alive = asyncio.run(run())
+    np.testing.assert_allclose(result, [0.3, 0.4])
+    assert alive
+
+
+def _get_candidates(candidate_file, *queries, between=None):
+    """GET /candidates once per query string against a fresh app; `between` runs after the first."""
+    async def run():
+        app = create_app(candidate_file)
+        app['candidates'].poll_seconds = 0.0
+        responses = []
+        async with TestClient(TestServer(app)) as client:
+            for i, query in enumerate(queries):
+                response = await client.get(f'/candidates?{query}')
+                responses.append((response.status, await response.json() if response.status == 200 else None))
+                if i == 0 and between:
+                    between()
+        return responses
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize('limit', ['0', '-5', 'ten'])
+def test_candidates_rejects_bad_limits(limit):
+    [(status, _)] = _get_candidates(CANDIDATE_FILE, f'limit={limit}')
+    assert status == 400
+
+
+def test_candidates_caps_the_limit():
+    [(status, body)] = _get_candidates(CANDIDATE_FILE, f'limit={MAX_CANDIDATE_LIMIT * 10}&min_confidence=0')
+    assert status == 200
+    assert body['count'] == min(MAX_CANDIDATE_LIMIT, len(pd.read_csv(CANDIDATE_FILE)))
+
+
+def test_candidates_reload_when_the_file_changes(tmp_path):
+    path = str(tmp_path / 'candidates.csv')
+    shutil.copy(CANDIDATE_FILE, path)
+    top = pd.read_csv(path).head(3)
+
+    def rewrite():
+        top.to_csv(path, index=False)
+        os.utime(path, ns=(os.stat(path).st_mtime_ns + 10 ** 9,) * 2)
+
+    (_, before), (_, after) = _get_candidates(path, 'limit=1000', 'limit=1000', between=rewrite)
+    assert before['count'] > 3
+    assert after['count'] == 3
+
+
+def test_candidates_kepid_lookup_is_per_mission(tmp_path):
+    path = str(tmp_path / 'candidates.csv')
+    top = pd.read_csv(CANDIDATE_FILE).head(2)
+    top['kepid'] = 42
+    top['mission'] = ['Kepler', 'TESS']
+    top.to_csv(path, index=False)
+    (_, kepler), (_, tess), (status, _) = _get_candidates(
+        path, 'kepid=42&min_confidence=0', 'kepid=42&mission=TESS&min_confidence=0', 'kepid=42&mission=K2')
+    assert [row['mission'] for row in kepler['candidates']] == ['Kepler']
+    assert [row['mission'] for row in tess['candidates']] == ['TESS']
+    assert status == 400
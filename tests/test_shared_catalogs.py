@@ -0,0 +1,28 @@
+import os
+import pandas as pd
+import shared_catalogs
+from shared_catalogs import check, load_candidates, shared_frame, shared_path
+
+
+def test_tables_are_zero_copy():
+    check()
+
+
+def test_candidates_are_sorted_by_confidence():
+    confidence = load_candidates()['confidence'].to_numpy()
+    assert (confidence[:-1] >= confidence[1:]).all()
+
+
+def test_publishing_a_new_version_removes_the_old_one(tmp_path):
+    shared_dir = str(tmp_path)
+    shared_frame('t', 'v1', lambda: pd.DataFrame({'x': [1.0]}), shared_dir)
+    shared_frame('t', 'v2', lambda: pd.DataFrame({'x': [2.0]}), shared_dir)
+    assert not os.path.exists(shared_path('t', 'v1', shared_dir))
+    assert os.path.exists(shared_path('t', 'v2', shared_dir))
+
+
+def test_a_version_removed_before_it_is_mapped_is_rebuilt(tmp_path, monkeypatch):
+    # publish_frame writes nothing here, as if a newer version had removed the file right after.
+    monkeypatch.setattr(shared_catalogs, 'publish_frame', lambda *args: None)
+    df = shared_frame('t', 'v1', lambda: pd.DataFrame({'x': [1.0, 2.0]}), str(tmp_path))
+    assert df['x'].tolist() == [1.0, 2.0]
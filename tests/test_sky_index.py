@@ -0,0 +1,21 @@
+import numpy as np
+import pytest
+from sky_index import SKY_COLUMNS, SkyCatalog, load_objects, chord_length, separation_arcsec, unit_vectors, check
+
+
+@pytest.fixture(scope='module')
+def catalog():
+    return SkyCatalog({mission: load_objects(mission) for mission in SKY_COLUMNS})
+
+
+def test_queries_match_brute_force(catalog):
+    n_pairs, n_cones = check(catalog)
+    assert n_pairs > 0 and n_cones == 200
+
+
+def test_chord_and_separation_round_trip():
+    a = unit_vectors([10.0], [20.0])
+    b = unit_vectors([10.0], [20.0 + 1 / 3600])
+    assert separation_arcsec(np.linalg.norm(a - b, axis=1))[0] == pytest.approx(1.0, rel=1e-6)
+    assert separation_arcsec(chord_length([3.0, 3600.0])) == pytest.approx([3.0, 3600.0])
+    assert np.allclose(np.linalg.norm(unit_vectors([0.0, 123.0], [-90.0, 45.0]), axis=1), 1.0)
@@ -0,0 +1,16 @@
+import pytest
+from startup_profile import STARTUP_BUDGETS, check, profile_page
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize('page', list(STARTUP_BUDGETS))
+def test_page_starts_within_budget(page):
+    assert check(profile_page(page)) == []
+
+
+def test_check_reports_each_problem():
+    result = {'page': 'library', 'exceptions': ['boom'], 'first_run_s': STARTUP_BUDGETS['library'] + 1,
+              'new_modules': ['sklearn.base', 'json']}
+    problems = check(result)
+    assert len(problems) == 3 and problems[0] == 'exception on first run: boom'
+    assert "imported 'sklearn'" in problems
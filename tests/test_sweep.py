@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+from model_registry import load_current
+from sweep import axis_spec, axis_values, sweep_grid, fraction_above, check
+
+
+@pytest.fixture(params=['registry', 'ensemble'])
+def model(request, stacked_model):
+    return load_current() if request.param == 'registry' else stacked_model
+
+
+def test_grid_matches_single_row_predictions(model):
+    assert check(model) == 40 * 47
+
+
+def test_one_axis_sweep(model):
+    fixed = {'koi_period': 5.0, 'koi_prad': 1.5, 'koi_teq': 700.0, 'koi_duration': 3.0, 'koi_impact': 0.5,
+             'koi_insol': 100.0}
+    spec = axis_spec('koi_teq', 25)
+    grid = sweep_grid(model, fixed, [spec], chunk_rows=7)
+    assert grid.shape == (25,)
+    assert fraction_above(grid, 0.0) == 1.0 and fraction_above(grid, 1.01) == 0.0
+    assert np.all(np.diff(axis_values(axis_spec('koi_period', 5))) > 0)
+
+
+def test_invalid_specs():
+    with pytest.raises(ValueError):
+        axis_spec('koi_period', 10, lo=-1.0)
+    with pytest.raises(ValueError):
+        sweep_grid(None, {}, [axis_spec('koi_prad', 3), axis_spec('koi_prad', 3)])
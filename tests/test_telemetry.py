@@ -0,0 +1,82 @@
+import re
+import pytest
+import telemetry
+from telemetry import LOOKUP_METRIC, MISS_METRIC, SPAN_METRIC, MetricsRegistry, prometheus_text
+
+SAMPLE = re.compile(r'^[a-z_]+(\{[a-z_]+="(?:[^"\\]|\\.)*"(,[a-z_]+="(?:[^"\\]|\\.)*")*\})? \S+$')
+
+
+@pytest.fixture
+def tracing():
+    was = telemetry.ENABLED
+    telemetry.set_enabled(True)
+    telemetry.METRICS.reset()
+    yield telemetry.METRICS
+    telemetry.METRICS.reset()
+    telemetry.set_enabled(was)
+
+
+def test_spans_nest_into_the_current_trace(tracing):
+    telemetry.start_trace('page')
+    with telemetry.span('outer'):
+        with telemetry.span('inner', part='a'):
+            pass
+    trace = telemetry.end_trace()
+    assert [(name, depth) for name, _, depth in trace.spans] == [('inner', 1), ('outer', 0)]
+    assert trace.total >= trace.spans[-1][1] >= trace.spans[0][1] >= 0
+    assert list(tracing.traces) == [trace]
+    assert tracing.histograms[(SPAN_METRIC, (('part', 'a'), ('span', 'inner')))].count == 1
+
+
+def test_disabled_tracing_records_nothing(tracing):
+    telemetry.set_enabled(False)
+    telemetry.start_trace('page')
+    with telemetry.span('outer'):
+        pass
+    assert telemetry.end_trace() is None
+    assert not tracing.histograms and not tracing.counters
+
+
+def test_traced_cache_counts_lookups_and_misses(tracing):
+    cache = {}
+
+    @telemetry.traced('squares', cache=True)
+    def square(x):
+        if x not in cache:
+            telemetry.cache_miss('squares')
+            cache[x] = x * x
+        return cache[x]
+
+    assert [square(x) for x in (2, 2, 3, 2)] == [4, 4, 9, 4]
+    assert tracing.counter(LOOKUP_METRIC, cache='squares') == 4
+    assert tracing.counter(MISS_METRIC, cache='squares') == 2
+    assert telemetry.cache_hit_rates()['squares'] == (4, 2, 0.5)
+    telemetry.cache_lookup('folds', hit=False)
+    assert telemetry.cache_hit_rates()['folds'] == (1, 1, 0.0)
+
+
+def test_prometheus_exposition_format():
+    registry = MetricsRegistry()
+    registry.inc(LOOKUP_METRIC, cache='a "quoted"\\name')
+    registry.inc(LOOKUP_METRIC, 2, cache='b')
+    for seconds in (0.0001, 0.003, 0.003, 42.0):
+        registry.observe(SPAN_METRIC, seconds, span='s')
+    text = prometheus_text(registry)
+    lines = text.splitlines()
+    assert text.endswith('\n')
+
+    assert lines[:2] == [f'# HELP {LOOKUP_METRIC} {telemetry.METRIC_HELP[LOOKUP_METRIC]}',
+                         f'# TYPE {LOOKUP_METRIC} counter']
+    assert f'{LOOKUP_METRIC}{{cache="a \\"quoted\\"\\\\name"}} 1' in lines
+    assert f'{LOOKUP_METRIC}{{cache="b"}} 2' in lines
+    assert f'# TYPE {SPAN_METRIC} histogram' in lines
+    assert all(SAMPLE.match(line) for line in lines if not line.startswith('#')), lines
+
+    buckets = [line for line in lines if line.startswith(f'{SPAN_METRIC}_bucket')]
+    assert len(buckets) == len(telemetry.BUCKETS) + 1
+    assert buckets[-1].startswith(f'{SPAN_METRIC}_bucket{{span="s",le="+Inf"}}')
+    counts = [int(line.rsplit(' ', 1)[1]) for line in buckets]
+    assert counts == sorted(counts) and counts[0] == 1 and counts[-1] == 4  # cumulative, +Inf holds every sample
+    assert counts[telemetry.BUCKETS.index(0.005)] == 3
+    assert f'{SPAN_METRIC}_count{{span="s"}} 4' in lines
+    assert float(next(line for line in lines if line.startswith(f'{SPAN_METRIC}_sum')).split()[1]) == pytest.approx(42.0061)
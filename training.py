@@ -0,0 +1,166 @@
+# training.py (Configurable MLP training engine: dtype, early stopping, batch size, and a comparison report)
+import time
+import json
+import argparse
+import numpy as np
+
+# 'legacy' is the setup create_model.py used to hard-code (500 full epochs, batches of 200).
+# 'fast' is the default: float32 inputs, batches of 512 at a higher learning rate, and early
+# stopping on the log-loss of a held-out 10% of the training rows, keeping the best epoch's
+# weights. 'fast64' is the same in float64, to separate the dtype's share of the speedup;
+# with six inputs it is small (~15% per epoch), most of the gain is fewer, larger batches.
+# sklearn's own early_stopping watches validation accuracy, which is too coarse on this
+# data: it stopped after ~17 epochs and lost 0.14 ROC AUC, so the loop below is used instead.
+TRAINING_PROFILES = {
+    'legacy': {'dtype': 'float64', 'hidden_layer_sizes': (16, 16), 'max_iter': 500, 'batch_size': 'auto',
+               'learning_rate_init': 0.001, 'early_stopping': False},
+    'fast': {'dtype': 'float32', 'hidden_layer_sizes': (16, 16), 'max_iter': 500, 'batch_size': 512,
+             'learning_rate_init': 0.01, 'early_stopping': True, 'validation_fraction': 0.1,
+             'patience': 20, 'tol': 1e-4},
+}
+TRAINING_PROFILES['fast64'] = dict(TRAINING_PROFILES['fast'], dtype='float64')
+# Settings consumed here rather than passed to MLPClassifier.
+ENGINE_SETTINGS = ('dtype', 'early_stopping', 'validation_fraction', 'patience')
+DEFAULT_PROFILE = 'fast'
+RANDOM_STATE = 42
+REPORT_FILE = 'training_report.json'
+
+
+# --- 1. Training ---
+def resolve_profile(profile=DEFAULT_PROFILE, **overrides):
+    """A profile name (or dict) merged with keyword overrides, e.g. batch_size=256."""
+    settings = dict(TRAINING_PROFILES[profile] if isinstance(profile, str) else profile)
+    settings.update(overrides)
+    return settings
+
+
+def build_model(settings, seed=RANDOM_STATE):
+    from sklearn.neural_network import MLPClassifier
+    params = {k: v for k, v in settings.items() if k not in ENGINE_SETTINGS}
+    return MLPClassifier(random_state=seed, **params)
+
+
+def _log_loss(y, p):
+    p = np.clip(p, 1e-7, 1 - 1e-7)
+    return float(-np.mean(y * np.log(p) + (1 - y) * np.log1p(-p)))
+
+
+def fit_early_stopping(model, X, y, validation_fraction=0.1, patience=20, seed=RANDOM_STATE):
+    """
+    One partial_fit per epoch (Adam state and shuffling carry over between calls) until the
+    validation log-loss has not improved by `tol` for `patience` epochs, then restore the
+    best epoch's weights. Records best_epoch_ and validation_loss_curve_ on the model.
+    """
+    from sklearn.model_selection import train_test_split
+    X_fit, X_val, y_fit, y_val = train_test_split(X, y, test_size=validation_fraction,
+                                                  random_state=seed, stratify=y)
+    classes = np.unique(y)
+    best_loss, best_weights, best_epoch, curve = np.inf, None, 0, []
+    for epoch in range(model.max_iter):
+        model.partial_fit(X_fit, y_fit, classes=classes)
+        curve.append(_log_loss(y_val, model.predict_proba(X_val)[:, 1]))
+        if curve[-1] < best_loss - model.tol:
+            best_loss, best_epoch = curve[-1], epoch
+            best_weights = ([w.copy() for w in model.coefs_], [b.copy() for b in model.intercepts_])
+        elif epoch - best_epoch >= patience:
+            break
+    model.coefs_, model.intercepts_ = best_weights
+    model.n_iter_ = len(curve)  # partial_fit counts calls, not epochs
+    model.best_epoch_ = best_epoch + 1
+    model.validation_loss_curve_ = curve
+    return model
+
+
+def train_model(X_scaled, y, profile=DEFAULT_PROFILE, seed=RANDOM_STATE, **overrides):
+    """
+    Fit an MLPClassifier on already-scaled inputs. With a fixed seed the result is
+    reproducible: the same weight init, validation split and shuffling order each run.
+    float32 halves the memory traffic of every forward/backward pass; sklearn keeps the
+    weights in the input dtype, and fold_weights() widens them back for export.
+    """
+    settings = resolve_profile(profile, **overrides)
+    X = np.ascontiguousarray(X_scaled, dtype=settings.get('dtype', 'float64'))
+    y = np.asarray(y)
+    model = build_model(settings, seed)
+    if settings.get('early_stopping'):
+        return fit_early_stopping(model, X, y, settings.get('validation_fraction', 0.1),
+                                  settings.get('patience', 20), seed)
+    return model.fit(X, y)
+
+
+# --- 2. Comparison Report ---
+def evaluate(model, X_test, y_test, threshold):
+    from sklearn.metrics import roc_auc_score, f1_score
+    prob = model.predict_proba(np.asarray(X_test, dtype=model.coefs_[0].dtype))[:, 1]
+    y_test = np.asarray(y_test)
+    return {'accuracy': float(((prob >= 0.5) == y_test).mean()),
+            'roc_auc': float(roc_auc_score(y_test, prob)),
+            f'f1@{threshold}': float(f1_score(y_test, prob >= threshold))}
+
+
+def compare_profiles(X_train, y_train, X_test, y_test, profiles=('legacy', 'fast'), repeats=1, threshold=0.8):
+    """Wall time (best of `repeats`), epochs and test metrics for each profile on the same split."""
+    report = {}
+    for profile in profiles:
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            model = train_model(X_train, y_train, profile)
+            times.append(time.perf_counter() - start)
+        report[profile] = {'seconds': min(times), 'epochs': int(model.n_iter_),
+                           'ms_per_epoch': 1000 * min(times) / model.n_iter_,
+                           **evaluate(model, X_test, y_test, threshold)}
+    return report
+
+
+def format_report(report, baseline='legacy'):
+    metrics = [k for k in next(iter(report.values())) if k not in ('seconds', 'epochs', 'ms_per_epoch')]
+    lines = [f"{'profile':10s} {'seconds':>8s} {'speedup':>8s} {'epochs':>7s} {'ms/epoch':>9s} "
+             + ' '.join(f'{m:>9s}' for m in metrics)]
+    for profile, row in report.items():
+        speedup = report[baseline]['seconds'] / row['seconds'] if baseline in report else 1.0
+        lines.append(f"{profile:10s} {row['seconds']:8.2f} {speedup:7.1f}x {row['epochs']:7d} {row['ms_per_epoch']:9.1f} "
+                     + ' '.join(f'{row[m]:9.4f}' for m in metrics))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import StandardScaler
+    from catalog_store import FEATURE_COLUMNS, CONFIDENCE_THRESHOLD
+    from mission_catalogs import load_unified
+    from feature_pipeline import clean
+
+    parser = argparse.ArgumentParser(description="Compare MLP training profiles on the create_model.py split.")
+    parser.add_argument('profiles', nargs='*', default=list(TRAINING_PROFILES))
+    parser.add_argument('--repeats', type=int, default=1, help="Fits per profile; the fastest is reported")
+    parser.add_argument('--report', default=REPORT_FILE, help="Where to write the JSON report ('' to skip)")
+    parser.add_argument('--derived', nargs='+', default=[], metavar='FEATURE',
+                        help="Add registered derived features (derived_features.py) to the inputs; "
+                             "they exist for Kepler KOIs only, so TESS rows and rows missing them are dropped")
+    args = parser.parse_args(argv)
+
+    columns = FEATURE_COLUMNS + args.derived
+    if args.derived:
+        from derived_features import feature_matrix  # read from the per-version feature cache
+        df = clean(load_unified(('Kepler',)))
+        X = feature_matrix(df, columns)
+        keep = np.isfinite(X).all(axis=1)
+        df, X = df[keep], X[keep]
+    else:
+        df = clean(load_unified(('Kepler', 'TESS')))
+        X = df[FEATURE_COLUMNS].to_numpy(np.float64)
+    X_train, X_test, y_train, y_test = train_test_split(X, df['y'].to_numpy(),
+                                                        test_size=0.2, random_state=RANDOM_STATE, stratify=df['y'])
+    scaler = StandardScaler().fit(X_train)
+    report = compare_profiles(scaler.transform(X_train), y_train, scaler.transform(X_test), y_test,
+                              args.profiles, args.repeats, CONFIDENCE_THRESHOLD)
+    print(format_report(report))
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump({'rows': len(df), 'columns': columns, 'profiles': {p: resolve_profile(p) for p in report}, 'results': report},
+                      f, indent=2, default=list)
+
+
+if __name__ == "__main__":
+    main()